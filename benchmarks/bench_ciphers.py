@@ -0,0 +1,56 @@
+"""Throughput per cipher suite for data-key encryption"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.security import EncryptionService
+from src.security.ciphers import available_suites
+
+
+def bench_suite(name: str, payload: str, rounds: int) -> dict:
+    """Measure encrypt/decrypt throughput and stored size for one suite"""
+    data_key = EncryptionService.generate_data_key()
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        encrypted = EncryptionService.encrypt_with_data_key(payload, data_key, suite_name=name)
+    encrypt_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        EncryptionService.decrypt_with_data_key(encrypted, data_key)
+    decrypt_seconds = time.perf_counter() - started
+
+    return {
+        "suite": name,
+        "payload_bytes": len(payload.encode()),
+        "stored_chars": len(encrypted),
+        "encrypt_ops": rounds / encrypt_seconds,
+        "decrypt_ops": rounds / decrypt_seconds,
+    }
+
+
+def main():
+    """Print throughput table for every registered suite"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=20000, help="Encryptions and decryptions per suite and size")
+    args = parser.parse_args()
+
+    print(f"{'suite':<20}{'payload':>8}{'stored':>8}{'encrypt/s':>12}{'decrypt/s':>12}")
+    for size in (16, 256, 4096):
+        payload = "x" * size
+        for name in available_suites():
+            row = bench_suite(name, payload, args.rounds)
+            print(
+                f"{row['suite']:<20}{row['payload_bytes']:>8}{row['stored_chars']:>8}"
+                f"{row['encrypt_ops']:>12.0f}{row['decrypt_ops']:>12.0f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""Micro-benchmarks for EncryptionService with machine-readable JSON output"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.security import CryptoPool, EncryptionService, KdfParams
+from src.security.ciphers import available_suites
+from src.security.encryption import key_cache
+
+
+def timed(func, rounds: int) -> float:
+    """Seconds per call, best of three runs of ``rounds`` calls"""
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            func()
+        best = min(best, (time.perf_counter() - started) / rounds)
+    return best
+
+
+def result(benchmark: str, seconds: float, **params) -> dict:
+    """Benchmark record"""
+    return {
+        "benchmark": benchmark,
+        **params,
+        "seconds_per_op": seconds,
+        "ops_per_second": 1 / seconds if seconds else None,
+    }
+
+
+def bench_kdf(iterations: list, kdf_rounds: int) -> list:
+    """derive_key, encrypt_password and decrypt_password per PBKDF2 iteration count"""
+    rows = []
+    salt = os.urandom(EncryptionService.SALT_LENGTH)
+    for count in iterations:
+        params = KdfParams(iterations=count)
+        encrypted = EncryptionService.format_encrypted(
+            params, salt, EncryptionService.get_cipher("master", salt, params=params).encrypt(b"secret")
+        )
+        rows.append(result(
+            "derive_key", timed(lambda: EncryptionService.derive_key("master", salt, params), kdf_rounds),
+            iterations=count,
+        ))
+        rows.append(result(
+            "decrypt_password", timed(lambda: EncryptionService.decrypt_password(encrypted, "master"), kdf_rounds),
+            iterations=count, cached=False,
+        ))
+        EncryptionService.decrypt_password(encrypted, "master", scope="bench")
+        rows.append(result(
+            "decrypt_password",
+            timed(lambda: EncryptionService.decrypt_password(encrypted, "master", scope="bench"), kdf_rounds * 100),
+            iterations=count, cached=True,
+        ))
+        key_cache.clear()
+
+    rows.append(result(
+        "encrypt_password", timed(lambda: EncryptionService.encrypt_password("secret", "master"), kdf_rounds),
+        iterations=KdfParams.current().iterations,
+    ))
+    return rows
+
+
+def bench_suites(payloads: list, rounds: int) -> list:
+    """Data-key encrypt and decrypt per cipher suite and payload size"""
+    rows = []
+    data_key = EncryptionService.generate_data_key()
+    for size in payloads:
+        payload = "x" * size
+        for name in available_suites():
+            sealed = EncryptionService.seal_with_data_key(payload, data_key, name)
+            rows.append(result(
+                "seal_with_data_key",
+                timed(lambda: EncryptionService.seal_with_data_key(payload, data_key, name), rounds),
+                suite=name, payload_bytes=size, stored_bytes=len(sealed),
+            ))
+            rows.append(result(
+                "decrypt_with_data_key",
+                timed(lambda: EncryptionService.decrypt_with_data_key(sealed, data_key), rounds),
+                suite=name, payload_bytes=size, stored_bytes=len(sealed),
+            ))
+    return rows
+
+
+def bench_vault_view(vault_sizes: list, rounds: int) -> list:
+    """decrypt_many over a whole vault, the cost of one full vault view"""
+    rows = []
+    data_key = EncryptionService.generate_data_key()
+    for size in vault_sizes:
+        records = [(i, EncryptionService.seal_with_data_key(f"secret{i}", data_key)) for i in range(size)]
+        rows.append(result(
+            "decrypt_many",
+            timed(lambda: EncryptionService.decrypt_many(records, "master", data_key=data_key), max(1, rounds // size)),
+            vault_size=size,
+        ))
+    return rows
+
+
+def bench_thread_parallelism(workers: list, jobs: int, iterations: int) -> list:
+    """Derivations fanned out over threads"""
+    rows = []
+    params = KdfParams(iterations=iterations)
+    salts = [os.urandom(EncryptionService.SALT_LENGTH) for _ in range(jobs)]
+    for count in workers:
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            def run():
+                list(executor.map(lambda salt: EncryptionService.derive_key("master", salt, params), salts))
+
+            seconds = timed(run, 1) / jobs
+        rows.append(result("derive_key_threads", seconds, workers=count, jobs=jobs, iterations=iterations))
+    return rows
+
+
+def bench_process_parallelism(workers: list, jobs: int, iterations: int) -> list:
+    """Derivations on the crypto process pool"""
+    params = KdfParams(iterations=iterations)
+    salts = [os.urandom(EncryptionService.SALT_LENGTH) for _ in range(jobs)]
+
+    async def run(count: int) -> float:
+        pool = CryptoPool(max_workers=count)
+        try:
+            await pool.run(EncryptionService.derive_key, "master", salts[0], params)
+            started = time.perf_counter()
+            await asyncio.gather(*(pool.run(EncryptionService.derive_key, "master", salt, params) for salt in salts))
+            return (time.perf_counter() - started) / jobs
+        finally:
+            await pool.shutdown()
+
+    return [
+        result("derive_key_processes", asyncio.run(run(count)), workers=count, jobs=jobs, iterations=iterations)
+        for count in workers
+    ]
+
+
+def parse_list(value: str) -> list:
+    """Comma separated integers"""
+    return [int(part) for part in value.split(",") if part]
+
+
+def main():
+    """Run benchmarks and write JSON report"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=parse_list, default=[10000, 100000, 600000], help="PBKDF2 iteration counts")
+    parser.add_argument("--payloads", type=parse_list, default=[16, 256, 4096], help="Payload sizes in bytes")
+    parser.add_argument("--vault-sizes", type=parse_list, default=[10, 100, 1000], help="Rows per vault view")
+    parser.add_argument("--workers", type=parse_list, default=[1, 2, 4], help="Thread and process counts")
+    parser.add_argument("--jobs", type=int, default=8, help="Derivations per parallelism run")
+    parser.add_argument("--rounds", type=int, default=2000, help="Calls per cheap measurement")
+    parser.add_argument("--kdf-rounds", type=int, default=3, help="Calls per key derivation measurement")
+    parser.add_argument("--output", type=Path, help="Write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    results = []
+    results += bench_kdf(args.iterations, args.kdf_rounds)
+    results += bench_suites(args.payloads, args.rounds)
+    results += bench_vault_view(args.vault_sizes, args.rounds)
+    parallel_iterations = min(args.iterations)
+    results += bench_thread_parallelism(args.workers, args.jobs, parallel_iterations)
+    results += bench_process_parallelism(args.workers, args.jobs, parallel_iterations)
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "kdf": {"algorithm": KdfParams.current().algorithm, "cost": KdfParams.current().cost},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""FSM conversation step throughput, MemoryStorage versus SqliteStorage"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from aiogram.fsm.storage.base import BaseStorage, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from src.bot.states import MainMenuStates
+from src.bot.storage import SqliteStorage
+
+STEPS = (
+    (MainMenuStates.ADD_PASSWORD_SERVICE, {}),
+    (MainMenuStates.ADD_PASSWORD_LOGIN, {"service": "github"}),
+    (MainMenuStates.ADD_PASSWORD_PASSWORD, {"login": "john"}),
+    (MainMenuStates.MENU, None),
+)
+
+
+async def conversation(storage: BaseStorage, key: StorageKey, rounds: int) -> None:
+    """Walk one user through the add-password flow like the handlers do"""
+    for _ in range(rounds):
+        for state, data in STEPS:
+            await storage.get_state(key)
+            if data is None:
+                await storage.set_data(key, {})
+            elif data:
+                await storage.update_data(key, data)
+            await storage.set_state(key, state)
+
+
+async def bench(storage: BaseStorage, users: int, rounds: int) -> float:
+    """Conversation steps per second with every user active at once"""
+    keys = [StorageKey(bot_id=1, chat_id=i, user_id=i) for i in range(users)]
+    started = time.perf_counter()
+    await asyncio.gather(*(conversation(storage, key, rounds) for key in keys))
+    await storage.close()
+    return users * rounds * len(STEPS) / (time.perf_counter() - started)
+
+
+def main():
+    """Run benchmarks and print JSON report"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=500, help="Concurrent conversations")
+    parser.add_argument("--rounds", type=int, default=10, help="Flows walked per user")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sqlite = SqliteStorage(Path(tmpdir) / "cached.db")
+        report = {
+            "users": args.users,
+            "rounds": args.rounds,
+            "memory_steps_per_second": asyncio.run(bench(MemoryStorage(), args.users, args.rounds)),
+            "sqlite_steps_per_second": asyncio.run(bench(sqlite, args.users, args.rounds)),
+            "sqlite_flushes": sqlite.flushes,
+            "sqlite_cache_hits": sqlite.hits,
+            "sqlite_cache_misses": sqlite.misses,
+        }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Row-to-record construction cost and memory, dataclass records versus slotted records"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import Database, DatabaseInitializer, PasswordRepository
+from src.database.crud import _secret
+
+
+@dataclass
+class LegacyPassword:
+    """Password record as it was before slotted records"""
+    id: Optional[int] = None
+    user_id: int = 0
+    service: str = ""
+    login: str = ""
+    password: object = ""
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    def __post_init__(self):
+        if self.created_at is None:
+            self.created_at = datetime.now()
+        if self.updated_at is None:
+            self.updated_at = datetime.now()
+
+
+def load_legacy(db: Database, user_id: int) -> list:
+    """Load through sqlite3.Row name lookups into dataclasses"""
+    cursor = db.execute(
+        "SELECT id, user_id, service, login, password, created_at, updated_at FROM passwords "
+        "WHERE user_id = ? ORDER BY service, id",
+        (user_id,),
+    )
+    return [
+        LegacyPassword(
+            id=row["id"],
+            user_id=row["user_id"],
+            service=row["service"],
+            login=row["login"],
+            password=_secret(row["password"]),
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+        )
+        for row in cursor.fetchall()
+    ]
+
+
+def load_current(db: Database, user_id: int) -> list:
+    """Load through PasswordRepository"""
+    return PasswordRepository.get_by_user(db, user_id)
+
+
+def measure(loader, db: Database, user_id: int, rows: int) -> dict:
+    """Best-of-three time per row and peak traced memory of one load"""
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        loader(db, user_id)
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    records = loader(db, user_id)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return {"seconds_per_row": best / rows, "peak_bytes": peak, "bytes_per_row": peak / rows}
+
+
+def main():
+    """Run benchmark and print JSON report"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000, help="Rows in the benchmark vault")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = Path(tmpdir) / "records.db"
+        DatabaseInitializer.init_db(db_path)
+        db = Database(db_path)
+        db.connect()
+        try:
+            db.execute("INSERT INTO users (username, password_hash) VALUES ('bench', 'h')")
+            db.executemany(
+                "INSERT INTO passwords (user_id, service, login, password) VALUES (1, ?, 'user', ?)",
+                ((f"service{i:06d}", b"\x03" + bytes(48)) for i in range(args.rows)),
+            )
+            db.commit()
+            report = {
+                "rows": args.rows,
+                "before": measure(load_legacy, db, 1, args.rows),
+                "after": measure(load_current, db, 1, args.rows),
+            }
+        finally:
+            db.close()
+
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
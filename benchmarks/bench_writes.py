@@ -0,0 +1,63 @@
+"""Write throughput of AsyncDatabase with one commit per write versus the group-committing writer"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import ConnectionPool, DatabaseInitializer, DatabaseWriter, Password
+from src.database.async_db import AsyncDatabase, AsyncPasswordRepository
+
+
+def entry(i: int) -> Password:
+    """Password row for benchmark writes"""
+    return Password(user_id=1, service=f"service{i}", login="user", password=b"\x03" + bytes(48))
+
+
+def bench(db_path: Path, writes: int, window: float, synchronous: str, grouped: bool) -> float:
+    """Writes per second with concurrent callers, on the database thread or through DatabaseWriter"""
+    pool = ConnectionPool(db_path, synchronous=synchronous)
+    writer = DatabaseWriter(db_path, pool=pool, window=window) if grouped else None
+    database = AsyncDatabase(db_path, pool=pool, writer=writer)
+
+    async def run() -> float:
+        started = time.perf_counter()
+        await asyncio.gather(*(AsyncPasswordRepository.create(database, entry(i)) for i in range(writes)))
+        rate = writes / (time.perf_counter() - started)
+        await database.close()
+        return rate
+
+    try:
+        return asyncio.run(run())
+    finally:
+        if writer is not None:
+            writer.close()
+        pool.close()
+
+
+def main():
+    """Run benchmarks and print JSON report"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writes", type=int, default=2000, help="Rows inserted per run")
+    parser.add_argument("--window", type=float, default=0.002, help="Writer group window in seconds")
+    parser.add_argument("--synchronous", default="NORMAL", help="PRAGMA synchronous for both runs")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        report = {"writes": args.writes, "window": args.window, "synchronous": args.synchronous}
+        for name, grouped in (("per_write_commits", False), ("writer", True)):
+            db_path = Path(tmpdir) / f"{name}.db"
+            DatabaseInitializer.init_db(db_path)
+            rate = bench(db_path, args.writes, args.window, args.synchronous, grouped)
+            report[f"{name}_writes_per_second"] = rate
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,57 +1,124 @@
-"""Password Manager Telegram Bot - Main Entry Point"""
-import asyncio
-import logging
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent))
-
-from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
-
-from src.config import TELEGRAM_BOT_TOKEN, DB_PATH, LOG_LEVEL
-from src.database.db import DatabaseInitializer
-from src.bot.handlers import init_routers
-
-logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL, logging.INFO),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
-
-
-async def main():
-    """Main bot function"""
-    try:
-        DatabaseInitializer.init_db(DB_PATH)
-        logger.info("✓ Database initialized successfully")
-    except Exception as e:
-        logger.error(f"✗ Database initialization error: {e}")
-        raise
-
-    if not TELEGRAM_BOT_TOKEN:
-        raise ValueError("TELEGRAM_BOT_TOKEN environment variable is not set")
-
-    bot = Bot(token=TELEGRAM_BOT_TOKEN)
-    storage = MemoryStorage()
-    dp = Dispatcher(storage=storage)
-
-    main_router = init_routers()
-    dp.include_router(main_router)
-
-    try:
-        logger.info("🤖 Starting Password Manager bot...")
-        await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
-    except KeyboardInterrupt:
-        logger.info("🛑 Bot stopped by user")
-    except Exception as e:
-        logger.error(f"✗ Bot error: {e}")
-        raise
-    finally:
-        await bot.session.close()
-
-
-if __name__ == "__main__":
-    asyncio.run(main())
-
-
+"""Password Manager Telegram Bot - Main Entry Point"""
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+
+from src.config import (
+    TELEGRAM_BOT_TOKEN,
+    TELEGRAM_API_URL,
+    BOT_MODE,
+    DB_PATH,
+    LOG_LEVEL,
+    SESSION_SWEEP_INTERVAL,
+    KEY_CACHE_SWEEP_INTERVAL,
+    WEBHOOK_URL,
+    WEBHOOK_PATH,
+    WEBHOOK_HOST,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET,
+)
+from src.database.db import DatabaseInitializer
+from src.database.pool import db_pool
+from src.database.async_db import async_db
+from src.database.writer import db_writer
+from src.database.sessions import session_store
+from src.bot.handlers import init_routers
+from src.bot.storage import create_storage
+from src.bot.webhook import run_webhook
+from src.security.encryption import crypto_pool, key_cache
+from src.services.migrations import StorageMigrationService
+from src.services.password import reveal_cache
+
+logging.basicConfig(
+    level=getattr(logging, LOG_LEVEL, logging.INFO),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def migrate_storage():
+    """Convert text ciphertexts left by older versions to BLOBs"""
+    with db_pool.checkout() as db:
+        converted = StorageMigrationService.migrate_to_blob(db, writer=db_writer)
+    if converted:
+        logger.info(f"✓ Converted {converted} stored values to binary format")
+
+
+def create_bot() -> Bot:
+    """Bot talking to api.telegram.org, or to TELEGRAM_API_URL when set"""
+    if TELEGRAM_API_URL:
+        session = AiohttpSession(api=TelegramAPIServer.from_base(TELEGRAM_API_URL))
+        return Bot(token=TELEGRAM_BOT_TOKEN, session=session)
+    return Bot(token=TELEGRAM_BOT_TOKEN)
+
+
+async def main(mode: str = BOT_MODE):
+    """Main bot function"""
+    try:
+        DatabaseInitializer.init_db(DB_PATH)
+        logger.info("✓ Database initialized successfully")
+    except Exception as e:
+        logger.error(f"✗ Database initialization error: {e}")
+        raise
+
+    migration = asyncio.create_task(asyncio.to_thread(migrate_storage))
+    sweepers = [
+        asyncio.create_task(session_store.sweep(SESSION_SWEEP_INTERVAL)),
+        asyncio.create_task(key_cache.sweep(KEY_CACHE_SWEEP_INTERVAL)),
+        asyncio.create_task(reveal_cache.sweep(KEY_CACHE_SWEEP_INTERVAL)),
+    ]
+
+    if not TELEGRAM_BOT_TOKEN:
+        raise ValueError("TELEGRAM_BOT_TOKEN environment variable is not set")
+    if mode == "webhook" and not WEBHOOK_URL:
+        raise ValueError("WEBHOOK_URL environment variable is not set")
+
+    bot = create_bot()
+    storage = create_storage()
+    dp = Dispatcher(storage=storage)
+
+    main_router = init_routers()
+    dp.include_router(main_router)
+
+    try:
+        logger.info(f"🤖 Starting Password Manager bot ({mode})...")
+        if mode == "webhook":
+            await run_webhook(dp, bot, WEBHOOK_URL, WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_PATH, WEBHOOK_SECRET)
+        else:
+            await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
+    except KeyboardInterrupt:
+        logger.info("🛑 Bot stopped by user")
+    except Exception as e:
+        logger.error(f"✗ Bot error: {e}")
+        raise
+    finally:
+        for sweeper in sweepers:
+            sweeper.cancel()
+        await asyncio.gather(migration, *sweepers, return_exceptions=True)
+        await crypto_pool.shutdown()
+        await async_db.close()
+        await asyncio.to_thread(db_writer.close)
+        await session_store.close()
+        db_pool.close()
+        await bot.session.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Password Manager Telegram bot")
+    parser.add_argument(
+        "--mode",
+        choices=("polling", "webhook"),
+        default=BOT_MODE,
+        help="Receive updates by long polling or through a webhook server",
+    )
+    asyncio.run(main(parser.parse_args().mode))
+
+
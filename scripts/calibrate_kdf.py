@@ -0,0 +1,32 @@
+"""Benchmark key derivation on this host and suggest KDF settings"""
+import argparse
+import sys
+from pathlib import Path
+
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.security.kdf import PBKDF2_SHA256, SCRYPT, KdfParams, calibrate, describe, measure
+
+
+def main():
+    """Calibrate KDF cost for a target latency"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--algorithm", choices=[PBKDF2_SHA256, SCRYPT], default=PBKDF2_SHA256)
+    parser.add_argument("--target-ms", type=float, default=100.0, help="Desired time per derivation")
+    parser.add_argument("--rounds", type=int, default=3, help="Runs per measurement")
+    args = parser.parse_args()
+
+    current = KdfParams.current()
+    print(f"Current: {current.algorithm} {current.cost} - {measure(current, args.rounds) * 1000:.1f} ms")
+
+    params = calibrate(args.algorithm, args.target_ms / 1000, args.rounds)
+    print(f"Calibrated: {params.algorithm} {params.cost} - {measure(params, args.rounds) * 1000:.1f} ms")
+    print()
+    print("# Add to .env; existing data is re-encrypted on next login")
+    print(describe(params))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
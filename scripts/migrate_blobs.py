@@ -0,0 +1,32 @@
+"""Convert stored text ciphertexts to the compact binary format"""
+import argparse
+import sys
+from pathlib import Path
+
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import DB_PATH
+from src.database.db import Database, DatabaseInitializer
+from src.services.migrations import StorageMigrationService
+
+
+def main():
+    """Run the online BLOB migration"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=StorageMigrationService.BATCH_SIZE, help="Rows per transaction")
+    args = parser.parse_args()
+
+    DatabaseInitializer.init_db(DB_PATH)
+    db = Database(DB_PATH)
+    try:
+        converted = StorageMigrationService.migrate_to_blob(db, args.batch_size)
+        db.execute("VACUUM")
+    finally:
+        db.close()
+    print(f"✅ Converted {converted} values")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
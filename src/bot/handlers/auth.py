@@ -1,21 +1,41 @@
 """Authentication handlers for Telegram Bot"""
+import asyncio
+import logging
+
 from aiogram import Router, F
 from aiogram.types import Message
 from aiogram.fsm.context import FSMContext
 from aiogram.filters import Command, StateFilter
 
-from src.config import BTN_REGISTER, BTN_LOGIN, BTN_CANCEL, WELCOME_MESSAGE, MAIN_MENU_MESSAGE, DB_PATH
+from src.config import BTN_REGISTER, BTN_LOGIN, BTN_LOGOUT, BTN_CANCEL, WELCOME_MESSAGE, MAIN_MENU_MESSAGE
 from src.bot.states import AuthStates, MainMenuStates
 from src.bot.keyboards import (
     get_auth_keyboard,
     get_main_menu_keyboard,
     get_cancel_keyboard,
 )
-from src import Database, AuthenticationService, Validators
+from src import AuthenticationService, PasswordService, Validators
+from src.database.async_db import AsyncUserRepository, async_db
+from src.database.sessions import session_store
+
+logger = logging.getLogger(__name__)
 
 router = Router()
 
-user_sessions = {}
+user_sessions = session_store
+
+background_tasks = set()
+
+
+async def upgrade_kdf(user_id: int, username: str, password: str) -> None:
+    """Re-encrypt data produced with outdated KDF parameters after login"""
+    try:
+        upgraded = await AuthenticationService.upgrade_credentials_async(async_db, user_id, username, password, username)
+        upgraded += await PasswordService.upgrade_outdated_async(async_db, user_id, username)
+        if upgraded:
+            logger.info(f"Re-encrypted {upgraded} values with current KDF parameters for user {user_id}")
+    except Exception as e:
+        logger.error(f"KDF upgrade failed for user {user_id}: {e}")
 
 @router.message(Command("start"))
 async def cmd_start(message: Message, state: FSMContext):
@@ -24,7 +44,7 @@ async def cmd_start(message: Message, state: FSMContext):
     
     await state.clear()
     
-    if user_id in user_sessions:
+    if await user_sessions.get(user_id) is not None:
 
         await message.answer(MAIN_MENU_MESSAGE, reply_markup=get_main_menu_keyboard())
         await state.set_state(MainMenuStates.MENU)
@@ -61,12 +81,7 @@ async def register_username(message: Message, state: FSMContext):
         return
     
 
-    db = Database(DB_PATH)
-    db.connect()
-    
-    from src.database.crud import UserRepository
-    existing_user = UserRepository.get_by_username(db, username)
-    db.close()
+    existing_user = await AsyncUserRepository.get_by_username(async_db, username)
     
     if existing_user:
         await message.answer(
@@ -102,22 +117,15 @@ async def register_password(message: Message, state: FSMContext):
     data = await state.get_data()
     username = data.get("username")
 
-    db = Database(DB_PATH)
-    db.connect()
-    
-    success, msg = AuthenticationService.register_user(db, username, password)
-    db.close()
+    success, msg = await AuthenticationService.register_user_async(async_db, username, password)
     
     if success:
-
-        db = Database(DB_PATH)
-        db.connect()
-        from src.database.crud import UserRepository
-        user = UserRepository.get_by_username(db, username)
-        db.close()
+        user = await AsyncUserRepository.get_by_username(async_db, username)
+        if user:
+            await AuthenticationService.start_session_async(async_db, user.id, user.username)
         
         if user:
-            user_sessions[message.from_user.id] = user.id
+            await user_sessions.set(message.from_user.id, user.id)
             await message.answer(
                 f"✅ {msg}",
                 reply_markup=get_main_menu_keyboard(),
@@ -172,16 +180,17 @@ async def login_password(message: Message, state: FSMContext):
     data = await state.get_data()
     username = data.get("username")
     
-    db = Database(DB_PATH)
-    db.connect()
-    
-    success, msg, user_id = AuthenticationService.authenticate_user(
-        db, username, password
+    success, msg, user_id = await AuthenticationService.authenticate_user_async(
+        async_db, username, password
     )
-    db.close()
+    if success:
+        await AuthenticationService.start_session_async(async_db, user_id, username)
     
     if success:
-        user_sessions[message.from_user.id] = user_id
+        await user_sessions.set(message.from_user.id, user_id)
+        task = asyncio.create_task(upgrade_kdf(user_id, username, password))
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
         await message.answer(
             f"✅ {msg}",
             reply_markup=get_main_menu_keyboard(),
@@ -192,6 +201,19 @@ async def login_password(message: Message, state: FSMContext):
         await state.set_state(AuthStates.START)
 
 
+@router.message(Command("logout"))
+@router.message(MainMenuStates.MENU, F.text == BTN_LOGOUT)
+async def logout(message: Message, state: FSMContext):
+    """Handle logout"""
+    user_id = await user_sessions.delete(message.from_user.id)
+    if user_id is not None:
+        AuthenticationService.end_session(user_id)
+
+    await state.clear()
+    await message.answer(WELCOME_MESSAGE, reply_markup=get_auth_keyboard())
+    await state.set_state(AuthStates.START)
+
+
 @router.message(F.text == BTN_CANCEL)
 async def cancel_handler(message: Message, state: FSMContext):
     """Handle cancel button"""
@@ -1,23 +1,56 @@
 """Password management handlers for Telegram Bot"""
 from aiogram import Router, F
-from aiogram.types import Message, CallbackQuery
+from aiogram.filters import Command, CommandObject
+from aiogram.types import (
+    Message,
+    CallbackQuery,
+    InlineQuery,
+    InlineQueryResultArticle,
+    InlineQueryResultsButton,
+    InputTextMessageContent,
+)
 from aiogram.fsm.context import FSMContext
 
-from src.config import BTN_ADD, BTN_VIEW, BTN_UPDATE, BTN_DELETE, BTN_BACK, MAIN_MENU_MESSAGE, DB_PATH
+from src.config import BTN_ADD, BTN_VIEW, BTN_UPDATE, BTN_DELETE, BTN_BACK, MAIN_MENU_MESSAGE
 from src.bot.states import MainMenuStates
 from src.bot.keyboards import (
     get_main_menu_keyboard,
     get_cancel_keyboard,
     get_back_keyboard,
     get_passwords_inline_keyboard,
+    PAGE_PREFIX,
 )
-from src import Database, PasswordService, Validators
-from src.database.crud import PasswordRepository
+from src import PasswordService, Validators
+from src.database.async_db import AsyncPasswordRepository, AsyncUserRepository, async_db
 from src.database.models import Password
 from src.bot.handlers.auth import user_sessions
 
 router = Router()
 
+REVEAL_PREFIX = "show"
+SELECT_PREFIX = "pwd"
+ALERT_MAX_LENGTH = 200
+INLINE_RESULTS_LIMIT = 20
+FUZZY_MATCHES = 5
+
+
+def _vault_text(page: dict) -> str:
+    """Render one page of the vault view"""
+    message_text = f"🔐 Ваши пароли (всего: {page['total']}):\n\n"
+    for pwd in page["entries"]:
+        message_text += f"🔑 {pwd['service']}\n"
+        message_text += f"   Логин: {pwd['login']}\n\n"
+    message_text += "Нажмите на запись, чтобы показать пароль"
+    return message_text
+
+
+def _page_keyboard(page: dict, prefix: str):
+    """Selection keyboard for one page"""
+    return get_passwords_inline_keyboard(
+        page["entries"], prefix=prefix, has_prev=page["has_prev"], has_next=page["has_next"]
+    )
+
+
 @router.message(MainMenuStates.MENU, F.text == BTN_ADD)
 async def add_password_start(message: Message, state: FSMContext):
     """Start adding new password"""
@@ -80,33 +113,25 @@ async def add_password_password(message: Message, state: FSMContext):
     login = data.get("login")
     
 
-    user_id = user_sessions.get(message.from_user.id)
+    user_id = await user_sessions.get(message.from_user.id)
     if not user_id:
         await message.answer("❌ Ошибка: пользователь не авторизован")
         return
     
-    from src.database.crud import UserRepository
-    db = Database(DB_PATH)
-    db.connect()
-    user = UserRepository.get_by_id(db, user_id)
-    db.close()
+    user = await AsyncUserRepository.get_by_id(async_db, user_id)
     
     if not user:
         await message.answer("❌ Ошибка: пользователь не найден")
         return
 
-    db = Database(DB_PATH)
-    db.connect()
-    
-    success, msg = PasswordService.create_password(
-        db,
+    success, msg = await PasswordService.create_password_async(
+        async_db,
         user_id,
         service,
         login,
         password,
-        user.username,  
+        user.username,
     )
-    db.close()
     
     if success:
         await message.answer(
@@ -121,81 +146,176 @@ async def add_password_password(message: Message, state: FSMContext):
 
 @router.message(MainMenuStates.MENU, F.text == BTN_VIEW)
 async def view_passwords(message: Message, state: FSMContext):
-    """View all user's passwords"""
-    user_id = user_sessions.get(message.from_user.id)
+    """List user's passwords, secrets are decrypted only when tapped"""
+    user_id = await user_sessions.get(message.from_user.id)
     if not user_id:
         await message.answer("❌ Ошибка: пользователь не авторизован")
         return
-    
 
-    from src.database.crud import UserRepository
-    db = Database(DB_PATH)
-    db.connect()
-    user = UserRepository.get_by_id(db, user_id)
-    
-    if not user:
-        await message.answer("❌ Ошибка: пользователь не найден")
-        db.close()
-        return
-    
-
-    success, passwords, msg = PasswordService.get_user_passwords(
-        db, user_id, user.username
-    )
-    db.close()
+    success, page, msg = await async_db.run(PasswordService.list_page, user_id)
     
     if not success:
         await message.answer(f"❌ {msg}")
         await state.set_state(MainMenuStates.MENU)
         return
     
-    if not passwords:
+    if not page["entries"]:
         await message.answer(
             "📭 У вас нет сохранённых паролей",
             reply_markup=get_main_menu_keyboard(),
         )
         await state.set_state(MainMenuStates.MENU)
         return
-    
 
-    message_text = "🔐 Ваши пароли:\n\n"
-    for pwd in passwords:
-        message_text += f"🔑 {pwd['service']}\n"
-        message_text += f"   Логин: {pwd['login']}\n"
-        message_text += f"   Пароль: {pwd['password']}\n\n"
-    
     await message.answer(
-        message_text,
-        reply_markup=get_main_menu_keyboard(),
+        _vault_text(page),
+        reply_markup=_page_keyboard(page, REVEAL_PREFIX),
     )
     await state.set_state(MainMenuStates.MENU)
 
 
+@router.callback_query(F.data.startswith(f"{PAGE_PREFIX}_"))
+async def page_callback(callback: CallbackQuery, state: FSMContext):
+    """Switch a vault view or selection keyboard to another page in place"""
+    user_id = await user_sessions.get(callback.from_user.id)
+    if not user_id:
+        await callback.answer("❌ Ошибка: пользователь не авторизован", show_alert=True)
+        return
+
+    try:
+        _, prefix, direction, anchor = callback.data.split("_")
+        anchor_id = int(anchor)
+    except ValueError:
+        await callback.answer("❌ Ошибка: неверный формат", show_alert=True)
+        return
+
+    success, page, msg = await async_db.run(
+        PasswordService.list_page,
+        user_id,
+        anchor_id if direction == "next" else None,
+        anchor_id if direction == "prev" else None,
+    )
+
+    if not success:
+        await callback.answer(f"❌ {msg}", show_alert=True)
+        return
+
+    if not page["entries"]:
+        await callback.answer("📭 У вас нет сохранённых паролей", show_alert=True)
+        return
+
+    if prefix == REVEAL_PREFIX:
+        await callback.message.edit_text(_vault_text(page), reply_markup=_page_keyboard(page, prefix))
+    else:
+        await callback.message.edit_reply_markup(reply_markup=_page_keyboard(page, prefix))
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith(f"{REVEAL_PREFIX}_"))
+async def reveal_password_callback(callback: CallbackQuery, state: FSMContext):
+    """Decrypt and show one password from the vault view"""
+    user_id = await user_sessions.get(callback.from_user.id)
+    if not user_id:
+        await callback.answer("❌ Ошибка: пользователь не авторизован", show_alert=True)
+        return
+
+    try:
+        password_id = int(callback.data.split("_")[1])
+    except (ValueError, IndexError):
+        await callback.answer("❌ Ошибка: неверный формат", show_alert=True)
+        return
+
+    user = await AsyncUserRepository.get_by_id(async_db, user_id)
+    if not user:
+        await callback.answer("❌ Ошибка: пользователь не найден", show_alert=True)
+        return
+
+    success, pwd, msg = await PasswordService.reveal_password_async(
+        async_db, user_id, password_id, user.username, view_id=callback.message.message_id
+    )
+
+    if not success:
+        await callback.answer(f"❌ {msg}", show_alert=True)
+        return
+
+    text = f"🔑 {pwd['service']}\nЛогин: {pwd['login']}\nПароль: {pwd['password']}"
+    if len(text) <= ALERT_MAX_LENGTH:
+        await callback.answer(text, show_alert=True)
+    else:
+        await callback.message.answer(text)
+        await callback.answer()
+
+
+@router.message(Command("find"))
+async def find_passwords(message: Message, command: CommandObject, state: FSMContext):
+    """Find entries by service or login, secrets are decrypted only when tapped"""
+    user_id = await user_sessions.get(message.from_user.id)
+    if not user_id:
+        await message.answer("❌ Ошибка: пользователь не авторизован")
+        return
+
+    if not command.args:
+        await message.answer("Использование: /find <текст>")
+        return
+
+    success, entries, msg = await async_db.run(PasswordService.search_entries, user_id, command.args)
+
+    if not success:
+        await message.answer(f"❌ {msg}")
+        return
+
+    if not entries:
+        await message.answer("🔎 Ничего не найдено")
+        return
+
+    await message.answer(
+        f"🔎 Найдено: {len(entries)}\n\nНажмите на запись, чтобы показать пароль",
+        reply_markup=get_passwords_inline_keyboard(entries, prefix=REVEAL_PREFIX),
+    )
+    await state.set_state(MainMenuStates.MENU)
+
+
+@router.inline_query()
+async def inline_find_passwords(inline_query: InlineQuery):
+    """Suggest entries by service or login in inline mode, never including secrets"""
+    user_id = await user_sessions.get(inline_query.from_user.id)
+    if not user_id:
+        await inline_query.answer(
+            [],
+            is_personal=True,
+            cache_time=0,
+            button=InlineQueryResultsButton(text="🔑 Войти в бота", start_parameter="login"),
+        )
+        return
+
+    success, entries, _ = await async_db.run(
+        PasswordService.search_entries, user_id, inline_query.query, INLINE_RESULTS_LIMIT
+    )
+    results = [
+        InlineQueryResultArticle(
+            id=str(entry["id"]),
+            title=entry["service"],
+            description=entry["login"],
+            input_message_content=InputTextMessageContent(
+                message_text=f"🔑 {entry['service']}\nЛогин: {entry['login']}"
+            ),
+        )
+        for entry in (entries if success else [])
+    ]
+    await inline_query.answer(results, is_personal=True, cache_time=0)
+
+
 @router.message(MainMenuStates.MENU, F.text == BTN_DELETE)
 async def delete_password_start(message: Message, state: FSMContext):
     """Start password deletion"""
-    user_id = user_sessions.get(message.from_user.id)
+    user_id = await user_sessions.get(message.from_user.id)
     if not user_id:
         await message.answer("❌ Ошибка: пользователь не авторизован")
         return
     
-    from src.database.crud import UserRepository
-    db = Database(DB_PATH)
-    db.connect()
-    user = UserRepository.get_by_id(db, user_id)
+    success, page, msg = await async_db.run(PasswordService.list_page, user_id)
     
-    if not user:
-        await message.answer("❌ Ошибка: пользователь не найден")
-        db.close()
-        return
-    
-
-    success, passwords, msg = PasswordService.get_user_passwords(
-        db, user_id, user.username
-    )
-    db.close()
-    
-    if not passwords:
+    if not success or not page["entries"]:
         await message.answer(
             "📭 У вас нет сохранённых паролей для удаления",
             reply_markup=get_main_menu_keyboard(),
@@ -204,8 +324,8 @@ async def delete_password_start(message: Message, state: FSMContext):
         return
     
     await message.answer(
-        "Выберите пароль для удаления:",
-        reply_markup=get_passwords_inline_keyboard(passwords),
+        "Выберите пароль для удаления или введите название сервиса:",
+        reply_markup=_page_keyboard(page, SELECT_PREFIX),
     )
     await state.set_state(MainMenuStates.DELETE_PASSWORD)
 
@@ -213,27 +333,14 @@ async def delete_password_start(message: Message, state: FSMContext):
 @router.message(MainMenuStates.MENU, F.text == BTN_UPDATE)
 async def update_password_start(message: Message, state: FSMContext):
     """Start password update"""
-    user_id = user_sessions.get(message.from_user.id)
+    user_id = await user_sessions.get(message.from_user.id)
     if not user_id:
         await message.answer("❌ Ошибка: пользователь не авторизован")
         return
 
-    from src.database.crud import UserRepository
-    db = Database(DB_PATH)
-    db.connect()
-    user = UserRepository.get_by_id(db, user_id)
+    success, page, msg = await async_db.run(PasswordService.list_page, user_id)
     
-    if not user:
-        await message.answer("❌ Ошибка: пользователь не найден")
-        db.close()
-        return
-
-    success, passwords, msg = PasswordService.get_user_passwords(
-        db, user_id, user.username
-    )
-    db.close()
-    
-    if not passwords:
+    if not success or not page["entries"]:
         await message.answer(
             "📭 У вас нет сохранённых паролей для обновления",
             reply_markup=get_main_menu_keyboard(),
@@ -242,8 +349,8 @@ async def update_password_start(message: Message, state: FSMContext):
         return
     
     await message.answer(
-        "Выберите пароль для обновления:",
-        reply_markup=get_passwords_inline_keyboard(passwords),
+        "Выберите пароль для обновления или введите название сервиса:",
+        reply_markup=_page_keyboard(page, SELECT_PREFIX),
     )
     await state.set_state(MainMenuStates.UPDATE_PASSWORD_ID)
 
@@ -255,10 +362,27 @@ async def back_handler(message: Message, state: FSMContext):
     await state.set_state(MainMenuStates.MENU)
 
 
+async def _find_typed(message: Message) -> list:
+    """Entries with a service name similar to the typed text, best first"""
+    user_id = await user_sessions.get(message.from_user.id)
+    if not user_id or not message.text:
+        return []
+    matches = await AsyncPasswordRepository.fuzzy_find(async_db, user_id, message.text.strip(), FUZZY_MATCHES)
+    return [{"id": pwd.id, "service": pwd.service, "login": pwd.login} for pwd in matches]
+
+
 @router.message(MainMenuStates.DELETE_PASSWORD)
 async def delete_password_handler(message: Message, state: FSMContext):
-    """Handle password deletion after selection"""
-    await message.answer("❌ Пожалуйста, выберите пароль из кнопок выше")
+    """Offer the entries best matching a typed service name for deletion"""
+    matches = await _find_typed(message)
+    if not matches:
+        await message.answer("❌ Ничего похожего не найдено, выберите пароль из кнопок выше")
+        return
+
+    await message.answer(
+        f"Лучшее совпадение: {matches[0]['service']}\nНажмите на запись, чтобы удалить:",
+        reply_markup=get_passwords_inline_keyboard(matches, prefix=SELECT_PREFIX),
+    )
 
 
 @router.callback_query(MainMenuStates.DELETE_PASSWORD)
@@ -271,10 +395,7 @@ async def delete_password_callback(callback: CallbackQuery, state: FSMContext):
         await callback.answer()
         return
     
-    db = Database(DB_PATH)
-    db.connect()
-    success = PasswordRepository.delete(db, password_id)
-    db.close()
+    success = await AsyncPasswordRepository.delete(async_db, password_id)
     
     if success:
         await callback.message.answer("✅ Пароль удален успешно!", reply_markup=get_main_menu_keyboard())
@@ -285,10 +406,30 @@ async def delete_password_callback(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 
+async def _select_for_update(message: Message, state: FSMContext, password: Password) -> None:
+    """Remember the chosen entry and ask what to update"""
+    await state.update_data(password_id=password.id)
+    await message.answer(
+        f"Выбран: {password.service}\n\nЧто обновить?\n1️⃣ Логин\n2️⃣ Пароль",
+        reply_markup=get_cancel_keyboard(),
+    )
+    await state.set_state(MainMenuStates.UPDATE_PASSWORD_CHOICE)
+
+
 @router.message(MainMenuStates.UPDATE_PASSWORD_ID)
 async def update_password_id_handler(message: Message, state: FSMContext):
-    """Handle password ID selection for update"""
-    await message.answer("❌ Пожалуйста, выберите пароль из кнопок выше")
+    """Jump to the entry best matching a typed service name"""
+    matches = await _find_typed(message)
+    if not matches:
+        await message.answer("❌ Ничего похожего не найдено, выберите пароль из кнопок выше")
+        return
+
+    password = await AsyncPasswordRepository.get_by_id(async_db, matches[0]["id"])
+    if not password:
+        await message.answer("❌ Ошибка: пароль не найден")
+        return
+
+    await _select_for_update(message, state, password)
 
 
 @router.callback_query(MainMenuStates.UPDATE_PASSWORD_ID)
@@ -301,10 +442,7 @@ async def update_password_id_callback(callback: CallbackQuery, state: FSMContext
         await callback.answer()
         return
 
-    db = Database(DB_PATH)
-    db.connect()
-    password = PasswordRepository.get_by_id(db, password_id)
-    db.close()
+    password = await AsyncPasswordRepository.get_by_id(async_db, password_id)
     
     if not password:
         await callback.message.answer("❌ Ошибка: пароль не найден")
@@ -312,13 +450,7 @@ async def update_password_id_callback(callback: CallbackQuery, state: FSMContext
         await callback.answer()
         return
     
-    # Store password ID and ask what to update
-    await state.update_data(password_id=password_id)
-    await callback.message.answer(
-        f"Выбран: {password.service}\n\nЧто обновить?\n1️⃣ Логин\n2️⃣ Пароль",
-        reply_markup=get_cancel_keyboard(),
-    )
-    await state.set_state(MainMenuStates.UPDATE_PASSWORD_CHOICE)
+    await _select_for_update(callback.message, state, password)
     await callback.answer()
 
 
@@ -350,21 +482,16 @@ async def update_password_login_handler(message: Message, state: FSMContext):
         await state.set_state(MainMenuStates.MENU)
         return
     
-    db = Database(DB_PATH)
-    db.connect()
-    password = PasswordRepository.get_by_id(db, password_id)
+    password = await AsyncPasswordRepository.get_by_id(async_db, password_id)
     
     if password:
-        password.login = new_login
-        success = PasswordRepository.update(db, password)
-        db.close()
+        success = await AsyncPasswordRepository.update_details(async_db, password.id, password.service, new_login)
         
         if success:
             await message.answer("✅ Логин обновлен!", reply_markup=get_main_menu_keyboard())
         else:
             await message.answer("❌ Ошибка при обновлении", reply_markup=get_main_menu_keyboard())
     else:
-        db.close()
         await message.answer("❌ Пароль не найден", reply_markup=get_main_menu_keyboard())
     
     await state.set_state(MainMenuStates.MENU)
@@ -377,7 +504,7 @@ async def update_password_password_handler(message: Message, state: FSMContext):
     
     data = await state.get_data()
     password_id = data.get("password_id")
-    user_id = user_sessions.get(message.from_user.id)
+    user_id = await user_sessions.get(message.from_user.id)
     
     if not password_id:
         await message.answer("❌ Ошибка: пароль не найден")
@@ -389,27 +516,17 @@ async def update_password_password_handler(message: Message, state: FSMContext):
         await state.set_state(MainMenuStates.MENU)
         return
     
-    from src.database.crud import UserRepository
-    db = Database(DB_PATH)
-    db.connect()
-    user = UserRepository.get_by_id(db, user_id)
-    password = PasswordRepository.get_by_id(db, password_id)
-    db.close()
+    user = await AsyncUserRepository.get_by_id(async_db, user_id)
+    password = await AsyncPasswordRepository.get_by_id(async_db, password_id)
     
     if not user or not password:
         await message.answer("❌ Ошибка: не найдены данные", reply_markup=get_main_menu_keyboard())
         await state.set_state(MainMenuStates.MENU)
         return
     
-    from src.security import EncryptionService
-
-    encrypted_pwd = EncryptionService.encrypt_password(new_password, user.username)
-    password.password = encrypted_pwd
-    
-    db = Database(DB_PATH)
-    db.connect()
-    success = PasswordRepository.update(db, password)
-    db.close()
+    stored = password.password if isinstance(password.password, str) else bytes(password.password)
+    password.password = await PasswordService.encrypt_secret_async(async_db, user_id, new_password, user.username)
+    success = await AsyncPasswordRepository.update(async_db, password, stored)
     
     if success:
         await message.answer("✅ Пароль обновлен!", reply_markup=get_main_menu_keyboard())
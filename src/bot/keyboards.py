@@ -1,6 +1,9 @@
 """Keyboard builders for Telegram Bot"""
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
-from src.config import BTN_REGISTER, BTN_LOGIN, BTN_ADD, BTN_VIEW, BTN_UPDATE, BTN_DELETE, BTN_BACK, BTN_CANCEL, BTN_CONFIRM
+from src.config import BTN_REGISTER, BTN_LOGIN, BTN_ADD, BTN_VIEW, BTN_UPDATE, BTN_DELETE, BTN_LOGOUT, BTN_BACK, BTN_CANCEL, BTN_CONFIRM
+from src.config import BTN_PREV_PAGE, BTN_NEXT_PAGE
+
+PAGE_PREFIX = "page"
 
 
 def get_auth_keyboard() -> ReplyKeyboardMarkup:
@@ -17,6 +20,7 @@ def get_main_menu_keyboard() -> ReplyKeyboardMarkup:
     keyboard = [
         [KeyboardButton(text=BTN_ADD), KeyboardButton(text=BTN_VIEW)],
         [KeyboardButton(text=BTN_UPDATE), KeyboardButton(text=BTN_DELETE)],
+        [KeyboardButton(text=BTN_LOGOUT)],
     ]
     return ReplyKeyboardMarkup(keyboard=keyboard, resize_keyboard=True)
 
@@ -41,21 +45,42 @@ def get_confirm_keyboard() -> ReplyKeyboardMarkup:
     return ReplyKeyboardMarkup(keyboard=keyboard, resize_keyboard=True)
 
 
-def get_passwords_inline_keyboard(passwords: list) -> InlineKeyboardMarkup:
+def get_passwords_inline_keyboard(
+    passwords: list,
+    prefix: str = "pwd",
+    has_prev: bool = False,
+    has_next: bool = False,
+) -> InlineKeyboardMarkup:
     """
     Get inline keyboard for password selection.
     
     Args:
         passwords: List of password records
+        prefix: Callback data prefix, the record ID follows an underscore
+        has_prev: Add a button to the previous page
+        has_next: Add a button to the next page
         
     Returns:
-        InlineKeyboardMarkup with password options
+        InlineKeyboardMarkup with password options and page navigation.
+        Navigation callback data is ``page_<prefix>_<prev|next>_<anchor ID>``.
     """
     keyboard = []
     for pwd in passwords:
-        callback_data = f"pwd_{pwd['id']}"
+        callback_data = f"{prefix}_{pwd['id']}"
         button_text = f"🔐 {pwd['service']} ({pwd['login']})"
         keyboard.append(
             [InlineKeyboardButton(text=button_text, callback_data=callback_data)]
         )
+
+    navigation = []
+    if has_prev and passwords:
+        navigation.append(
+            InlineKeyboardButton(text=BTN_PREV_PAGE, callback_data=f"{PAGE_PREFIX}_{prefix}_prev_{passwords[0]['id']}")
+        )
+    if has_next and passwords:
+        navigation.append(
+            InlineKeyboardButton(text=BTN_NEXT_PAGE, callback_data=f"{PAGE_PREFIX}_{prefix}_next_{passwords[-1]['id']}")
+        )
+    if navigation:
+        keyboard.append(navigation)
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
@@ -0,0 +1,235 @@
+"""FSM storage on a local SQLite file shared by bot processes"""
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from src.config import (
+    FSM_DB_PATH,
+    FSM_STORAGE,
+    FSM_STATE_TTL,
+    FSM_WRITE_WINDOW,
+    FSM_CACHE_MAX_ENTRIES,
+    FSM_CACHE_CHECK_INTERVAL,
+)
+from src.database.async_db import AsyncDatabase
+from src.database.db import Database
+from src.database.pool import ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# State, data and wall clock time of the last write
+_Row = Tuple[Optional[str], Dict[str, Any], float]
+
+# Cached for keys without a row, already past any TTL
+_ABSENT: _Row = (None, {}, 0.0)
+
+
+def _storage_key(key: StorageKey) -> str:
+    return ":".join(
+        "" if part is None else str(part)
+        for part in (key.bot_id, key.chat_id, key.user_id, key.thread_id, key.business_connection_id, key.destiny)
+    )
+
+
+def _create_table(db: Database) -> None:
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS fsm_storage (
+            key TEXT PRIMARY KEY,
+            state TEXT,
+            data TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        ) WITHOUT ROWID
+    """)
+    db.execute("CREATE INDEX IF NOT EXISTS idx_fsm_storage_updated ON fsm_storage(updated_at)")
+    db.commit()
+
+
+def _load_row(db: Database, key: str) -> Tuple[int, Optional[_Row]]:
+    version = db.execute("PRAGMA data_version").fetchone()[0]
+    row = db.execute("SELECT state, data, updated_at FROM fsm_storage WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return version, None
+    return version, (row[0], json.loads(row[1]), row[2])
+
+
+def _save_rows(db: Database, rows: List[Tuple[str, _Row]], expired_before: float) -> None:
+    try:
+        db.executemany(
+            "INSERT OR REPLACE INTO fsm_storage (key, state, data, updated_at) VALUES (?, ?, ?, ?)",
+            [(key, state, json.dumps(data), updated_at) for key, (state, data, updated_at) in rows if state or data],
+        )
+        db.executemany(
+            "DELETE FROM fsm_storage WHERE key = ?",
+            [(key,) for key, (state, data, _) in rows if not state and not data],
+        )
+        db.execute("DELETE FROM fsm_storage WHERE updated_at < ?", (expired_before,))
+        db.commit()
+    except sqlite3.Error:
+        db.rollback()
+        raise
+
+
+class SqliteStorage(BaseStorage):
+    """
+    FSM storage in a SQLite table, shared by bot processes on one host.
+
+    Writes land in an in-process cache right away and are flushed in one
+    transaction ``window`` seconds after the first pending one, coalescing
+    repeated writes to the same key; a failed flush is retried one window
+    later. Reads are served from the cache while the database was checked
+    for commits by other processes less than ``check_interval`` seconds
+    ago; a commit seen there drops the cache.
+    Conversations not written to for ``ttl`` seconds read as empty and are
+    deleted on the next flush. Data must be JSON serializable.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        pool: Optional[ConnectionPool] = None,
+        ttl: float = FSM_STATE_TTL,
+        window: float = FSM_WRITE_WINDOW,
+        max_entries: int = FSM_CACHE_MAX_ENTRIES,
+        check_interval: float = FSM_CACHE_CHECK_INTERVAL,
+    ):
+        self.pool = pool or ConnectionPool(db_path)
+        self.db = AsyncDatabase(db_path, pool=self.pool)
+        self.ttl = ttl
+        self.window = window
+        self.max_entries = max_entries
+        self.check_interval = check_interval
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+        self._cache: "OrderedDict[str, _Row]" = OrderedDict()
+        self._pending: Dict[str, _Row] = {}
+        self._version: Optional[int] = None
+        self._checked_at = float("-inf")
+        self._prepared = False
+        self._flusher: Optional[asyncio.Task] = None
+        self._owns_pool = pool is None
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        _, data, _ = await self._row(_storage_key(key))
+        self._put(_storage_key(key), state.state if isinstance(state, State) else state, data)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        state, _, _ = await self._row(_storage_key(key))
+        return state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        state, _, _ = await self._row(_storage_key(key))
+        self._put(_storage_key(key), state, dict(data))
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        _, data, _ = await self._row(_storage_key(key))
+        return data.copy()
+
+    async def flush(self) -> None:
+        """Write pending changes now, retrying them later if the write fails"""
+        if self._flusher is not None and self._flusher is not asyncio.current_task():
+            self._flusher.cancel()
+        self._flusher = None
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            await self._prepare()
+            await self.db.run(_save_rows, list(pending.items()), time.time() - self.ttl)
+        except sqlite3.Error as e:
+            logger.error(f"Error saving FSM states: {e}")
+            self._pending = {**pending, **self._pending}
+            if self._flusher is None:
+                self._flusher = asyncio.create_task(self._flush_later())
+            return
+        self.flushes += 1
+
+    async def close(self) -> None:
+        """Flush pending changes and release the connection"""
+        await self.flush()
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+            logger.error(f"Dropped {len(self._pending)} unsaved FSM states on close")
+        await self.db.close()
+        if self._owns_pool:
+            self.pool.close()
+
+    async def _prepare(self) -> None:
+        if not self._prepared:
+            await self.db.run(_create_table)
+            self._prepared = True
+
+    async def _row(self, key: str) -> _Row:
+        now = time.time()
+        row = self._pending.get(key)
+        if row is not None:
+            self.hits += 1
+        elif time.monotonic() - self._checked_at < self.check_interval and key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            row = self._cache[key]
+        else:
+            self.misses += 1
+            row = await self._load(key)
+        if row is None or now - row[2] > self.ttl:
+            return None, {}, now
+        return row
+
+    async def _load(self, key: str) -> Optional[_Row]:
+        await self._prepare()
+        checked_at = time.monotonic()
+        version, row = await self.db.run(_load_row, key)
+        if version != self._version:
+            self._cache.clear()
+            self._version = version
+        self._checked_at = checked_at
+        pending = self._pending.get(key)
+        if pending is not None:
+            return pending
+        self._remember(key, row or _ABSENT)
+        return row
+
+    def _put(self, key: str, state: Optional[str], data: Dict[str, Any]) -> None:
+        row = (state, data, time.time())
+        self._pending[key] = row
+        self._remember(key, row)
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_later())
+
+    def _remember(self, key: str, row: _Row) -> None:
+        self._cache[key] = row
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.window)
+        await self.flush()
+
+
+def create_storage(backend: str = FSM_STORAGE) -> BaseStorage:
+    """
+    Build the FSM storage selected in configuration.
+
+    Args:
+        backend: "sqlite" to share conversations through FSM_DB_PATH,
+            "memory" to keep them in this process only
+
+    Returns:
+        FSM storage for the Dispatcher
+    """
+    if backend == "memory":
+        return MemoryStorage()
+    if backend == "sqlite":
+        return SqliteStorage(FSM_DB_PATH)
+    raise ValueError(f"Unknown FSM storage: {backend}")
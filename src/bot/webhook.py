@@ -0,0 +1,140 @@
+"""Webhook server receiving updates from Telegram over aiohttp"""
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Optional
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+from src.config import (
+    WEBHOOK_MAX_CONCURRENCY,
+    WEBHOOK_MAX_PENDING,
+    WEBHOOK_DEDUP_SIZE,
+    WEBHOOK_DRAIN_TIMEOUT,
+    WEBHOOK_MAX_CONNECTIONS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookRequestHandler(SimpleRequestHandler):
+    """
+    Acknowledge updates at once and process them in the background.
+
+    Updates whose ``update_id`` was accepted recently are Telegram retries
+    and are acknowledged without processing. At most ``max_concurrency``
+    updates are processed at a time; once ``max_pending`` are waiting, new
+    ones are refused with 503 so Telegram delivers them again later.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        secret_token: Optional[str] = None,
+        max_concurrency: int = WEBHOOK_MAX_CONCURRENCY,
+        max_pending: int = WEBHOOK_MAX_PENDING,
+        dedup_size: int = WEBHOOK_DEDUP_SIZE,
+        drain_timeout: float = WEBHOOK_DRAIN_TIMEOUT,
+        **data: Any,
+    ):
+        super().__init__(dispatcher, bot, handle_in_background=True, secret_token=secret_token, **data)
+        self.max_pending = max_pending
+        self.dedup_size = dedup_size
+        self.drain_timeout = drain_timeout
+        self.duplicates = 0
+        self.refused = 0
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._seen: "OrderedDict[int, None]" = OrderedDict()
+
+    async def close(self) -> None:
+        """Let accepted updates finish, then close the bot session"""
+        tasks = set(self._background_feed_update_tasks)
+        if tasks:
+            _, unfinished = await asyncio.wait(tasks, timeout=self.drain_timeout)
+            if unfinished:
+                logger.warning(f"Cancelled {len(unfinished)} updates still processing at shutdown")
+                for task in unfinished:
+                    task.cancel()
+        await super().close()
+
+    async def _handle_request_background(self, bot: Bot, request: web.Request) -> web.Response:
+        update = await request.json(loads=bot.session.json_loads)
+        update_id = update.get("update_id")
+        if update_id in self._seen:
+            self.duplicates += 1
+            return web.json_response({}, dumps=bot.session.json_dumps)
+        if len(self._background_feed_update_tasks) >= self.max_pending:
+            self.refused += 1
+            return web.Response(status=503, text="Too many pending updates")
+
+        if update_id is not None:
+            self._seen[update_id] = None
+            while len(self._seen) > self.dedup_size:
+                self._seen.popitem(last=False)
+        task = asyncio.create_task(self._limited_feed_update(bot, update))
+        self._background_feed_update_tasks.add(task)
+        task.add_done_callback(self._background_feed_update_tasks.discard)
+        return web.json_response({}, dumps=bot.session.json_dumps)
+
+    async def _limited_feed_update(self, bot: Bot, update: dict) -> None:
+        async with self._slots:
+            await self._background_feed_update(bot, update)
+
+
+def create_app(dispatcher: Dispatcher, bot: Bot, path: str, secret_token: Optional[str] = None) -> web.Application:
+    """
+    Build the aiohttp application serving the webhook.
+
+    Args:
+        dispatcher: Dispatcher with the bot routers
+        bot: Bot the updates belong to
+        path: URL path Telegram posts updates to
+        secret_token: Value Telegram must send in X-Telegram-Bot-Api-Secret-Token
+
+    Returns:
+        Application running dispatcher startup and shutdown with its own
+    """
+    app = web.Application()
+    WebhookRequestHandler(dispatcher, bot, secret_token=secret_token).register(app, path=path)
+    setup_application(app, dispatcher, bot=bot)
+    return app
+
+
+async def run_webhook(
+    dispatcher: Dispatcher,
+    bot: Bot,
+    url: str,
+    host: str,
+    port: int,
+    path: str,
+    secret_token: Optional[str] = None,
+) -> None:
+    """
+    Serve the webhook and point Telegram at it, until cancelled.
+
+    Args:
+        dispatcher: Dispatcher with the bot routers
+        bot: Bot the updates belong to
+        url: Public base URL Telegram reaches this server at
+        host: Interface to listen on
+        port: Port to listen on
+        path: URL path Telegram posts updates to
+        secret_token: Value Telegram must send in X-Telegram-Bot-Api-Secret-Token
+    """
+    runner = web.AppRunner(create_app(dispatcher, bot, path, secret_token))
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host, port).start()
+        await bot.set_webhook(
+            f"{url.rstrip('/')}{path}",
+            secret_token=secret_token,
+            allowed_updates=dispatcher.resolve_used_update_types(),
+            max_connections=WEBHOOK_MAX_CONNECTIONS,
+        )
+        logger.info(f"Webhook listening on {host}:{port}{path}")
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
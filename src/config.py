@@ -16,10 +16,64 @@ DATA_DIR.mkdir(exist_ok=True)
 
 # ==================== TELEGRAM ====================
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
+VAULT_PAGE_SIZE = int(os.getenv("VAULT_PAGE_SIZE", "10"))
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "")
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+
+# ==================== WEBHOOK ====================
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "") or None
+WEBHOOK_MAX_CONCURRENCY = int(os.getenv("WEBHOOK_MAX_CONCURRENCY", "64"))
+WEBHOOK_MAX_PENDING = int(os.getenv("WEBHOOK_MAX_PENDING", "1024"))
+WEBHOOK_DEDUP_SIZE = int(os.getenv("WEBHOOK_DEDUP_SIZE", "10000"))
+WEBHOOK_DRAIN_TIMEOUT = float(os.getenv("WEBHOOK_DRAIN_TIMEOUT", "10"))
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
 
 # ==================== DATABASE SETTINGS ====================
 DATABASE_URL = f"sqlite:///{DB_PATH}"
 DATABASE_CHECK_SAME_THREAD = False
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+DB_JOURNAL_MODE = os.getenv("DB_JOURNAL_MODE", "WAL")
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")
+DB_CACHE_SIZE = int(os.getenv("DB_CACHE_SIZE", "-16000"))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+DB_BUSY_TIMEOUT = int(os.getenv("DB_BUSY_TIMEOUT", "5000"))
+DB_CACHED_STATEMENTS = int(os.getenv("DB_CACHED_STATEMENTS", "256"))
+DB_WRITE_WINDOW = float(os.getenv("DB_WRITE_WINDOW", "0.002"))
+DB_WRITE_BATCH = int(os.getenv("DB_WRITE_BATCH", "512"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "300"))
+VAULT_CACHE_MAX_ENTRIES = int(os.getenv("VAULT_CACHE_MAX_ENTRIES", "50000"))
+VAULT_CACHE_TTL = float(os.getenv("VAULT_CACHE_TTL", "30"))
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "sqlite")
+SESSION_IDLE_TTL = float(os.getenv("SESSION_IDLE_TTL", str(24 * 60 * 60)))
+SESSION_ABSOLUTE_TTL = float(os.getenv("SESSION_ABSOLUTE_TTL", str(7 * 24 * 60 * 60)))
+SESSION_TOUCH_INTERVAL = float(os.getenv("SESSION_TOUCH_INTERVAL", "60"))
+SESSION_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", "300"))
+FSM_STORAGE = os.getenv("FSM_STORAGE", "sqlite")
+FSM_DB_PATH = Path(os.getenv("FSM_DB_PATH", str(DATA_DIR / "fsm.db")))
+FSM_STATE_TTL = float(os.getenv("FSM_STATE_TTL", str(24 * 60 * 60)))
+FSM_WRITE_WINDOW = float(os.getenv("FSM_WRITE_WINDOW", "0.002"))
+FSM_CACHE_MAX_ENTRIES = int(os.getenv("FSM_CACHE_MAX_ENTRIES", "10000"))
+FSM_CACHE_CHECK_INTERVAL = float(os.getenv("FSM_CACHE_CHECK_INTERVAL", "0.05"))
+
+# ==================== SECURITY ====================
+KEY_CACHE_MAX_ENTRIES = int(os.getenv("KEY_CACHE_MAX_ENTRIES", "4096"))
+KEY_CACHE_IDLE_TTL = float(os.getenv("KEY_CACHE_IDLE_TTL", "900"))
+REVEAL_CACHE_MAX_ENTRIES = int(os.getenv("REVEAL_CACHE_MAX_ENTRIES", "256"))
+REVEAL_CACHE_TTL = float(os.getenv("REVEAL_CACHE_TTL", "60"))
+KEY_CACHE_SWEEP_INTERVAL = float(os.getenv("KEY_CACHE_SWEEP_INTERVAL", "30"))
+CRYPTO_POOL_WORKERS = int(os.getenv("CRYPTO_POOL_WORKERS", "0")) or None
+CRYPTO_POOL_START_METHOD = os.getenv("CRYPTO_POOL_START_METHOD", "forkserver")
+KDF_ALGORITHM = os.getenv("KDF_ALGORITHM", "pbkdf2-sha256")
+KDF_ITERATIONS = int(os.getenv("KDF_ITERATIONS", "100000"))
+KDF_SCRYPT_N = int(os.getenv("KDF_SCRYPT_N", "16384"))
+KDF_SCRYPT_R = int(os.getenv("KDF_SCRYPT_R", "8"))
+KDF_SCRYPT_P = int(os.getenv("KDF_SCRYPT_P", "1"))
+CIPHER_SUITE = os.getenv("CIPHER_SUITE", "aes-256-gcm")
 
 # ==================== LOGGING ====================
 DEBUG = os.getenv("DEBUG", "False").lower() == "true"
@@ -87,3 +141,5 @@ BTN_LOGOUT = "🚪 Выход"
 BTN_BACK = "⬅️ Назад"
 BTN_CANCEL = "❌ Отмена"
 BTN_CONFIRM = "✅ Подтвердить"
+BTN_PREV_PAGE = "◀️"
+BTN_NEXT_PAGE = "▶️"
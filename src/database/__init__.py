@@ -1,14 +1,31 @@
 """Database package initialization"""
 from src.database.db import Database, DatabaseInitializer
+from src.database.pool import ConnectionPool, db_pool
+from src.database.writer import DatabaseWriter, db_writer
+from src.database.cache import UserCache, VaultCache, user_cache, vault_cache
+from src.database.sessions import SessionStore, MemorySessionStore, SqliteSessionStore, session_store
 from src.database.models import User, Password
-from src.database.crud import UserRepository, PasswordRepository, UserCRUD, PasswordCRUD
+from src.database.crud import UserRepository, PasswordRepository, BlobMigrationRepository, UserCRUD, PasswordCRUD
 
 __all__ = [
     "Database",
     "DatabaseInitializer",
+    "ConnectionPool",
+    "db_pool",
+    "DatabaseWriter",
+    "db_writer",
+    "UserCache",
+    "user_cache",
+    "VaultCache",
+    "vault_cache",
+    "SessionStore",
+    "MemorySessionStore",
+    "SqliteSessionStore",
+    "session_store",
     "User",
     "Password",
     "UserRepository",
     "PasswordRepository",
+    "BlobMigrationRepository",
     "UserCRUD",
     "PasswordCRUD",]
\ No newline at end of file
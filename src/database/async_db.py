@@ -0,0 +1,131 @@
+"""Async database access on a dedicated thread"""
+import asyncio
+import functools
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+from src.config import DB_PATH
+from src.database.db import Database
+from src.database.crud import UserRepository, PasswordRepository
+from src.database.pool import ConnectionPool, db_pool
+from src.database.writer import DatabaseWriter, db_writer
+
+
+class AsyncDatabase:
+    """
+    Run blocking repository calls on one dedicated database thread.
+
+    The thread owns a single connection, so calls are serialized in
+    submission order while the event loop keeps serving other updates.
+    Writes go to the writer, when one is set, to be committed in groups.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        pool: Optional[ConnectionPool] = None,
+        writer: Optional[DatabaseWriter] = None,
+    ):
+        self.db_path = db_path
+        self.pool = pool
+        self.writer = writer
+        self._db: Optional[Database] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """
+        Call ``func(db, *args)`` on the database thread.
+
+        Args:
+            func: Function taking a Database as first argument
+            *args: Remaining arguments
+
+        Returns:
+            Function result
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="database")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, func, args)
+
+    async def write(self, func: Callable, *args: Any) -> Any:
+        """
+        Call ``func(db, *args)`` through the writer and wait for its group commit.
+
+        Args:
+            func: Repository write taking a Database as first argument
+            *args: Remaining arguments
+
+        Returns:
+            Function result
+        """
+        if self.writer is None:
+            return await self.run(func, *args)
+        return await asyncio.wrap_future(self.writer.submit(func, *args))
+
+    async def close(self) -> None:
+        """Release the connection and stop the database thread"""
+        if self._executor is None:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._disconnect)
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    def _call(self, func: Callable, args: tuple) -> Any:
+        if self._db is None:
+            self._db = Database(self.db_path, pool=self.pool)
+            self._db.connect()
+        return func(self._db, *args)
+
+    def _disconnect(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def _async_repository(repository: type, writes: Iterable[str] = ()) -> type:
+    """
+    Build a class with the repository's static methods as coroutines taking an AsyncDatabase.
+
+    Methods named in ``writes`` go through AsyncDatabase.write, the rest run
+    on the database thread. Generators are left out: they would be consumed
+    off the thread that owns the connection.
+    """
+    writes = frozenset(writes)
+
+    def wrap(name: str, func: Callable) -> staticmethod:
+        @functools.wraps(func)
+        async def method(db: AsyncDatabase, *args: Any) -> Any:
+            call = db.write if name in writes else db.run
+            return await call(getattr(repository, name), *args)
+
+        return staticmethod(method)
+
+    namespace = {
+        name: wrap(name, value.__func__)
+        for name, value in vars(repository).items()
+        if isinstance(value, staticmethod) and not inspect.isgeneratorfunction(value.__func__)
+    }
+    namespace["__doc__"] = f"Async counterpart of {repository.__name__}, calls run on the database thread"
+    return type(f"Async{repository.__name__}", (), namespace)
+
+
+AsyncUserRepository = _async_repository(
+    UserRepository,
+    writes=(
+        "create", "set_data_key", "update_password_hash", "replace_data_key",
+        "begin_rekey", "finish_rekey", "delete",
+    ),
+)
+AsyncPasswordRepository = _async_repository(
+    PasswordRepository,
+    writes=(
+        "create", "create_many", "upsert", "update", "update_details", "update_secrets",
+        "save_rekey_batch", "delete", "delete_many", "delete_all_for_user",
+    ),
+)
+
+async_db = AsyncDatabase(DB_PATH, pool=db_pool, writer=db_writer)
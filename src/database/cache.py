@@ -0,0 +1,333 @@
+"""Read-through caches for database records"""
+import bisect
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from src.config import USER_CACHE_MAX_ENTRIES, USER_CACHE_TTL, VAULT_CACHE_MAX_ENTRIES, VAULT_CACHE_TTL
+from src.database.models import User
+
+
+class UserCache:
+    """
+    Bounded LRU cache of user records with TTL, looked up by ID or username.
+
+    Entries are grouped by scope (the database path), so separate databases
+    never share records. Repositories fill it on reads and invalidate it on
+    every write to the users table; the TTL bounds staleness from writers
+    in other processes. Cached records are shared and must not be modified.
+    """
+
+    def __init__(self, max_entries: int = USER_CACHE_MAX_ENTRIES, ttl: float = USER_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._users: "OrderedDict[Tuple[Hashable, int], Tuple[User, float]]" = OrderedDict()
+        self._ids: Dict[Tuple[Hashable, str], int] = {}
+        self._lock = threading.Lock()
+
+    def get_by_id(self, scope: Hashable, user_id: int) -> Optional[User]:
+        """
+        Get cached user by ID.
+
+        Args:
+            scope: Database scope
+            user_id: User ID
+
+        Returns:
+            User if cached and not expired, None otherwise
+        """
+        with self._lock:
+            return self._get((scope, user_id))
+
+    def get_by_username(self, scope: Hashable, username: str) -> Optional[User]:
+        """
+        Get cached user by username.
+
+        Args:
+            scope: Database scope
+            username: Username
+
+        Returns:
+            User if cached and not expired, None otherwise
+        """
+        with self._lock:
+            user_id = self._ids.get((scope, username))
+            if user_id is None:
+                self.misses += 1
+                return None
+            return self._get((scope, user_id))
+
+    def put(self, scope: Hashable, user: User) -> None:
+        """
+        Store user, evicting least recently used entries over the bound.
+
+        Args:
+            scope: Database scope
+            user: User loaded from the database
+        """
+        with self._lock:
+            self._drop((scope, user.id))
+            self._users[(scope, user.id)] = (user, time.monotonic() + self.ttl)
+            self._ids[(scope, user.username)] = user.id
+            while len(self._users) > self.max_entries:
+                self._drop(next(iter(self._users)))
+
+    def invalidate(self, scope: Hashable, user_id: Optional[int] = None, username: Optional[str] = None) -> None:
+        """
+        Drop a user by ID and/or username.
+
+        Args:
+            scope: Database scope
+            user_id: User ID
+            username: Username
+        """
+        with self._lock:
+            if username is not None:
+                user_id = self._ids.pop((scope, username), user_id)
+            if user_id is not None:
+                self._drop((scope, user_id))
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters"""
+        with self._lock:
+            self._users.clear()
+            self._ids.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Hit and miss counters with current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._users),
+            }
+
+    def _get(self, cache_key: Tuple[Hashable, int]) -> Optional[User]:
+        entry = self._users.get(cache_key)
+        if entry is None or entry[1] < time.monotonic():
+            if entry is not None:
+                self._drop(cache_key)
+            self.misses += 1
+            return None
+        self._users.move_to_end(cache_key)
+        self.hits += 1
+        return entry[0]
+
+    def _drop(self, cache_key: Tuple[Hashable, int]) -> None:
+        entry = self._users.pop(cache_key, None)
+        if entry is not None:
+            name_key = (cache_key[0], entry[0].username)
+            if self._ids.get(name_key) == cache_key[1]:
+                del self._ids[name_key]
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+
+# (id, user_id, service, login, created_at, updated_at)
+VaultRow = tuple
+
+
+class _Vault:
+    """Metadata rows of one user kept in listing order"""
+
+    __slots__ = ("keys", "rows", "expires_at")
+
+    def __init__(self, rows: Iterable[VaultRow], expires_at: float):
+        self.expires_at = expires_at
+        self.rows: Dict[int, VaultRow] = {row[0]: row for row in rows}
+        self.keys: List[Tuple[str, int]] = sorted((row[2], row[0]) for row in self.rows.values())
+
+    def put(self, row: VaultRow) -> None:
+        self.remove(row[0])
+        self.rows[row[0]] = row
+        bisect.insort(self.keys, (row[2], row[0]))
+
+    def remove(self, password_id: int) -> bool:
+        row = self.rows.pop(password_id, None)
+        if row is None:
+            return False
+        index = bisect.bisect_left(self.keys, (row[2], row[0]))
+        del self.keys[index]
+        return True
+
+
+class VaultCache:
+    """
+    Non-secret metadata of active users' vaults, bounded by total entries.
+
+    A user's vault is either cached whole or not at all. PasswordRepository
+    loads it on first listing and writes every mutation through, so listings
+    and counts become memory lookups; least recently used vaults are evicted
+    when the total number of cached entries exceeds the bound. A vault is
+    reloaded ``ttl`` seconds after it was loaded, which bounds staleness from
+    writers in other processes.
+    """
+
+    def __init__(self, max_entries: int = VAULT_CACHE_MAX_ENTRIES, ttl: float = VAULT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._vaults: "OrderedDict[Tuple[Hashable, int], _Vault]" = OrderedDict()
+        self._size = 0
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def fits(self, entries: int) -> bool:
+        """Whether a vault of this size may be cached"""
+        return entries <= self.max_entries
+
+    def version(self) -> int:
+        """Mutation counter to take before reading rows for load"""
+        with self._lock:
+            return self._version
+
+    def load(self, scope: Hashable, user_id: int, rows: Iterable[VaultRow], version: int) -> bool:
+        """
+        Cache a user's whole vault, evicting least recently used vaults over the bound.
+
+        Rows are rejected if any mutation was written through since
+        ``version`` was taken, as they may predate it.
+
+        Args:
+            scope: Database scope
+            user_id: User ID
+            rows: Every metadata row of the user
+            version: Result of version() taken before reading the rows
+
+        Returns:
+            True if cached
+        """
+        vault = _Vault(rows, time.monotonic() + self.ttl)
+        if not self.fits(len(vault.rows)):
+            return False
+        with self._lock:
+            if version != self._version:
+                return False
+            self._drop((scope, user_id))
+            self._vaults[(scope, user_id)] = vault
+            self._size += len(vault.rows)
+            while self._size > self.max_entries:
+                self._drop(next(iter(self._vaults)))
+            return True
+
+    def count(self, scope: Hashable, user_id: int) -> Optional[int]:
+        """Number of entries of a cached vault, None if not cached"""
+        with self._lock:
+            vault = self._touch((scope, user_id))
+            return None if vault is None else len(vault.rows)
+
+    def rows(self, scope: Hashable, user_id: int) -> Optional[List[VaultRow]]:
+        """
+        Get every row of a cached vault in listing order.
+
+        Returns:
+            Rows ordered by (service, id), None if not cached
+        """
+        with self._lock:
+            vault = self._touch((scope, user_id))
+            if vault is None:
+                return None
+            return [vault.rows[password_id] for _, password_id in vault.keys]
+
+    def page(
+        self,
+        scope: Hashable,
+        user_id: int,
+        after: Optional[Tuple[str, int]] = None,
+        limit: int = 50,
+        before: Optional[Tuple[str, int]] = None,
+    ) -> Optional[List[VaultRow]]:
+        """
+        Get one page of a cached vault, same semantics as PasswordRepository.get_page.
+
+        Returns:
+            Rows ordered by (service, id), None if not cached
+        """
+        with self._lock:
+            vault = self._touch((scope, user_id))
+            if vault is None:
+                return None
+            if before is not None:
+                end = bisect.bisect_left(vault.keys, tuple(before))
+                keys = vault.keys[max(0, end - limit):end]
+            else:
+                start = 0 if after is None else bisect.bisect_right(vault.keys, tuple(after))
+                keys = vault.keys[start:start + limit]
+            return [vault.rows[password_id] for _, password_id in keys]
+
+    def put(self, scope: Hashable, user_id: int, row: VaultRow) -> None:
+        """Add or replace one row of a cached vault"""
+        with self._lock:
+            self._version += 1
+            vault = self._vaults.get((scope, user_id))
+            if vault is None:
+                return
+            added = row[0] not in vault.rows
+            vault.put(row)
+            if added:
+                self._size += 1
+                while self._size > self.max_entries:
+                    self._drop(next(iter(self._vaults)))
+
+    def remove(self, scope: Hashable, user_id: int, password_ids: Iterable[int]) -> None:
+        """Remove rows from a cached vault"""
+        with self._lock:
+            self._version += 1
+            vault = self._vaults.get((scope, user_id))
+            if vault is None:
+                return
+            for password_id in password_ids:
+                if vault.remove(password_id):
+                    self._size -= 1
+
+    def invalidate(self, scope: Hashable, user_id: int) -> None:
+        """Drop a user's vault"""
+        with self._lock:
+            self._version += 1
+            self._drop((scope, user_id))
+
+    def clear(self) -> None:
+        """Drop all vaults and reset counters"""
+        with self._lock:
+            self._vaults.clear()
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Hit and miss counters with cached users and entries"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "users": len(self._vaults), "entries": self._size}
+
+    def _touch(self, cache_key: Tuple[Hashable, int]) -> Optional[_Vault]:
+        vault = self._vaults.get(cache_key)
+        if vault is not None and vault.expires_at < time.monotonic():
+            self._drop(cache_key)
+            vault = None
+        if vault is None:
+            self.misses += 1
+            return None
+        self._vaults.move_to_end(cache_key)
+        self.hits += 1
+        return vault
+
+    def _drop(self, cache_key: Tuple[Hashable, int]) -> None:
+        vault = self._vaults.pop(cache_key, None)
+        if vault is not None:
+            self._size -= len(vault.rows)
+
+    def __len__(self) -> int:
+        return self._size
+
+
+user_cache = UserCache()
+vault_cache = VaultCache()
@@ -1,13 +1,49 @@
 """CRUD operations for User and Password records"""
 import sqlite3
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple, Union
 
+from src.database.cache import user_cache, vault_cache
 from src.database.db import Database
 from src.database.models import User, Password
+from src.database.trigrams import index_missing, similarity, trigrams
+
+
+# Password values are only written while the owner has no re-key running
+_NOT_REKEYING = "NOT EXISTS (SELECT 1 FROM users WHERE users.id = {} AND users.pending_data_key IS NOT NULL)"
+
+
+def _secret(value: Union[str, bytes]) -> Union[str, memoryview]:
+    """Expose BLOB ciphertexts as memoryview so parsing slices without copying"""
+    if isinstance(value, bytes):
+        return memoryview(value)
+    return value
+
+
+def _index_service(db: Database, password_id: int, user_id: int, service: str) -> None:
+    """Replace trigram index entries of a password record"""
+    db.execute("DELETE FROM password_trigrams WHERE password_id = ?", (password_id,))
+    db.executemany(
+        "INSERT OR IGNORE INTO password_trigrams (user_id, trigram, password_id) VALUES (?, ?, ?)",
+        [(user_id, gram, password_id) for gram in trigrams(service)],
+    )
+
+
+def _stored_password(row: tuple) -> Password:
+    """Build Password from an (id, user_id, service, login, password, created_at, updated_at) row"""
+    return Password(row[0], row[1], row[2], row[3], _secret(row[4]), row[5], row[6])
+
+
+def _listed_password(row: tuple) -> Password:
+    """Build Password without secret from an (id, user_id, service, login, created_at, updated_at) row"""
+    return Password(row[0], row[1], row[2], row[3], "", row[4], row[5])
 
 
 class UserRepository:
-    """Repository for User CRUD operations"""
+    """
+    Repository for User CRUD operations.
+    
+    Lookups read through user_cache; every write to a user row invalidates it.
+    """
 
     @staticmethod
     def create(db: Database, user: User) -> Optional[int]:
@@ -24,12 +60,13 @@ class UserRepository:
         try:
             cursor = db.execute(
                 """
-                INSERT INTO users (username, password_hash)
-                VALUES (?, ?)
+                INSERT INTO users (username, password_hash, data_key)
+                VALUES (?, ?, ?)
                 """,
-                (user.username, user.password_hash),
+                (user.username, user.password_hash, user.data_key),
             )
             db.commit()
+            db.after_commit(user_cache.invalidate, db.db_path, username=user.username)
             return cursor.lastrowid
         except sqlite3.IntegrityError:
             db.rollback()
@@ -51,20 +88,20 @@ class UserRepository:
         Returns:
             User object if found, None otherwise
         """
+        cached = user_cache.get_by_username(db.db_path, username)
+        if cached is not None:
+            return cached
         try:
             cursor = db.execute(
-                "SELECT id, username, password_hash, created_at, updated_at FROM users WHERE username = ?",
+                "SELECT id, username, password_hash, data_key, rekey_checkpoint, created_at, updated_at FROM users WHERE username = ?",
                 (username,),
             )
+            cursor.row_factory = None
             row = cursor.fetchone()
             if row:
-                return User(
-                    id=row["id"],
-                    username=row["username"],
-                    password_hash=row["password_hash"],
-                    created_at=row["created_at"],
-                    updated_at=row["updated_at"],
-                )
+                user = User(*row)
+                user_cache.put(db.db_path, user)
+                return user
             return None
         except sqlite3.Error as e:
             print(f"Database error getting user: {e}")
@@ -82,25 +119,198 @@ class UserRepository:
         Returns:
             User object if found, None otherwise
         """
+        cached = user_cache.get_by_id(db.db_path, user_id)
+        if cached is not None:
+            return cached
         try:
             cursor = db.execute(
-                "SELECT id, username, password_hash, created_at, updated_at FROM users WHERE id = ?",
+                "SELECT id, username, password_hash, data_key, rekey_checkpoint, created_at, updated_at FROM users WHERE id = ?",
                 (user_id,),
             )
+            cursor.row_factory = None
             row = cursor.fetchone()
             if row:
-                return User(
-                    id=row["id"],
-                    username=row["username"],
-                    password_hash=row["password_hash"],
-                    created_at=row["created_at"],
-                    updated_at=row["updated_at"],
-                )
+                user = User(*row)
+                user_cache.put(db.db_path, user)
+                return user
             return None
         except sqlite3.Error as e:
             print(f"Database error getting user by id: {e}")
             return None
 
+    @staticmethod
+    def set_data_key(db: Database, user_id: int, data_key: Union[str, bytes]) -> bool:
+        """
+        Store wrapped data key for a user that has none yet.
+        
+        Args:
+            db: Database instance
+            user_id: User ID
+            data_key: Wrapped data encryption key
+            
+        Returns:
+            True if stored, False if the user already has a key or on error
+        """
+        try:
+            cursor = db.execute(
+                """
+                UPDATE users SET data_key = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND data_key IS NULL
+                """,
+                (data_key, user_id),
+            )
+            db.commit()
+            db.after_commit(user_cache.invalidate, db.db_path, user_id)
+            return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            db.rollback()
+            print(f"Database error setting data key: {e}")
+            return False
+
+    @staticmethod
+    def update_password_hash(db: Database, user_id: int, password_hash: Union[str, bytes]) -> bool:
+        """
+        Replace user password hash.
+        
+        Args:
+            db: Database instance
+            user_id: User ID
+            password_hash: New encrypted password
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            cursor = db.execute(
+                "UPDATE users SET password_hash = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (password_hash, user_id),
+            )
+            db.commit()
+            db.after_commit(user_cache.invalidate, db.db_path, user_id)
+            return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            db.rollback()
+            print(f"Database error updating password hash: {e}")
+            return False
+
+    @staticmethod
+    def replace_data_key(
+        db: Database, user_id: int, old_data_key: Union[str, bytes], new_data_key: Union[str, bytes]
+    ) -> bool:
+        """
+        Replace wrapped data key if it was not changed concurrently.
+        
+        Args:
+            db: Database instance
+            user_id: User ID
+            old_data_key: Wrapped key currently expected on the row
+            new_data_key: New wrapped key
+            
+        Returns:
+            True if replaced, False otherwise
+        """
+        try:
+            cursor = db.execute(
+                """
+                UPDATE users SET data_key = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND data_key = ?
+                """,
+                (new_data_key, user_id, old_data_key),
+            )
+            db.commit()
+            db.after_commit(user_cache.invalidate, db.db_path, user_id)
+            return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            db.rollback()
+            print(f"Database error replacing data key: {e}")
+            return False
+
+    @staticmethod
+    def begin_rekey(db: Database, user_id: int, pending_data_key: bytes) -> bool:
+        """
+        Store the new wrapped data key and start re-key checkpointing.
+        
+        Args:
+            db: Database instance
+            user_id: User ID
+            pending_data_key: New data key wrapped with the new master password
+            
+        Returns:
+            True if started, False if a re-key is already in progress or on error
+        """
+        try:
+            cursor = db.execute(
+                """
+                UPDATE users SET pending_data_key = ?, rekey_checkpoint = 0, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND pending_data_key IS NULL
+                """,
+                (pending_data_key, user_id),
+            )
+            db.commit()
+            db.after_commit(user_cache.invalidate, db.db_path, user_id)
+            return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            db.rollback()
+            print(f"Database error starting re-key: {e}")
+            return False
+
+    @staticmethod
+    def get_rekey_state(db: Database, user_id: int) -> Optional[Tuple[bytes, int]]:
+        """
+        Get state of an interrupted re-key.
+        
+        Args:
+            db: Database instance
+            user_id: User ID
+            
+        Returns:
+            Tuple of (pending wrapped data key, last re-keyed password ID) or None
+        """
+        try:
+            cursor = db.execute(
+                "SELECT pending_data_key, rekey_checkpoint FROM users WHERE id = ? AND pending_data_key IS NOT NULL",
+                (user_id,),
+            )
+            cursor.row_factory = None
+            row = cursor.fetchone()
+            if row:
+                return row[0], row[1] or 0
+            return None
+        except sqlite3.Error as e:
+            print(f"Database error getting re-key state: {e}")
+            return None
+
+    @staticmethod
+    def finish_rekey(db: Database, user_id: int) -> bool:
+        """
+        Make the pending data key current once every row is behind the checkpoint.
+        
+        Args:
+            db: Database instance
+            user_id: User ID
+            
+        Returns:
+            True if finished, False if rows remain after the checkpoint or on error
+        """
+        try:
+            cursor = db.execute(
+                """
+                UPDATE users
+                SET data_key = pending_data_key, pending_data_key = NULL, rekey_checkpoint = NULL,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND pending_data_key IS NOT NULL
+                  AND NOT EXISTS (SELECT 1 FROM passwords WHERE user_id = users.id AND id > users.rekey_checkpoint)
+                """,
+                (user_id,),
+            )
+            db.commit()
+            db.after_commit(user_cache.invalidate, db.db_path, user_id)
+            return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            db.rollback()
+            print(f"Database error finishing re-key: {e}")
+            return False
+
     @staticmethod
     def delete(db: Database, user_id: int) -> bool:
         """
@@ -116,6 +326,7 @@ class UserRepository:
         try:
             db.execute("DELETE FROM users WHERE id = ?", (user_id,))
             db.commit()
+            db.after_commit(user_cache.invalidate, db.db_path, user_id)
             return True
         except sqlite3.Error as e:
             db.rollback()
@@ -124,7 +335,12 @@ class UserRepository:
 
 
 class PasswordRepository:
-    """Repository for Password record CRUD operations"""
+    """
+    Repository for Password record CRUD operations.
+    
+    Listings and counts read through vault_cache; every mutation writes
+    through to it.
+    """
 
     @staticmethod
     def create(db: Database, password: Password) -> Optional[int]:
@@ -142,17 +358,103 @@ class PasswordRepository:
             cursor = db.execute(
                 """
                 INSERT INTO passwords (user_id, service, login, password)
-                VALUES (?, ?, ?, ?)
-                """,
-                (password.user_id, password.service, password.login, password.password),
+                SELECT ?, ?, ?, ? WHERE {}
+                RETURNING id, user_id, service, login, created_at, updated_at
+                """.format(_NOT_REKEYING.format("?")),
+                (password.user_id, password.service, password.login, password.password, password.user_id),
             )
+            cursor.row_factory = None
+            row = cursor.fetchone()
+            if row is None:
+                db.rollback()
+                print("Database error creating password: vault re-key in progress")
+                return None
+            _index_service(db, row[0], row[1], row[2])
             db.commit()
-            return cursor.lastrowid
+            db.after_commit(vault_cache.put, db.db_path, row[1], row)
+            return row[0]
         except sqlite3.Error as e:
             db.rollback()
             print(f"Database error creating password: {e}")
             return None
 
+    @staticmethod
+    def create_many(db: Database, passwords: List[Password]) -> Optional[int]:
+        """
+        Create password records in one transaction, skipping existing entries.
+        
+        Args:
+            db: Database instance
+            passwords: Password objects
+            
+        Returns:
+            Number of created records if successful, None otherwise
+        """
+        try:
+            cursor = db.executemany(
+                """
+                INSERT INTO passwords (user_id, service, login, password)
+                SELECT ?, ?, ?, ? WHERE {}
+                ON CONFLICT (user_id, service, login) DO NOTHING
+                """.format(_NOT_REKEYING.format("?")),
+                [(pwd.user_id, pwd.service, pwd.login, pwd.password, pwd.user_id) for pwd in passwords],
+            )
+            created = cursor.rowcount
+            user_ids = {pwd.user_id for pwd in passwords}
+            for user_id in user_ids:
+                index_missing(db, user_id)
+            db.commit()
+            for user_id in user_ids:
+                db.after_commit(vault_cache.invalidate, db.db_path, user_id)
+            return created
+        except sqlite3.Error as e:
+            db.rollback()
+            print(f"Database error creating passwords: {e}")
+            return None
+
+    @staticmethod
+    def upsert(
+        db: Database, user_id: int, service: str, login: str, password: Union[str, bytes]
+    ) -> Optional[int]:
+        """
+        Create password record or replace the secret of an existing one.
+        
+        Args:
+            db: Database instance
+            user_id: Owner user ID
+            service: Service name
+            login: Login
+            password: Encrypted password
+            
+        Returns:
+            Password ID if successful, None otherwise
+        """
+        try:
+            cursor = db.execute(
+                """
+                INSERT INTO passwords (user_id, service, login, password)
+                SELECT ?, ?, ?, ? WHERE {}
+                ON CONFLICT (user_id, service, login)
+                DO UPDATE SET password = excluded.password, updated_at = CURRENT_TIMESTAMP
+                RETURNING id, user_id, service, login, created_at, updated_at
+                """.format(_NOT_REKEYING.format("?")),
+                (user_id, service, login, password, user_id),
+            )
+            cursor.row_factory = None
+            row = cursor.fetchone()
+            if row is None:
+                db.rollback()
+                print("Database error upserting password: vault re-key in progress")
+                return None
+            _index_service(db, row[0], user_id, service)
+            db.commit()
+            db.after_commit(vault_cache.put, db.db_path, user_id, row)
+            return row[0]
+        except sqlite3.Error as e:
+            db.rollback()
+            print(f"Database error upserting password: {e}")
+            return None
+
     @staticmethod
     def get_by_id(db: Database, password_id: int) -> Optional[Password]:
         """
@@ -170,17 +472,10 @@ class PasswordRepository:
                 "SELECT id, user_id, service, login, password, created_at, updated_at FROM passwords WHERE id = ?",
                 (password_id,),
             )
+            cursor.row_factory = None
             row = cursor.fetchone()
             if row:
-                return Password(
-                    id=row["id"],
-                    user_id=row["user_id"],
-                    service=row["service"],
-                    login=row["login"],
-                    password=row["password"],
-                    created_at=row["created_at"],
-                    updated_at=row["updated_at"],
-                )
+                return _stored_password(row)
             return None
         except sqlite3.Error as e:
             print(f"Database error getting password: {e}")
@@ -200,54 +495,449 @@ class PasswordRepository:
         """
         try:
             cursor = db.execute(
-                "SELECT id, user_id, service, login, password, created_at, updated_at FROM passwords WHERE user_id = ? ORDER BY service",
+                "SELECT id, user_id, service, login, password, created_at, updated_at FROM passwords WHERE user_id = ? ORDER BY service, id",
                 (user_id,),
             )
+            cursor.row_factory = None
             rows = cursor.fetchall()
+            return [_stored_password(row) for row in rows]
+        except sqlite3.Error as e:
+            print(f"Database error getting user passwords: {e}")
+            return []
+
+    @staticmethod
+    def iter_by_user(db: Database, user_id: int, batch: int = 500) -> Iterator[Password]:
+        """
+        Stream a user's password records in ID order.
+        
+        Rows are fetched ``batch`` at a time, so memory stays bounded by the
+        batch size instead of the vault size.
+        
+        Args:
+            db: Database instance
+            user_id: User ID to search
+            batch: Rows per fetch
+            
+        Yields:
+            Password records
+        """
+        yield from PasswordRepository._iter_rows(
+            db,
+            "SELECT id, user_id, service, login, password, created_at, updated_at FROM passwords "
+            "WHERE user_id = ? ORDER BY id",
+            (user_id,),
+            batch,
+        )
+
+    @staticmethod
+    def iter_all(db: Database, batch: int = 500) -> Iterator[Password]:
+        """
+        Stream every password record in ID order.
+        
+        Args:
+            db: Database instance
+            batch: Rows per fetch
+            
+        Yields:
+            Password records
+        """
+        yield from PasswordRepository._iter_rows(
+            db,
+            "SELECT id, user_id, service, login, password, created_at, updated_at FROM passwords ORDER BY id",
+            (),
+            batch,
+        )
+
+    @staticmethod
+    def _iter_rows(db: Database, query: str, params: tuple, batch: int) -> Iterator[Password]:
+        try:
+            cursor = db.execute(query, params)
+            cursor.row_factory = None
+            try:
+                while True:
+                    rows = cursor.fetchmany(batch)
+                    if not rows:
+                        return
+                    for row in rows:
+                        yield _stored_password(row)
+            finally:
+                cursor.close()
+        except sqlite3.Error as e:
+            print(f"Database error streaming passwords: {e}")
+
+    @staticmethod
+    def list_by_user(db: Database, user_id: int) -> List[Password]:
+        """
+        Get password records for a user without the encrypted column.
+        
+        Args:
+            db: Database instance
+            user_id: User ID to search
+            
+        Returns:
+            List of Password objects with empty password field
+        """
+        rows = vault_cache.rows(db.db_path, user_id)
+        if rows is not None:
+            return [_listed_password(row) for row in rows]
+        version = vault_cache.version()
+        try:
+            cursor = db.execute(
+                "SELECT id, user_id, service, login, created_at, updated_at FROM passwords WHERE user_id = ? ORDER BY service, id",
+                (user_id,),
+            )
+            cursor.row_factory = None
+            rows = cursor.fetchall()
+            vault_cache.load(db.db_path, user_id, rows, version)
+            return [_listed_password(row) for row in rows]
+        except sqlite3.Error as e:
+            print(f"Database error listing user passwords: {e}")
+            return []
+
+    @staticmethod
+    def get_page(
+        db: Database,
+        user_id: int,
+        after: Optional[Tuple[str, int]] = None,
+        limit: int = 50,
+        before: Optional[Tuple[str, int]] = None,
+    ) -> List[Password]:
+        """
+        Get one page of a user's password records in listing order.
+        
+        Served from vault_cache, loading the vault into it when it fits;
+        otherwise keyset pagination over the (user_id, service, id) index, so
+        each page costs the same regardless of its position in the vault.
+        
+        Args:
+            db: Database instance
+            user_id: User ID to search
+            after: (service, id) of the last record of the previous page
+            limit: Maximum number of records
+            before: (service, id) of the first record of the next page,
+                to page backwards; takes precedence over ``after``
+            
+        Returns:
+            List of Password objects with empty password field
+        """
+        rows = vault_cache.page(db.db_path, user_id, after, limit, before)
+        if rows is None and vault_cache.fits(PasswordRepository.count_by_user(db, user_id)):
+            PasswordRepository.list_by_user(db, user_id)
+            rows = vault_cache.page(db.db_path, user_id, after, limit, before)
+        if rows is not None:
+            return [_listed_password(row) for row in rows]
+        try:
+            if before is not None:
+                cursor = db.execute(
+                    """
+                    SELECT * FROM (
+                        SELECT id, user_id, service, login, created_at, updated_at FROM passwords
+                        WHERE user_id = ? AND (service, id) < (?, ?) ORDER BY service DESC, id DESC LIMIT ?
+                    ) ORDER BY service, id
+                    """,
+                    (user_id, before[0], before[1], limit),
+                )
+            elif after is None:
+                cursor = db.execute(
+                    """
+                    SELECT id, user_id, service, login, created_at, updated_at FROM passwords
+                    WHERE user_id = ? ORDER BY service, id LIMIT ?
+                    """,
+                    (user_id, limit),
+                )
+            else:
+                cursor = db.execute(
+                    """
+                    SELECT id, user_id, service, login, created_at, updated_at FROM passwords
+                    WHERE user_id = ? AND (service, id) > (?, ?) ORDER BY service, id LIMIT ?
+                    """,
+                    (user_id, after[0], after[1], limit),
+                )
+            cursor.row_factory = None
             return [
-                Password(
-                    id=row["id"],
-                    user_id=row["user_id"],
-                    service=row["service"],
-                    login=row["login"],
-                    password=row["password"],
-                    created_at=row["created_at"],
-                    updated_at=row["updated_at"],
+                _listed_password(row)
+                for row in cursor.fetchall()
+            ]
+        except sqlite3.Error as e:
+            print(f"Database error getting password page: {e}")
+            return []
+
+    @staticmethod
+    def search(db: Database, user_id: int, query: str, limit: int = 20) -> List[Password]:
+        """
+        Find a user's password records by words of service or login.
+        
+        Every word of the query is matched as a prefix through the
+        full-text index, best matches first.
+        
+        Args:
+            db: Database instance
+            user_id: User ID to search
+            query: Search text
+            limit: Maximum number of records
+            
+        Returns:
+            List of Password objects with empty password field
+        """
+        terms = " ".join('"{}"*'.format(word.replace('"', '""')) for word in query.split())
+        if not terms:
+            return []
+        try:
+            cursor = db.execute(
+                """
+                SELECT p.id, p.user_id, p.service, p.login, p.created_at, p.updated_at
+                FROM passwords_fts JOIN passwords AS p ON p.id = passwords_fts.rowid
+                WHERE passwords_fts MATCH ? AND p.user_id = ?
+                ORDER BY passwords_fts.rank LIMIT ?
+                """,
+                (terms, user_id, limit),
+            )
+            cursor.row_factory = None
+            return [
+                _listed_password(row)
+                for row in cursor.fetchall()
+            ]
+        except sqlite3.Error as e:
+            print(f"Database error searching passwords: {e}")
+            return []
+
+    @staticmethod
+    def fuzzy_find(
+        db: Database, user_id: int, text: str, k: int = 5, min_similarity: float = 0.3
+    ) -> List[Password]:
+        """
+        Find a user's password records with service names similar to text.
+        
+        Candidates are the records sharing at least one trigram with the text,
+        read from the trigram index, so typos and punctuation ("gmail.com",
+        "G-mail") still match without comparing against every record.
+        
+        Args:
+            db: Database instance
+            user_id: User ID to search
+            text: Typed service name
+            k: Maximum number of records
+            min_similarity: Lowest trigram similarity to accept, from 0 to 1
+            
+        Returns:
+            List of Password objects with empty password field, most similar first
+        """
+        grams = trigrams(text)
+        if not grams:
+            return []
+        try:
+            placeholders = ", ".join("?" for _ in grams)
+            cursor = db.execute(
+                f"""
+                SELECT p.id, p.user_id, p.service, p.login, p.created_at, p.updated_at
+                FROM passwords AS p WHERE p.id IN (
+                    SELECT password_id FROM password_trigrams
+                    WHERE user_id = ? AND trigram IN ({placeholders})
                 )
-                for row in rows
+                """,
+                (user_id, *grams),
+            )
+            cursor.row_factory = None
+            ranked = []
+            for row in cursor.fetchall():
+                score = similarity(grams, trigrams(row[2]))
+                if score >= min_similarity:
+                    ranked.append((score, row))
+            ranked.sort(key=lambda item: (-item[0], item[1][2], item[1][0]))
+            return [
+                _listed_password(row)
+                for _, row in ranked[:k]
             ]
         except sqlite3.Error as e:
-            print(f"Database error getting user passwords: {e}")
+            print(f"Database error finding similar passwords: {e}")
             return []
 
     @staticmethod
-    def update(db: Database, password: Password) -> bool:
+    def count_by_user(db: Database, user_id: int) -> int:
+        """
+        Count password records of a user.
+        
+        Args:
+            db: Database instance
+            user_id: User ID to search
+            
+        Returns:
+            Number of records
+        """
+        count = vault_cache.count(db.db_path, user_id)
+        if count is not None:
+            return count
+        try:
+            return db.execute("SELECT COUNT(*) FROM passwords WHERE user_id = ?", (user_id,)).fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Database error counting passwords: {e}")
+            return 0
+
+    @staticmethod
+    def update(db: Database, password: Password, expected: Union[str, bytes, None] = None) -> bool:
         """
         Update password record.
         
+        Refused while the owner's vault is being re-keyed. Use update_details
+        to change only service or login of a record read earlier.
+        
         Args:
             db: Database instance
             password: Password object with updated values
+            expected: Encrypted value the record must still hold, so a value
+                re-encrypted or edited since it was read is not overwritten
             
         Returns:
-            True if successful, False otherwise
+            True if the record was updated, False otherwise
         """
         try:
-            db.execute(
+            cursor = db.execute(
                 """
                 UPDATE passwords 
                 SET service = ?, login = ?, password = ?, updated_at = CURRENT_TIMESTAMP 
+                WHERE id = ? AND password = coalesce(?, password) AND {}
+                RETURNING id, user_id, service, login, created_at, updated_at
+                """.format(_NOT_REKEYING.format("passwords.user_id")),
+                (password.service, password.login, password.password, password.id, expected),
+            )
+            cursor.row_factory = None
+            row = cursor.fetchone()
+            if row:
+                _index_service(db, row[0], row[1], row[2])
+            db.commit()
+            if row:
+                db.after_commit(vault_cache.put, db.db_path, row[1], row)
+            return row is not None
+        except sqlite3.Error as e:
+            db.rollback()
+            print(f"Database error updating password: {e}")
+            return False
+
+    @staticmethod
+    def update_details(db: Database, password_id: int, service: str, login: str) -> bool:
+        """
+        Update service and login of a password record, leaving its value alone.
+        
+        Args:
+            db: Database instance
+            password_id: Password ID
+            service: New service name
+            login: New login
+            
+        Returns:
+            True if the record was updated, False otherwise
+        """
+        try:
+            cursor = db.execute(
+                """
+                UPDATE passwords 
+                SET service = ?, login = ?, updated_at = CURRENT_TIMESTAMP 
                 WHERE id = ?
+                RETURNING id, user_id, service, login, created_at, updated_at
                 """,
-                (password.service, password.login, password.password, password.id),
+                (service, login, password_id),
             )
+            cursor.row_factory = None
+            row = cursor.fetchone()
+            if row:
+                _index_service(db, row[0], row[1], row[2])
             db.commit()
-            return True
+            if row:
+                db.after_commit(vault_cache.put, db.db_path, row[1], row)
+            return row is not None
         except sqlite3.Error as e:
             db.rollback()
             print(f"Database error updating password: {e}")
             return False
 
+    @staticmethod
+    def update_secrets(db: Database, secrets: List[Tuple[int, Union[str, bytes], Union[str, bytes]]]) -> int:
+        """
+        Replace encrypted values of several records in one transaction, skipping rows changed concurrently.
+        
+        Nothing is replaced while the owner's vault is being re-keyed.
+        
+        Args:
+            db: Database instance
+            secrets: List of (password_id, old_encrypted_password, new_encrypted_password) triples
+            
+        Returns:
+            Number of replaced values
+        """
+        try:
+            cursor = db.executemany(
+                "UPDATE passwords SET password = ? WHERE id = ? AND password = ? AND "
+                + _NOT_REKEYING.format("passwords.user_id"),
+                [(new_value, password_id, old_value) for password_id, old_value, new_value in secrets],
+            )
+            db.commit()
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            db.rollback()
+            print(f"Database error updating secrets: {e}")
+            return 0
+
+    @staticmethod
+    def get_secrets_page(
+        db: Database, user_id: int, after_id: int, limit: int
+    ) -> List[Tuple[int, Union[str, memoryview]]]:
+        """
+        Get next batch of encrypted values in ID order.
+        
+        Each call is a short read, so no lock is held between batches.
+        
+        Args:
+            db: Database instance
+            user_id: User ID
+            after_id: Return records with greater ID
+            limit: Batch size
+            
+        Returns:
+            List of (password_id, encrypted_password) pairs
+        """
+        try:
+            cursor = db.execute(
+                "SELECT id, password FROM passwords WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?",
+                (user_id, after_id, limit),
+            )
+            cursor.row_factory = None
+            rows = cursor.fetchmany(limit)
+            cursor.close()
+            return [(row[0], _secret(row[1])) for row in rows]
+        except sqlite3.Error as e:
+            print(f"Database error reading secrets: {e}")
+            return []
+
+    @staticmethod
+    def save_rekey_batch(
+        db: Database, user_id: int, secrets: List[Tuple[int, bytes]], checkpoint: int
+    ) -> bool:
+        """
+        Store re-encrypted values and advance the user's re-key checkpoint in one transaction.
+        
+        Args:
+            db: Database instance
+            user_id: Owner ID
+            secrets: List of (password_id, encrypted_password) pairs
+            checkpoint: Highest password ID covered by this batch
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            db.executemany(
+                "UPDATE passwords SET password = ? WHERE id = ? AND user_id = ?",
+                [(encrypted, password_id, user_id) for password_id, encrypted in secrets],
+            )
+            db.execute("UPDATE users SET rekey_checkpoint = ? WHERE id = ?", (checkpoint, user_id))
+            db.commit()
+            db.after_commit(user_cache.invalidate, db.db_path, user_id)
+            return True
+        except sqlite3.Error as e:
+            db.rollback()
+            print(f"Database error saving re-key batch: {e}")
+            return False
+
     @staticmethod
     def delete(db: Database, password_id: int) -> bool:
         """
@@ -261,14 +951,42 @@ class PasswordRepository:
             True if successful, False otherwise
         """
         try:
-            db.execute("DELETE FROM passwords WHERE id = ?", (password_id,))
+            row = db.execute("DELETE FROM passwords WHERE id = ? RETURNING user_id", (password_id,)).fetchone()
             db.commit()
+            if row:
+                db.after_commit(vault_cache.remove, db.db_path, row[0], (password_id,))
             return True
         except sqlite3.Error as e:
             db.rollback()
             print(f"Database error deleting password: {e}")
             return False
 
+    @staticmethod
+    def delete_many(db: Database, user_id: int, password_ids: List[int]) -> Optional[int]:
+        """
+        Delete a user's password records in one transaction.
+        
+        Args:
+            db: Database instance
+            user_id: Owner user ID, records of other users are left alone
+            password_ids: Password IDs to delete
+            
+        Returns:
+            Number of deleted records if successful, None otherwise
+        """
+        try:
+            cursor = db.executemany(
+                "DELETE FROM passwords WHERE user_id = ? AND id = ?",
+                [(user_id, password_id) for password_id in password_ids],
+            )
+            db.commit()
+            db.after_commit(vault_cache.remove, db.db_path, user_id, password_ids)
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            db.rollback()
+            print(f"Database error deleting passwords: {e}")
+            return None
+
     @staticmethod
     def delete_all_for_user(db: Database, user_id: int) -> bool:
         """
@@ -284,11 +1002,82 @@ class PasswordRepository:
         try:
             db.execute("DELETE FROM passwords WHERE user_id = ?", (user_id,))
             db.commit()
+            db.after_commit(vault_cache.invalidate, db.db_path, user_id)
             return True
         except sqlite3.Error as e:
             db.rollback()
             print(f"Database error deleting user passwords: {e}")
             return False
 
+class BlobMigrationRepository:
+    """Repository for converting text ciphertext columns to BLOBs in place"""
+
+    COLUMNS = (("passwords", "password"), ("users", "password_hash"), ("users", "data_key"))
+
+    @staticmethod
+    def get_text_values(
+        db: Database, table: str, column: str, after_id: int, limit: int
+    ) -> List[Tuple[int, str]]:
+        """
+        Get next batch of rows still storing the column as TEXT.
+        
+        Args:
+            db: Database instance
+            table: Table name from COLUMNS
+            column: Column name from COLUMNS
+            after_id: Return rows with greater ID
+            limit: Batch size
+            
+        Returns:
+            List of (id, value) pairs ordered by ID
+        """
+        if (table, column) not in BlobMigrationRepository.COLUMNS:
+            raise ValueError(f"Unsupported column: {table}.{column}")
+        try:
+            cursor = db.execute(
+                f"""
+                SELECT id, {column} FROM {table}
+                WHERE id > ? AND typeof({column}) = 'text'
+                ORDER BY id LIMIT ?
+                """,
+                (after_id, limit),
+            )
+            cursor.row_factory = None
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Database error reading text values: {e}")
+            return []
+
+    @staticmethod
+    def replace_values(
+        db: Database, table: str, column: str, values: List[Tuple[int, str, bytes]]
+    ) -> int:
+        """
+        Replace text values with BLOBs in one transaction, skipping rows changed concurrently.
+        
+        Args:
+            db: Database instance
+            table: Table name from COLUMNS
+            column: Column name from COLUMNS
+            values: List of (id, old_value, new_value) triples
+            
+        Returns:
+            Number of converted rows
+        """
+        if (table, column) not in BlobMigrationRepository.COLUMNS:
+            raise ValueError(f"Unsupported column: {table}.{column}")
+        try:
+            cursor = db.executemany(
+                f"UPDATE {table} SET {column} = ? WHERE id = ? AND {column} = ?",
+                [(new_value, row_id, old_value) for row_id, old_value, new_value in values],
+            )
+            db.commit()
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            db.rollback()
+            print(f"Database error replacing values: {e}")
+            return 0
+
+
 UserCRUD = UserRepository
 PasswordCRUD = PasswordRepository
@@ -1,26 +1,38 @@
 """Database connection and initialization"""
 import sqlite3
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from src.database.trigrams import index_missing
+
+if TYPE_CHECKING:
+    from src.database.pool import ConnectionPool
 
 
 class Database:
     """SQLite3 Database manager"""
 
-    def __init__(self, db_path: Path):
+    def __init__(self, db_path: Path, pool: Optional["ConnectionPool"] = None):
         self.db_path = db_path
+        self.pool = pool
         self.connection: Optional[sqlite3.Connection] = None
 
     def connect(self) -> None:
-        """Connect to database"""
+        """Connect to database, borrowing a pooled connection if a pool is set"""
+        if self.pool:
+            self.connection = self.pool.acquire()
+            return
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.connection = sqlite3.connect(str(self.db_path))
         self.connection.row_factory = sqlite3.Row
 
     def disconnect(self) -> None:
-        """Disconnect from database"""
+        """Disconnect from database, returning a pooled connection to its pool"""
         if self.connection:
-            self.connection.close()
+            if self.pool:
+                self.pool.release(self.connection)
+            else:
+                self.connection.close()
             self.connection = None
 
     def execute(self, query: str, params: tuple = ()) -> sqlite3.Cursor:
@@ -29,6 +41,12 @@ class Database:
             self.connect()
         return self.connection.execute(query, params)
 
+    def executemany(self, query: str, params_seq) -> sqlite3.Cursor:
+        """Execute query for each parameter set"""
+        if not self.connection:
+            self.connect()
+        return self.connection.executemany(query, params_seq)
+
     def commit(self) -> None:
         """Commit changes"""
         if self.connection:
@@ -39,6 +57,15 @@ class Database:
         if self.connection:
             self.connection.rollback()
 
+    def after_commit(self, callback: Callable, *args: Any, **kwargs: Any) -> None:
+        """
+        Run callback once the changes made so far are committed.
+        
+        Called after commit(), so it runs right away; databases that defer
+        commits run it when the deferred commit succeeds.
+        """
+        callback(*args, **kwargs)
+
     def close(self) -> None:
         """Close connection"""
         self.disconnect()
@@ -46,7 +73,150 @@ class Database:
 
 class DatabaseInitializer:
     """Database initialization utility"""
-    
+
+    @staticmethod
+    def ensure_column(db: Database, table: str, column: str, definition: str) -> None:
+        """
+        Add column to an existing table if it is missing.
+        
+        Args:
+            db: Database instance
+            table: Table name
+            column: Column name
+            definition: Column type and constraints
+        """
+        columns = {row["name"] for row in db.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    @staticmethod
+    def ensure_unique_entries(db: Database) -> None:
+        """
+        Make (user_id, service, login) unique, which upserts rely on.
+        
+        Databases created before the constraint may hold duplicates. The
+        most recent record (highest ID) of each entry keeps its login, older
+        ones get a " (2)", " (3)", ... suffix on theirs, so no secret is lost.
+        
+        Args:
+            db: Database instance
+        """
+        exists = db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_passwords_entry'"
+        ).fetchone()
+        if exists:
+            return
+
+        cursor = db.execute(
+            """
+            SELECT id, user_id, service, login FROM passwords WHERE id NOT IN (
+                SELECT MAX(id) FROM passwords GROUP BY user_id, service, login
+            )
+            ORDER BY id DESC
+            """
+        )
+        cursor.row_factory = None
+        duplicates = cursor.fetchall()
+        for password_id, user_id, service, login in duplicates:
+            suffix = 2
+            while db.execute(
+                "SELECT 1 FROM passwords WHERE user_id = ? AND service = ? AND login = ?",
+                (user_id, service, f"{login} ({suffix})"),
+            ).fetchone():
+                suffix += 1
+            db.execute("UPDATE passwords SET login = ? WHERE id = ?", (f"{login} ({suffix})", password_id))
+        if duplicates:
+            print(f"✓ Renamed {len(duplicates)} duplicate password entries")
+        db.execute("CREATE UNIQUE INDEX idx_passwords_entry ON passwords(user_id, service, login)")
+
+    @staticmethod
+    def init_search(db: Database) -> None:
+        """
+        Create full-text index over service and login, kept in sync by triggers.
+        
+        Args:
+            db: Database instance
+        """
+        exists = db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'passwords_fts'"
+        ).fetchone()
+
+        db.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS passwords_fts USING fts5(
+                service, login, content='passwords', content_rowid='id'
+            )
+            """
+        )
+
+        db.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS passwords_fts_insert AFTER INSERT ON passwords BEGIN
+                INSERT INTO passwords_fts (rowid, service, login) VALUES (new.id, new.service, new.login);
+            END
+            """
+        )
+
+        db.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS passwords_fts_delete AFTER DELETE ON passwords BEGIN
+                INSERT INTO passwords_fts (passwords_fts, rowid, service, login)
+                VALUES ('delete', old.id, old.service, old.login);
+            END
+            """
+        )
+
+        db.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS passwords_fts_update AFTER UPDATE OF service, login ON passwords BEGIN
+                INSERT INTO passwords_fts (passwords_fts, rowid, service, login)
+                VALUES ('delete', old.id, old.service, old.login);
+                INSERT INTO passwords_fts (rowid, service, login) VALUES (new.id, new.service, new.login);
+            END
+            """
+        )
+
+        if not exists:
+            db.execute("INSERT INTO passwords_fts (passwords_fts) VALUES ('rebuild')")
+
+    @staticmethod
+    def init_trigrams(db: Database) -> None:
+        """
+        Create trigram index over service names and fill it for unindexed rows.
+        
+        Rows are indexed by PasswordRepository on create and update; a
+        trigger drops their trigrams on delete.
+        
+        Args:
+            db: Database instance
+        """
+        db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS password_trigrams (
+                user_id INTEGER NOT NULL,
+                trigram TEXT NOT NULL,
+                password_id INTEGER NOT NULL,
+                PRIMARY KEY (user_id, trigram, password_id)
+            ) WITHOUT ROWID
+            """
+        )
+
+        db.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_password_trigrams_password ON password_trigrams(password_id)
+            """
+        )
+
+        db.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS password_trigrams_delete AFTER DELETE ON passwords BEGIN
+                DELETE FROM password_trigrams WHERE password_id = old.id;
+            END
+            """
+        )
+
+        index_missing(db)
+
     @staticmethod
     def init_db(db_path: Path) -> None:
         """
@@ -64,7 +234,10 @@ class DatabaseInitializer:
                 CREATE TABLE IF NOT EXISTS users (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     username TEXT UNIQUE NOT NULL,
-                    password_hash TEXT NOT NULL,
+                    password_hash BLOB NOT NULL,
+                    data_key BLOB,
+                    pending_data_key BLOB,
+                    rekey_checkpoint INTEGER,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
@@ -78,7 +251,7 @@ class DatabaseInitializer:
                     user_id INTEGER NOT NULL,
                     service TEXT NOT NULL,
                     login TEXT NOT NULL,
-                    password TEXT NOT NULL,
+                    password BLOB NOT NULL,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
@@ -86,6 +259,10 @@ class DatabaseInitializer:
                 """
             )
 
+            DatabaseInitializer.ensure_column(db, "users", "data_key", "BLOB")
+            DatabaseInitializer.ensure_column(db, "users", "pending_data_key", "BLOB")
+            DatabaseInitializer.ensure_column(db, "users", "rekey_checkpoint", "INTEGER")
+
             db.execute(
                 """
                 CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)
@@ -98,6 +275,16 @@ class DatabaseInitializer:
                 """
             )
 
+            db.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_passwords_user_service ON passwords(user_id, service, id)
+                """
+            )
+
+            DatabaseInitializer.ensure_unique_entries(db)
+            DatabaseInitializer.init_search(db)
+            DatabaseInitializer.init_trigrams(db)
+
             db.commit()
             print(f"✓ Database initialized at {db_path}")
 
@@ -1,38 +1,100 @@
 """Database models"""
-from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Union
 
 
-@dataclass
-class User:
+def _parse_timestamp(value: Union[str, datetime, None]) -> Optional[datetime]:
+    """Parse SQLite CURRENT_TIMESTAMP text, other values pass through"""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+class _Record:
+    """
+    Base for slotted records built positionally from SQLite rows.
+
+    Timestamps are kept as stored and parsed on first access.
+    """
+
+    __slots__ = ("_created_at", "_updated_at")
+    _fields: tuple = ()
+
+    @property
+    def created_at(self) -> Optional[datetime]:
+        """Creation time, parsed on first access"""
+        self._created_at = _parse_timestamp(self._created_at)
+        return self._created_at
+
+    @created_at.setter
+    def created_at(self, value: Union[str, datetime, None]) -> None:
+        self._created_at = value
+
+    @property
+    def updated_at(self) -> Optional[datetime]:
+        """Last update time, parsed on first access"""
+        self._updated_at = _parse_timestamp(self._updated_at)
+        return self._updated_at
+
+    @updated_at.setter
+    def updated_at(self, value: Union[str, datetime, None]) -> None:
+        self._updated_at = value
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._fields)
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({values})"
+
+
+class User(_Record):
     """User model with encrypted password"""
-    id: Optional[int] = None
-    username: str = ""
-    password_hash: str = ""
-    created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None
 
-    def __post_init__(self):
-        if self.created_at is None:
-            self.created_at = datetime.now()
-        if self.updated_at is None:
-            self.updated_at = datetime.now()
+    __slots__ = ("id", "username", "password_hash", "data_key", "rekey_checkpoint")
+    _fields = ("id", "username", "password_hash", "data_key", "rekey_checkpoint", "created_at", "updated_at")
 
+    def __init__(
+        self,
+        id: Optional[int] = None,
+        username: str = "",
+        password_hash: Union[str, bytes] = "",
+        data_key: Optional[Union[str, bytes]] = None,
+        rekey_checkpoint: Optional[int] = None,
+        created_at: Union[str, datetime, None] = None,
+        updated_at: Union[str, datetime, None] = None,
+    ):
+        self.id = id
+        self.username = username
+        self.password_hash = password_hash
+        self.data_key = data_key
+        self.rekey_checkpoint = rekey_checkpoint
+        self._created_at = created_at
+        self._updated_at = updated_at
 
-@dataclass
-class Password:
+
+class Password(_Record):
     """Password record model with encryption"""
-    id: Optional[int] = None
-    user_id: int = 0
-    service: str = ""
-    login: str = ""
-    password: str = ""
-    created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None
-
-    def __post_init__(self):
-        if self.created_at is None:
-            self.created_at = datetime.now()
-        if self.updated_at is None:
-            self.updated_at = datetime.now()
+
+    __slots__ = ("id", "user_id", "service", "login", "password")
+    _fields = ("id", "user_id", "service", "login", "password", "created_at", "updated_at")
+
+    def __init__(
+        self,
+        id: Optional[int] = None,
+        user_id: int = 0,
+        service: str = "",
+        login: str = "",
+        password: Union[str, bytes, memoryview] = "",
+        created_at: Union[str, datetime, None] = None,
+        updated_at: Union[str, datetime, None] = None,
+    ):
+        self.id = id
+        self.user_id = user_id
+        self.service = service
+        self.login = login
+        self.password = password
+        self._created_at = created_at
+        self._updated_at = updated_at
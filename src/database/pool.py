@@ -0,0 +1,112 @@
+"""Process-wide pool of long-lived SQLite connections"""
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from src.config import (
+    DB_PATH,
+    DB_POOL_SIZE,
+    DB_JOURNAL_MODE,
+    DB_SYNCHRONOUS,
+    DB_CACHE_SIZE,
+    DB_MMAP_SIZE,
+    DB_BUSY_TIMEOUT,
+    DB_CACHED_STATEMENTS,
+)
+from src.database.db import Database
+
+
+class ConnectionPool:
+    """
+    Keep tuned connections open and hand them out per unit of work.
+
+    Up to ``size`` idle connections are kept; checkouts beyond that open an
+    extra connection that is closed on checkin, so callers never wait.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        size: int = DB_POOL_SIZE,
+        journal_mode: str = DB_JOURNAL_MODE,
+        synchronous: str = DB_SYNCHRONOUS,
+        cache_size: int = DB_CACHE_SIZE,
+        mmap_size: int = DB_MMAP_SIZE,
+        busy_timeout: int = DB_BUSY_TIMEOUT,
+        cached_statements: int = DB_CACHED_STATEMENTS,
+    ):
+        self.db_path = db_path
+        self.size = size
+        self.pragmas: Dict[str, object] = {
+            "journal_mode": journal_mode,
+            "synchronous": synchronous,
+            "cache_size": cache_size,
+            "mmap_size": mmap_size,
+            "busy_timeout": busy_timeout,
+        }
+        self.cached_statements = cached_statements
+        self._idle: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._prepared = False
+        self.opened = 0
+
+    def acquire(self) -> sqlite3.Connection:
+        """Take an idle connection or open a new one"""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self.open_connection()
+
+    def release(self, connection: sqlite3.Connection) -> None:
+        """Return connection, rolling back anything left uncommitted"""
+        if connection.in_transaction:
+            connection.rollback()
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    @contextmanager
+    def checkout(self) -> Iterator[Database]:
+        """
+        Borrow a connection for a unit of work.
+
+        Yields:
+            Database bound to a pooled connection, returned on exit
+        """
+        db = Database(self.db_path, pool=self)
+        db.connect()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def close(self) -> None:
+        """Close idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    def open_connection(self) -> sqlite3.Connection:
+        """Open a new tuned connection that is not tracked by the pool"""
+        if not self._prepared:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._prepared = True
+        connection = sqlite3.connect(
+            str(self.db_path),
+            timeout=self.pragmas["busy_timeout"] / 1000,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        connection.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            connection.execute(f"PRAGMA {name} = {value}")
+        self.opened += 1
+        return connection
+
+
+db_pool = ConnectionPool(DB_PATH)
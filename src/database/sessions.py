@@ -0,0 +1,282 @@
+"""Login sessions mapping Telegram accounts to authenticated users"""
+import asyncio
+import logging
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.config import (
+    DB_PATH,
+    SESSION_BACKEND,
+    SESSION_IDLE_TTL,
+    SESSION_ABSOLUTE_TTL,
+    SESSION_TOUCH_INTERVAL,
+)
+from src.database.async_db import AsyncDatabase
+from src.database.db import Database
+from src.database.pool import ConnectionPool, db_pool
+from src.database.writer import DatabaseWriter, db_writer
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore(ABC):
+    """
+    Sessions keyed by Telegram user ID.
+
+    A session expires once it has not been used for ``idle_ttl`` seconds or
+    ``absolute_ttl`` seconds after login, whichever comes first. Expired
+    sessions are never returned; ``purge_expired`` only reclaims their space.
+    """
+
+    def __init__(self, idle_ttl: float = SESSION_IDLE_TTL, absolute_ttl: float = SESSION_ABSOLUTE_TTL):
+        self.idle_ttl = idle_ttl
+        self.absolute_ttl = absolute_ttl
+
+    @abstractmethod
+    async def get(self, telegram_id: int) -> Optional[int]:
+        """
+        Get the logged in user and refresh the idle timer.
+
+        Args:
+            telegram_id: Telegram user ID
+
+        Returns:
+            User ID if a live session exists, None otherwise
+        """
+
+    @abstractmethod
+    async def set(self, telegram_id: int, user_id: int) -> None:
+        """
+        Start a session, replacing any previous one.
+
+        Args:
+            telegram_id: Telegram user ID
+            user_id: Authenticated user ID
+        """
+
+    @abstractmethod
+    async def delete(self, telegram_id: int) -> Optional[int]:
+        """
+        End a session.
+
+        Args:
+            telegram_id: Telegram user ID
+
+        Returns:
+            User ID of the removed session, expired or not, None if there was none
+        """
+
+    @abstractmethod
+    async def purge_expired(self) -> int:
+        """
+        Drop expired sessions.
+
+        Returns:
+            Number of dropped sessions
+        """
+
+    async def close(self) -> None:
+        """Release resources held by the store"""
+
+    def _expired(self, created_at: float, last_seen: float, now: float) -> bool:
+        return now - last_seen > self.idle_ttl or now - created_at > self.absolute_ttl
+
+    async def sweep(self, interval: float) -> None:
+        """
+        Purge expired sessions every ``interval`` seconds until cancelled.
+
+        Args:
+            interval: Seconds between purges
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.purge_expired()
+            except sqlite3.Error as e:
+                logger.error(f"Error purging sessions: {e}")
+
+
+class MemorySessionStore(SessionStore):
+    """Sessions held in a dict, private to one process and lost on restart"""
+
+    def __init__(self, idle_ttl: float = SESSION_IDLE_TTL, absolute_ttl: float = SESSION_ABSOLUTE_TTL):
+        super().__init__(idle_ttl, absolute_ttl)
+        self._sessions: Dict[int, List] = {}
+
+    async def get(self, telegram_id: int) -> Optional[int]:
+        now = time.time()
+        session = self._sessions.get(telegram_id)
+        if session is None:
+            return None
+        user_id, created_at, last_seen = session
+        if self._expired(created_at, last_seen, now):
+            del self._sessions[telegram_id]
+            return None
+        session[2] = now
+        return user_id
+
+    async def set(self, telegram_id: int, user_id: int) -> None:
+        now = time.time()
+        self._sessions[telegram_id] = [user_id, now, now]
+
+    async def delete(self, telegram_id: int) -> Optional[int]:
+        session = self._sessions.pop(telegram_id, None)
+        return session[0] if session is not None else None
+
+    async def purge_expired(self) -> int:
+        now = time.time()
+        expired = [
+            telegram_id
+            for telegram_id, (_, created_at, last_seen) in self._sessions.items()
+            if self._expired(created_at, last_seen, now)
+        ]
+        for telegram_id in expired:
+            del self._sessions[telegram_id]
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+def _create_table(db: Database) -> None:
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS sessions (
+            telegram_id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_seen REAL NOT NULL
+        )
+    """)
+    db.commit()
+
+
+def _load_session(db: Database, telegram_id: int) -> Optional[tuple]:
+    cursor = db.execute("SELECT user_id, created_at, last_seen FROM sessions WHERE telegram_id = ?", (telegram_id,))
+    cursor.row_factory = None
+    return cursor.fetchone()
+
+
+def _touch_session(db: Database, telegram_id: int, now: float) -> None:
+    db.execute("UPDATE sessions SET last_seen = ? WHERE telegram_id = ? AND last_seen < ?", (now, telegram_id, now))
+    db.commit()
+
+
+def _save_session(db: Database, telegram_id: int, user_id: int, now: float) -> None:
+    db.execute(
+        "INSERT OR REPLACE INTO sessions (telegram_id, user_id, created_at, last_seen) VALUES (?, ?, ?, ?)",
+        (telegram_id, user_id, now, now),
+    )
+    db.commit()
+
+
+def _delete_session(db: Database, telegram_id: int, last_seen: Optional[float] = None) -> Optional[tuple]:
+    query = "DELETE FROM sessions WHERE telegram_id = ?"
+    params = (telegram_id,)
+    if last_seen is not None:
+        query += " AND last_seen = ?"
+        params += (last_seen,)
+    cursor = db.execute(query + " RETURNING user_id, created_at, last_seen", params)
+    cursor.row_factory = None
+    row = cursor.fetchone()
+    cursor.close()
+    db.commit()
+    return row
+
+
+def _delete_expired(db: Database, idle_before: float, created_before: float) -> int:
+    removed = db.execute(
+        "DELETE FROM sessions WHERE last_seen < ? OR created_at < ?", (idle_before, created_before)
+    ).rowcount
+    db.commit()
+    return removed
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    Sessions in a SQLite table, surviving restarts and shared by processes.
+
+    Every process opens its own connection to the same file and uses it on
+    a database thread, so lookups never block the event loop. Writes go to
+    the writer, when one is set, to be committed with the vault writes.
+    Lookups are a primary key read and the idle timer is written back at
+    most once per ``touch_interval`` seconds, so busy sessions do not turn
+    reads into writes.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        pool: Optional[ConnectionPool] = None,
+        idle_ttl: float = SESSION_IDLE_TTL,
+        absolute_ttl: float = SESSION_ABSOLUTE_TTL,
+        touch_interval: float = SESSION_TOUCH_INTERVAL,
+        writer: Optional[DatabaseWriter] = None,
+    ):
+        super().__init__(idle_ttl, absolute_ttl)
+        self.pool = pool or ConnectionPool(db_path)
+        self.db = AsyncDatabase(db_path, pool=self.pool, writer=writer)
+        self.touch_interval = touch_interval
+        self._prepared = False
+        self._owns_pool = pool is None
+
+    async def get(self, telegram_id: int) -> Optional[int]:
+        await self._prepare()
+        row = await self.db.run(_load_session, telegram_id)
+        if row is None:
+            return None
+        user_id, created_at, last_seen = row
+        now = time.time()
+        if self._expired(created_at, last_seen, now):
+            await self.db.write(_delete_session, telegram_id, last_seen)
+            return None
+        if now - last_seen >= self.touch_interval:
+            await self.db.write(_touch_session, telegram_id, now)
+        return user_id
+
+    async def set(self, telegram_id: int, user_id: int) -> None:
+        await self._prepare()
+        await self.db.write(_save_session, telegram_id, user_id, time.time())
+
+    async def delete(self, telegram_id: int) -> Optional[int]:
+        await self._prepare()
+        row = await self.db.write(_delete_session, telegram_id)
+        return row[0] if row is not None else None
+
+    async def purge_expired(self) -> int:
+        await self._prepare()
+        now = time.time()
+        return await self.db.write(_delete_expired, now - self.idle_ttl, now - self.absolute_ttl)
+
+    async def close(self) -> None:
+        await self.db.close()
+        if self._owns_pool:
+            self.pool.close()
+
+    async def _prepare(self) -> None:
+        if not self._prepared:
+            await self.db.write(_create_table)
+            self._prepared = True
+
+
+def create_session_store(backend: str = SESSION_BACKEND) -> SessionStore:
+    """
+    Build the session store selected in configuration.
+
+    Args:
+        backend: "sqlite" to share sessions through the database file,
+            "memory" to keep them in this process only
+
+    Returns:
+        Session store
+    """
+    if backend == "memory":
+        return MemorySessionStore()
+    if backend == "sqlite":
+        return SqliteSessionStore(DB_PATH, pool=db_pool, writer=db_writer)
+    raise ValueError(f"Unknown session backend: {backend}")
+
+
+session_store = create_session_store()
@@ -0,0 +1,57 @@
+"""Trigram extraction for typo-tolerant service lookup"""
+import re
+from typing import Optional, Set
+
+_WORD = re.compile(r"\w+")
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Split text into case-folded word trigrams.
+
+    Every word is padded with two spaces in front and one behind, so short
+    words and word starts still produce trigrams and weigh more.
+
+    Args:
+        text: Text to index or search for
+
+    Returns:
+        Set of trigrams
+    """
+    grams = set()
+    for word in _WORD.findall(text.casefold()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(left: Set[str], right: Set[str]) -> float:
+    """Share of trigrams two texts have in common"""
+    if not left or not right:
+        return 0.0
+    shared = len(left & right)
+    return shared / (len(left) + len(right) - shared)
+
+
+def index_missing(db, user_id: Optional[int] = None) -> None:
+    """
+    Add trigram index entries for password records that have none.
+
+    Args:
+        db: Database instance
+        user_id: Only look at this user's records
+    """
+    query = """
+        SELECT id, user_id, service FROM passwords AS p
+        WHERE NOT EXISTS (SELECT 1 FROM password_trigrams AS t WHERE t.password_id = p.id)
+    """
+    params = ()
+    if user_id is not None:
+        query += " AND user_id = ?"
+        params = (user_id,)
+    cursor = db.execute(query, params)
+    cursor.row_factory = None
+    db.executemany(
+        "INSERT OR IGNORE INTO password_trigrams (user_id, trigram, password_id) VALUES (?, ?, ?)",
+        [(owner_id, gram, password_id) for password_id, owner_id, service in cursor.fetchall() for gram in trigrams(service)],
+    )
@@ -0,0 +1,179 @@
+"""Single writer thread committing queued writes in groups"""
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+from src.config import DB_PATH, DB_WRITE_WINDOW, DB_WRITE_BATCH
+from src.database.db import Database
+from src.database.pool import ConnectionPool, db_pool
+
+_SAVEPOINT = "write_intent"
+
+_Intent = Tuple[Future, Callable, tuple]
+
+
+class _IntentDatabase(Database):
+    """
+    Database handed to one queued write.
+
+    Commit is deferred to the group transaction and rollback only undoes
+    this write, so repository functions run unchanged inside a group.
+    """
+
+    def __init__(self, db_path: Path):
+        super().__init__(db_path)
+        self.callbacks: List[Tuple[Callable, tuple, dict]] = []
+
+    def commit(self) -> None:
+        """Leave committing to the writer"""
+
+    def rollback(self) -> None:
+        """Undo this write only"""
+        self.connection.execute(f"ROLLBACK TO {_SAVEPOINT}")
+        self.callbacks.clear()
+
+    def after_commit(self, callback: Callable, *args: Any, **kwargs: Any) -> None:
+        """Run callback after the group commit"""
+        self.callbacks.append((callback, args, kwargs))
+
+    def disconnect(self) -> None:
+        """Connection is owned by the writer"""
+
+
+class DatabaseWriter:
+    """
+    Own the write connection and commit queued writes in groups.
+
+    Writes submitted within ``window`` seconds of the first one waiting are
+    applied in one transaction, each under its own savepoint, so one failing
+    write does not affect the others and one commit covers the whole group.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        pool: Optional[ConnectionPool] = None,
+        window: float = DB_WRITE_WINDOW,
+        max_batch: int = DB_WRITE_BATCH,
+    ):
+        self.db_path = db_path
+        self.pool = pool
+        self.window = window
+        self.max_batch = max_batch
+        self.commits = 0
+        self._queue: "queue.Queue[Optional[_Intent]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable, *args: Any) -> Future:
+        """
+        Queue ``func(db, *args)`` for the writer thread.
+
+        Args:
+            func: Repository write taking a Database as first argument
+            *args: Remaining arguments
+
+        Returns:
+            Future resolved with the function result once its group is
+            committed, or with the exception it raised
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="database-writer", daemon=True)
+                self._thread.start()
+            self._queue.put((future, func, args))
+        return future
+
+    def close(self) -> None:
+        """Commit queued writes and stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._queue.put(None)
+        thread.join()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.pool:
+            connection = self.pool.open_connection()
+        else:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.db_path))
+            connection.row_factory = sqlite3.Row
+        connection.isolation_level = None
+        return connection
+
+    def _run(self) -> None:
+        connection = self._connect()
+        db = _IntentDatabase(self.db_path)
+        db.connection = connection
+        try:
+            stopping = False
+            while not stopping:
+                intent = self._queue.get()
+                if intent is None:
+                    break
+                batch = [intent]
+                deadline = time.monotonic() + self.window
+                while len(batch) < self.max_batch:
+                    try:
+                        intent = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if intent is None:
+                        stopping = True
+                        break
+                    batch.append(intent)
+                self._commit_group(connection, db, batch)
+        finally:
+            connection.close()
+
+    def _commit_group(self, connection: sqlite3.Connection, db: _IntentDatabase, batch: List[_Intent]) -> None:
+        outcomes = []
+        callbacks = []
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as e:
+            print(f"Error starting write group: {e}")
+            for future, _, _ in batch:
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(e)
+            return
+
+        for future, func, args in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            connection.execute(f"SAVEPOINT {_SAVEPOINT}")
+            db.callbacks = []
+            try:
+                outcomes.append((future, func(db, *args), None))
+                callbacks.extend(db.callbacks)
+            except Exception as e:
+                connection.execute(f"ROLLBACK TO {_SAVEPOINT}")
+                outcomes.append((future, None, e))
+            connection.execute(f"RELEASE {_SAVEPOINT}")
+
+        try:
+            connection.execute("COMMIT")
+            self.commits += 1
+            for callback, args, kwargs in callbacks:
+                callback(*args, **kwargs)
+        except sqlite3.Error as e:
+            print(f"Error committing write group: {e}")
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            outcomes = [(future, None, e) for future, _, _ in outcomes]
+
+        for future, value, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(value)
+
+
+db_writer = DatabaseWriter(DB_PATH, pool=db_pool)
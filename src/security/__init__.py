@@ -1,5 +1,8 @@
 """Security package initialization"""
-from src.security.encryption import EncryptionService
+from src.security.crypto_pool import CryptoPool
+from src.security.encryption import DecryptResult, EncryptionService
+from src.security.kdf import KdfParams
+from src.security.key_cache import KeyCache
 from src.security.validators import Validators
 
-__all__ = ["EncryptionService", "Validators"]
+__all__ = ["CryptoPool", "DecryptResult", "EncryptionService", "KdfParams", "KeyCache", "Validators"]
@@ -0,0 +1,167 @@
+"""Cipher suites for data-key encryption, keyed by ciphertext version byte"""
+import base64
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from src.config import CIPHER_SUITE
+
+
+class CipherSuite(ABC):
+    """Base class for a cipher suite working on raw bytes"""
+
+    version: int = 0
+    name: str = ""
+
+    @abstractmethod
+    def bind(self, data_key: bytes) -> "BoundCipher":
+        """
+        Prepare cipher for a data key.
+
+        Args:
+            data_key: User data key (URL-safe base64 encoded, 32 bytes decoded)
+
+        Returns:
+            Cipher ready to encrypt and decrypt
+        """
+
+
+class BoundCipher(ABC):
+    """Cipher suite bound to one key"""
+
+    @abstractmethod
+    def encrypt(self, plaintext: bytes) -> bytes:
+        """Encrypt to suite body (without version byte)"""
+
+    @abstractmethod
+    def decrypt(self, body: bytes) -> bytes:
+        """Decrypt suite body (without version byte)"""
+
+
+class _FernetCipher(BoundCipher):
+    def __init__(self, data_key: bytes):
+        self._fernet = Fernet(data_key)
+
+    def encrypt(self, plaintext: bytes) -> bytes:
+        return base64.urlsafe_b64decode(self._fernet.encrypt(plaintext))
+
+    def decrypt(self, body: bytes) -> bytes:
+        return self._fernet.decrypt(base64.urlsafe_b64encode(body))
+
+
+class FernetSuite(CipherSuite):
+    """AES-128-CBC + HMAC-SHA256, body is the raw Fernet token; kept for v2 rows"""
+
+    version = 0x02
+    name = "fernet"
+
+    def bind(self, data_key: bytes) -> BoundCipher:
+        return _FernetCipher(data_key)
+
+
+class _AeadCipher(BoundCipher):
+    def __init__(self, aead, nonce_length: int):
+        self._aead = aead
+        self._nonce_length = nonce_length
+
+    def encrypt(self, plaintext: bytes) -> bytes:
+        nonce = os.urandom(self._nonce_length)
+        return nonce + self._aead.encrypt(nonce, plaintext, None)
+
+    def decrypt(self, body: bytes) -> bytes:
+        nonce = body[:self._nonce_length]
+        return self._aead.decrypt(nonce, body[self._nonce_length:], None)
+
+
+class AeadSuite(CipherSuite):
+    """AEAD suite with a per-suite subkey derived from the data key by HKDF"""
+
+    algorithm = AESGCM
+    nonce_length = 12
+
+    def bind(self, data_key: bytes) -> BoundCipher:
+        subkey = HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=f"passwordmanager/{self.name}".encode(),
+        ).derive(base64.urlsafe_b64decode(data_key))
+        return _AeadCipher(self.algorithm(subkey), self.nonce_length)
+
+
+class AesGcmSuite(AeadSuite):
+    """AES-256-GCM, body is nonce | ciphertext | tag"""
+
+    version = 0x03
+    name = "aes-256-gcm"
+    algorithm = AESGCM
+
+
+class ChaCha20Poly1305Suite(AeadSuite):
+    """ChaCha20-Poly1305, body is nonce | ciphertext | tag"""
+
+    version = 0x04
+    name = "chacha20-poly1305"
+    algorithm = ChaCha20Poly1305
+
+
+_suites_by_version: Dict[int, CipherSuite] = {}
+_suites_by_name: Dict[str, CipherSuite] = {}
+
+
+def register_suite(suite: CipherSuite) -> None:
+    """
+    Register cipher suite under its version byte and name.
+
+    Args:
+        suite: Cipher suite instance
+
+    Raises:
+        ValueError: If the version byte is already taken by another suite
+    """
+    existing = _suites_by_version.get(suite.version)
+    if existing is not None and existing.name != suite.name:
+        raise ValueError(f"Cipher version {suite.version} already registered for {existing.name}")
+    _suites_by_version[suite.version] = suite
+    _suites_by_name[suite.name] = suite
+
+
+def get_suite(version: int) -> CipherSuite:
+    """
+    Get cipher suite by version byte.
+
+    Raises:
+        ValueError: If the version is unknown
+    """
+    suite = _suites_by_version.get(version)
+    if suite is None:
+        raise ValueError(f"Unknown cipher version: {version}")
+    return suite
+
+
+def get_suite_by_name(name: Optional[str] = None) -> CipherSuite:
+    """
+    Get cipher suite by name, defaults to the configured one.
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    name = name or CIPHER_SUITE
+    suite = _suites_by_name.get(name)
+    if suite is None:
+        raise ValueError(f"Unknown cipher suite: {name}")
+    return suite
+
+
+def available_suites() -> Dict[str, CipherSuite]:
+    """Registered suites by name"""
+    return dict(_suites_by_name)
+
+
+for _suite in (FernetSuite(), AesGcmSuite(), ChaCha20Poly1305Suite()):
+    register_suite(_suite)
@@ -0,0 +1,152 @@
+"""Prioritized process pool for CPU-bound crypto work"""
+import asyncio
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+class CryptoPool:
+    """
+    Run blocking crypto functions on a process pool without blocking the event loop.
+
+    Jobs wait in a priority queue and at most ``max_workers`` of them run at
+    once, so interactive logins overtake queued bulk re-encryption work.
+
+    Workers are started with ``start_method`` rather than forked from a
+    process already running database and writer threads; with forkserver,
+    the ``preload`` modules are imported once in the server instead of in
+    every worker. A worker crash fails the jobs it took down and the pool
+    is replaced for later ones.
+    """
+
+    PRIORITY_INTERACTIVE = 0
+    PRIORITY_BULK = 10
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        start_method: str = "forkserver",
+        preload: Sequence[str] = (),
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        if start_method not in multiprocessing.get_all_start_methods():
+            start_method = "spawn"
+        self.start_method = start_method
+        self.preload = list(preload)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._dispatchers: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._restarts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    async def run(self, func: Callable, *args: Any, priority: int = PRIORITY_INTERACTIVE) -> Any:
+        """
+        Queue function call and wait for its result.
+
+        Args:
+            func: Picklable module-level function or static method
+            *args: Picklable arguments
+            priority: Lower values run first
+
+        Returns:
+            Function result
+        """
+        queue = self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((priority, next(self._sequence), time.monotonic(), func, args, future))
+        return await future
+
+    def metrics(self) -> Dict[str, float]:
+        """
+        Get queue and latency counters.
+
+        Returns:
+            Dict with queue_depth, in_flight, completed, failed, restarts, avg_wait and max_wait (seconds)
+        """
+        finished = self._completed + self._failed
+        return {
+            "workers": self.max_workers,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "in_flight": self._in_flight,
+            "completed": self._completed,
+            "failed": self._failed,
+            "restarts": self._restarts,
+            "avg_wait": self._total_wait / finished if finished else 0.0,
+            "max_wait": self._max_wait,
+        }
+
+    async def shutdown(self) -> None:
+        """Stop dispatchers and worker processes"""
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._dispatchers = []
+        self._queue = None
+        self._loop = None
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _ensure_started(self) -> asyncio.PriorityQueue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.PriorityQueue()
+            self._dispatchers = [loop.create_task(self._dispatch()) for _ in range(self.max_workers)]
+        if self._executor is None:
+            self._executor = self._create_executor()
+        return self._queue
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        context = multiprocessing.get_context(self.start_method)
+        if self.start_method == "forkserver" and self.preload:
+            context.set_forkserver_preload(self.preload)
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        """Replace a broken executor, once, however many of its jobs report it"""
+        if self._executor is not broken:
+            return
+        self._restarts += 1
+        self._executor = self._create_executor()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            _, _, enqueued_at, func, args, future = await queue.get()
+            try:
+                if future.cancelled():
+                    continue
+                wait = time.monotonic() - enqueued_at
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+                self._in_flight += 1
+                executor = self._executor
+                try:
+                    result = await loop.run_in_executor(executor, func, *args)
+                except Exception as e:
+                    if isinstance(e, BrokenProcessPool):
+                        self._restart(executor)
+                    self._failed += 1
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    self._completed += 1
+                    if not future.done():
+                        future.set_result(result)
+                finally:
+                    self._in_flight -= 1
+            finally:
+                queue.task_done()
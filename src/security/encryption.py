@@ -1,97 +1,746 @@
 """Password encryption and decryption module"""
+import asyncio
 import os
-from typing import Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple, Union
 from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import base64
 
+from src.config import KEY_CACHE_MAX_ENTRIES, KEY_CACHE_IDLE_TTL, CRYPTO_POOL_WORKERS, CRYPTO_POOL_START_METHOD
+from src.security.ciphers import BoundCipher, FernetSuite, get_suite, get_suite_by_name
+from src.security.crypto_pool import CryptoPool
+from src.security.kdf import KdfParams, LEGACY_KDF
+from src.security.key_cache import KeyCache
+
+key_cache = KeyCache(max_entries=KEY_CACHE_MAX_ENTRIES, idle_ttl=KEY_CACHE_IDLE_TTL)
+crypto_pool = CryptoPool(
+    max_workers=CRYPTO_POOL_WORKERS, start_method=CRYPTO_POOL_START_METHOD, preload=[__name__]
+)
+
+DATA_KEY_VERSION = "v2"
+SEALED_VERSION = "v3"
+KDF_PREFIX = "$"
+DERIVED_BLOB_VERSION = 0x01
+
+Ciphertext = Union[str, bytes, memoryview]
+
+
+@dataclass
+class DecryptResult:
+    """Outcome of decrypting one record in a batch"""
+    record_id: Hashable
+    value: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
 
 class EncryptionService:
     """Service for encrypting and decrypting passwords"""
-    
+
     SALT_LENGTH = 16
-    
+    BATCH_PARALLEL_THRESHOLD = 4
+
     @staticmethod
-    def derive_key(master_password: str, salt: bytes) -> bytes:
+    def derive_key(master_password: str, salt: bytes, params: Optional[KdfParams] = None) -> bytes:
         """
-        Derive encryption key from master password using PBKDF2.
-        
+        Derive encryption key from master password.
+
         Args:
             master_password: The master password string
             salt: Salt bytes for key derivation
-            
+            params: KDF parameters, defaults to the configured ones
+
         Returns:
             URL-safe base64 encoded encryption key
         """
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(master_password.encode()))
+        params = params or KdfParams.current()
+        key = base64.urlsafe_b64encode(params.derive(master_password.encode(), salt))
         return key
-    
+
+    @staticmethod
+    def get_cipher(
+        master_password: str,
+        salt: bytes,
+        scope: Optional[Hashable] = None,
+        params: Optional[KdfParams] = None,
+    ) -> Fernet:
+        """
+        Get cipher for salt, reusing the session key cache when scoped.
+
+        Args:
+            master_password: Master password for key derivation
+            salt: Salt bytes for key derivation
+            scope: Authenticated session scope (user ID), None disables caching
+            params: KDF parameters, defaults to the configured ones
+
+        Returns:
+            Fernet cipher
+        """
+        params = params or KdfParams.current()
+        if scope is not None:
+            cipher = key_cache.get(scope, (params, salt))
+            if cipher is not None:
+                return cipher
+
+        cipher = Fernet(EncryptionService.derive_key(master_password, salt, params))
+        if scope is not None:
+            key_cache.put(scope, (params, salt), cipher)
+        return cipher
+
+    @staticmethod
+    def close_session(scope: Hashable) -> None:
+        """
+        Evict all cached keys of a session.
+
+        Args:
+            scope: Session scope (user ID)
+        """
+        key_cache.evict(scope)
+
     @staticmethod
     def encrypt_password(password: str, master_password: str) -> str:
         """
         Encrypt password with master password.
-        
+
         Args:
             password: Password to encrypt
             master_password: Master password for encryption
-            
+
         Returns:
-            Encrypted password with salt (format: salt:encrypted)
+            Encrypted password with KDF metadata (format: $algorithm$cost$salt:encrypted)
         """
-
+        params = KdfParams.current()
         salt = os.urandom(EncryptionService.SALT_LENGTH)
-        
-        key = EncryptionService.derive_key(master_password, salt)
-        
-        cipher = Fernet(key)
+
+        cipher = Fernet(EncryptionService.derive_key(master_password, salt, params))
         encrypted = cipher.encrypt(password.encode())
-        
-        salt_b64 = base64.b64encode(salt).decode()
-        encrypted_b64 = encrypted.decode()
-        
-        return f"{salt_b64}:{encrypted_b64}"
-    
+
+        return EncryptionService.format_encrypted(params, salt, encrypted)
+
     @staticmethod
-    def decrypt_password(encrypted_data: str, master_password: str) -> str:
+    def decrypt_password(
+        encrypted_data: Ciphertext,
+        master_password: str,
+        scope: Optional[Hashable] = None,
+        data_key: Optional[bytes] = None,
+    ) -> str:
         """
-        Decrypt password with master password.
-        
+        Decrypt password with master password or user data key.
+
         Args:
-            encrypted_data: Encrypted password data (format: salt:encrypted)
-            master_password: Master password for decryption
-            
+            encrypted_data: Encrypted password data (binary, v3:sealed, v2:encrypted,
+                $algorithm$cost$salt:encrypted or legacy salt:encrypted)
+            master_password: Master password for derived-key data
+            scope: Authenticated session scope (user ID) for key reuse
+            data_key: User data key, required for data-key ciphertexts
+
         Returns:
             Decrypted password
-            
+
         Raises:
             ValueError: If decryption fails or data format is invalid
         """
         try:
-            
-            parts = encrypted_data.split(":", 1)
-            if len(parts) != 2:
-                raise ValueError("Invalid encrypted data format")
-            
-            salt_b64, encrypted_b64 = parts
-            
-
-            salt = base64.b64decode(salt_b64)
-            
-   
-            key = EncryptionService.derive_key(master_password, salt)
-            
-
-            cipher = Fernet(key)
-            decrypted = cipher.decrypt(encrypted_b64.encode())
-            
+            if not EncryptionService.is_legacy(encrypted_data):
+                if data_key is None:
+                    raise ValueError("Data key required")
+                return EncryptionService.decrypt_with_data_key(encrypted_data, data_key)
+
+            params, salt, token = EncryptionService.parse_encrypted(encrypted_data)
+            cipher = EncryptionService.get_cipher(master_password, salt, scope, params)
+            decrypted = cipher.decrypt(token)
+
             return decrypted.decode()
-        
+
         except Exception as e:
             raise ValueError(f"Failed to decrypt password: {str(e)}")
+
+    @staticmethod
+    def decrypt_many(
+        records: Iterable[Tuple[Hashable, Ciphertext]],
+        master_password: str,
+        scope: Optional[Hashable] = None,
+        data_key: Optional[bytes] = None,
+        max_workers: Optional[int] = None,
+    ) -> List[DecryptResult]:
+        """
+        Decrypt many records, deriving each distinct key only once.
+
+        Derived-key records are grouped by KDF parameters and salt; when many
+        keys are missing from the key cache they are derived on worker threads.
+
+        Args:
+            records: Iterable of (record_id, encrypted_data) pairs
+            master_password: Master password for derived-key data
+            scope: Authenticated session scope (user ID) for key reuse
+            data_key: User data key for v2/v3 data
+            max_workers: Thread count for parallel derivation, defaults to CPU count
+
+        Returns:
+            One DecryptResult per record, in input order
+        """
+        results, groups = EncryptionService._prepare_batch(records, data_key)
+        ciphers = EncryptionService._cached_ciphers(groups, scope)
+        missing = [spec for spec in groups if spec not in ciphers]
+
+        def derive(spec: Tuple[KdfParams, bytes]):
+            params, salt = spec
+            try:
+                return EncryptionService.get_cipher(master_password, salt, scope, params)
+            except Exception as e:
+                return e
+
+        if len(missing) >= EncryptionService.BATCH_PARALLEL_THRESHOLD:
+            workers = min(len(missing), max_workers or os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                ciphers.update(zip(missing, executor.map(derive, missing)))
+        else:
+            ciphers.update((spec, derive(spec)) for spec in missing)
+
+        EncryptionService._finish_batch(results, groups, ciphers)
+        return results
+
+    @staticmethod
+    async def decrypt_many_async(
+        records: Iterable[Tuple[Hashable, Ciphertext]],
+        master_password: str,
+        scope: Optional[Hashable] = None,
+        data_key: Optional[bytes] = None,
+        priority: int = CryptoPool.PRIORITY_INTERACTIVE,
+    ) -> List[DecryptResult]:
+        """
+        Async counterpart of decrypt_many, derivations run on the crypto pool.
+
+        Args:
+            records: Iterable of (record_id, encrypted_data) pairs
+            master_password: Master password for derived-key data
+            scope: Authenticated session scope (user ID) for key reuse
+            data_key: User data key for v2/v3 data
+            priority: Crypto pool priority, lower runs first
+
+        Returns:
+            One DecryptResult per record, in input order
+        """
+        results, groups = EncryptionService._prepare_batch(records, data_key)
+        ciphers = EncryptionService._cached_ciphers(groups, scope)
+        missing = [spec for spec in groups if spec not in ciphers]
+
+        derived = await asyncio.gather(
+            *(
+                EncryptionService.get_cipher_async(master_password, salt, scope, priority, params=params)
+                for params, salt in missing
+            ),
+            return_exceptions=True,
+        )
+        ciphers.update(zip(missing, derived))
+
+        EncryptionService._finish_batch(results, groups, ciphers)
+        return results
+
+    @staticmethod
+    def _prepare_batch(
+        records: Iterable[Tuple[Hashable, Ciphertext]], data_key: Optional[bytes]
+    ) -> Tuple[List[DecryptResult], Dict[Tuple[KdfParams, bytes], List[Tuple[int, bytes]]]]:
+        """Decrypt data-key records and group derived-key records by KDF parameters and salt"""
+        results: List[DecryptResult] = []
+        groups: Dict[Tuple[KdfParams, bytes], List[Tuple[int, bytes]]] = {}
+        data_ciphers: Dict[int, BoundCipher] = {}
+
+        for index, (record_id, encrypted_data) in enumerate(records):
+            result = DecryptResult(record_id=record_id)
+            results.append(result)
+            try:
+                if EncryptionService.is_legacy(encrypted_data):
+                    params, salt, token = EncryptionService.parse_encrypted(encrypted_data)
+                    groups.setdefault((params, salt), []).append((index, token))
+                    continue
+                if data_key is None:
+                    raise ValueError("Data key required")
+                version, body = EncryptionService.split_sealed(encrypted_data)
+                cipher = data_ciphers.get(version)
+                if cipher is None:
+                    cipher = data_ciphers[version] = get_suite(version).bind(data_key)
+                result.value = cipher.decrypt(body).decode()
+            except Exception as e:
+                result.error = f"Failed to decrypt password: {str(e) or type(e).__name__}"
+
+        return results, groups
+
+    @staticmethod
+    def _cached_ciphers(groups: Dict[Tuple[KdfParams, bytes], list], scope: Optional[Hashable]) -> dict:
+        """Look up already derived ciphers for batch key specs"""
+        if scope is None:
+            return {}
+        ciphers = {}
+        for spec in groups:
+            cipher = key_cache.get(scope, spec)
+            if cipher is not None:
+                ciphers[spec] = cipher
+        return ciphers
+
+    @staticmethod
+    def _finish_batch(
+        results: List[DecryptResult], groups: Dict[Tuple[KdfParams, bytes], List[Tuple[int, bytes]]], ciphers: dict
+    ) -> None:
+        """Decrypt grouped derived-key records with their ciphers"""
+        for spec, items in groups.items():
+            cipher = ciphers[spec]
+            for index, token in items:
+                result = results[index]
+                try:
+                    if isinstance(cipher, Exception):
+                        raise cipher
+                    result.value = cipher.decrypt(token).decode()
+                except Exception as e:
+                    result.error = f"Failed to decrypt password: {str(e) or type(e).__name__}"
+
+    @staticmethod
+    def reencrypt_batch(
+        records: List[Tuple[Hashable, Union[str, bytes]]],
+        master_password: str,
+        old_data_key: bytes,
+        new_data_key: bytes,
+    ) -> List[Tuple[Hashable, Optional[bytes]]]:
+        """
+        Decrypt records under the old keys and seal them under a new data key.
+
+        Module-level picklable entry point, meant to run on the crypto pool.
+
+        Args:
+            records: (record_id, encrypted_data) pairs, bytes instead of memoryview
+            master_password: Old master password for derived-key data
+            old_data_key: Current data key
+            new_data_key: Data key to re-encrypt under
+
+        Returns:
+            (record_id, binary ciphertext) pairs, None for records that failed to decrypt
+        """
+        results = EncryptionService.decrypt_many(records, master_password, data_key=old_data_key)
+        suite = get_suite_by_name()
+        cipher = suite.bind(new_data_key)
+        return [
+            (result.record_id, EncryptionService.seal(result.value, cipher, suite.version) if result.ok else None)
+            for result in results
+        ]
+
+    @staticmethod
+    def generate_data_key() -> bytes:
+        """
+        Generate random per-user data encryption key.
+
+        Returns:
+            URL-safe base64 encoded key
+        """
+        return Fernet.generate_key()
+
+    @staticmethod
+    def wrap_data_key(data_key: bytes, master_password: str) -> str:
+        """
+        Encrypt data key with master password.
+
+        Args:
+            data_key: Data encryption key
+            master_password: Master password for key derivation
+
+        Returns:
+            Wrapped key (format: $algorithm$cost$salt:encrypted)
+        """
+        return EncryptionService.encrypt_password(data_key.decode(), master_password)
+
+    @staticmethod
+    def unwrap_data_key(wrapped_key: Ciphertext, master_password: str) -> bytes:
+        """
+        Decrypt data key with master password.
+
+        Args:
+            wrapped_key: Wrapped key with KDF metadata
+            master_password: Master password for key derivation
+
+        Returns:
+            Data encryption key
+
+        Raises:
+            ValueError: If the master password is wrong or data is corrupted
+        """
+        return EncryptionService.decrypt_password(wrapped_key, master_password).encode()
+
+    @staticmethod
+    def encrypt_with_data_key(password: str, data_key: bytes, suite_name: Optional[str] = None) -> str:
+        """
+        Encrypt password with user data key, no key derivation involved.
+
+        Args:
+            password: Password to encrypt
+            data_key: Data encryption key
+            suite_name: Cipher suite name, defaults to the configured one
+
+        Returns:
+            Encrypted password (format: v3:base64(version|body), or v2:encrypted for Fernet)
+        """
+        suite = get_suite_by_name(suite_name)
+        if suite.version == FernetSuite.version:
+            encrypted = suite.bind(data_key).encrypt(password.encode())
+            return f"{DATA_KEY_VERSION}:{base64.urlsafe_b64encode(encrypted).decode()}"
+        sealed = EncryptionService.seal(password, suite.bind(data_key), suite.version)
+        return f"{SEALED_VERSION}:{base64.b64encode(sealed).decode()}"
+
+    @staticmethod
+    def decrypt_with_data_key(encrypted_data: Ciphertext, data_key: bytes) -> str:
+        """
+        Decrypt data-key ciphertext with user data key.
+
+        Args:
+            encrypted_data: Encrypted password data (format: v2:encrypted, v3:sealed or version | body bytes)
+            data_key: Data encryption key
+
+        Returns:
+            Decrypted password
+
+        Raises:
+            ValueError: If data format is invalid
+            cryptography.exceptions.InvalidTag, cryptography.fernet.InvalidToken: If the key does not match
+        """
+        version, body = EncryptionService.split_sealed(encrypted_data)
+        return get_suite(version).bind(data_key).decrypt(body).decode()
+
+    @staticmethod
+    def seal(password: str, cipher: BoundCipher, version: int) -> bytes:
+        """
+        Encrypt to raw bytes prefixed with the suite version byte.
+
+        Args:
+            password: Password to encrypt
+            cipher: Cipher bound to the data key
+            version: Suite version byte
+
+        Returns:
+            version | body
+        """
+        return bytes((version,)) + cipher.encrypt(password.encode())
+
+    @staticmethod
+    def seal_with_data_key(password: str, data_key: bytes, suite_name: Optional[str] = None) -> bytes:
+        """
+        Encrypt password with user data key to the binary storage format.
+
+        Args:
+            password: Password to encrypt
+            data_key: Data encryption key
+            suite_name: Cipher suite name, defaults to the configured one
+
+        Returns:
+            version | body
+        """
+        suite = get_suite_by_name(suite_name)
+        return EncryptionService.seal(password, suite.bind(data_key), suite.version)
+
+    @staticmethod
+    def split_sealed(encrypted_data: Ciphertext) -> Tuple[int, bytes]:
+        """
+        Split data-key ciphertext into suite version and body.
+
+        Binary values are sliced through a memoryview, the body is not copied.
+
+        Args:
+            encrypted_data: Encrypted password data (format: v2:encrypted, v3:sealed or version | body bytes)
+
+        Returns:
+            Tuple of (suite version, body)
+
+        Raises:
+            ValueError: If data format is invalid
+        """
+        if not isinstance(encrypted_data, str):
+            data = memoryview(encrypted_data)
+            if not data or data[0] == DERIVED_BLOB_VERSION:
+                raise ValueError("Invalid encrypted data format")
+            return data[0], data[1:]
+
+        prefix, _, payload = encrypted_data.partition(":")
+        if prefix == DATA_KEY_VERSION:
+            return FernetSuite.version, base64.urlsafe_b64decode(payload)
+        if prefix == SEALED_VERSION:
+            sealed = base64.b64decode(payload)
+            if not sealed:
+                raise ValueError("Invalid encrypted data format")
+            return sealed[0], sealed[1:]
+        raise ValueError("Invalid encrypted data format")
+
+    @staticmethod
+    def is_legacy(encrypted_data: Ciphertext) -> bool:
+        """
+        Check whether data is encrypted with a password-derived key.
+
+        Args:
+            encrypted_data: Encrypted password data
+
+        Returns:
+            True for salt:encrypted, $algorithm$cost$salt:encrypted and derived-key binary data
+        """
+        if not isinstance(encrypted_data, str):
+            data = memoryview(encrypted_data)
+            return len(data) > 0 and data[0] == DERIVED_BLOB_VERSION
+        return not encrypted_data.startswith((f"{DATA_KEY_VERSION}:", f"{SEALED_VERSION}:"))
+
+    @staticmethod
+    def is_outdated(encrypted_data: Ciphertext) -> bool:
+        """
+        Check whether data was produced with other than the configured KDF parameters or cipher suite.
+
+        Args:
+            encrypted_data: Encrypted password data
+
+        Returns:
+            True if the data should be re-encrypted
+        """
+        try:
+            if not EncryptionService.is_legacy(encrypted_data):
+                version, _ = EncryptionService.split_sealed(encrypted_data)
+                return version != get_suite_by_name().version
+            params, _, _ = EncryptionService.parse_encrypted(encrypted_data)
+        except ValueError:
+            return False
+        return params != KdfParams.current()
+
+    @staticmethod
+    def format_encrypted(params: KdfParams, salt: bytes, token: bytes) -> str:
+        """
+        Render derived-key ciphertext with its KDF metadata.
+
+        Args:
+            params: KDF parameters used for the key
+            salt: Salt bytes
+            token: Fernet token
+
+        Returns:
+            Stored value (format: $algorithm$cost$salt:encrypted)
+        """
+        salt_b64 = base64.b64encode(salt).decode()
+        return f"{KDF_PREFIX}{params.algorithm}${params.cost}${salt_b64}:{token.decode()}"
+
+    @staticmethod
+    def parse_encrypted(encrypted_data: Ciphertext) -> Tuple[KdfParams, bytes, bytes]:
+        """
+        Split stored value into KDF parameters, salt and Fernet token.
+
+        Values without metadata (format: salt:encrypted) use the original
+        PBKDF2-SHA256 100000 iterations parameters.
+
+        Args:
+            encrypted_data: Encrypted password data, text or 0x01 | kdf | salt | token bytes
+
+        Returns:
+            Tuple of (params, salt, token)
+
+        Raises:
+            ValueError: If data format is invalid
+        """
+        if not isinstance(encrypted_data, str):
+            data = memoryview(encrypted_data)
+            if len(data) < 2 or data[0] != DERIVED_BLOB_VERSION:
+                raise ValueError("Invalid encrypted data format")
+            params, header_length = KdfParams.from_bytes(data[1:])
+            start = 1 + header_length + EncryptionService.SALT_LENGTH
+            if len(data) <= start:
+                raise ValueError("Invalid encrypted data format")
+            salt = bytes(data[start - EncryptionService.SALT_LENGTH:start])
+            return params, salt, base64.urlsafe_b64encode(data[start:])
+
+        params = LEGACY_KDF
+        if encrypted_data.startswith(KDF_PREFIX):
+            header = encrypted_data[len(KDF_PREFIX):].split("$", 2)
+            if len(header) != 3:
+                raise ValueError("Invalid encrypted data format")
+            algorithm, cost, encrypted_data = header
+            params = KdfParams.parse(algorithm, cost)
+
+        parts = encrypted_data.split(":", 1)
+        if len(parts) != 2:
+            raise ValueError("Invalid encrypted data format")
+
+        salt_b64, encrypted_b64 = parts
+        return params, base64.b64decode(salt_b64), encrypted_b64.encode()
+
+    @staticmethod
+    def to_blob(encrypted_data: Ciphertext) -> bytes:
+        """
+        Repackage stored value into the binary storage format without decrypting it.
+
+        Derived-key values become 0x01 | kdf | salt | token, data-key values
+        become version | body.
+
+        Args:
+            encrypted_data: Encrypted password data in any supported format
+
+        Returns:
+            Binary value
+
+        Raises:
+            ValueError: If data format is invalid
+        """
+        if not isinstance(encrypted_data, str):
+            return bytes(encrypted_data)
+        if not EncryptionService.is_legacy(encrypted_data):
+            version, body = EncryptionService.split_sealed(encrypted_data)
+            return bytes((version,)) + bytes(body)
+        params, salt, token = EncryptionService.parse_encrypted(encrypted_data)
+        if len(salt) != EncryptionService.SALT_LENGTH:
+            raise ValueError("Invalid encrypted data format")
+        return bytes((DERIVED_BLOB_VERSION,)) + params.to_bytes() + salt + base64.urlsafe_b64decode(token)
+
+    @staticmethod
+    async def derive_key_async(
+        master_password: str,
+        salt: bytes,
+        priority: int = CryptoPool.PRIORITY_INTERACTIVE,
+        params: Optional[KdfParams] = None,
+    ) -> bytes:
+        """
+        Derive encryption key on the crypto process pool.
+
+        Args:
+            master_password: The master password string
+            salt: Salt bytes for key derivation
+            priority: Crypto pool priority, lower runs first
+            params: KDF parameters, defaults to the configured ones
+
+        Returns:
+            URL-safe base64 encoded encryption key
+        """
+        params = params or KdfParams.current()
+        return await crypto_pool.run(EncryptionService.derive_key, master_password, salt, params, priority=priority)
+
+    @staticmethod
+    async def get_cipher_async(
+        master_password: str,
+        salt: bytes,
+        scope: Optional[Hashable] = None,
+        priority: int = CryptoPool.PRIORITY_INTERACTIVE,
+        params: Optional[KdfParams] = None,
+    ) -> Fernet:
+        """
+        Async counterpart of get_cipher.
+
+        Args:
+            master_password: Master password for key derivation
+            salt: Salt bytes for key derivation
+            scope: Authenticated session scope (user ID), None disables caching
+            priority: Crypto pool priority, lower runs first
+            params: KDF parameters, defaults to the configured ones
+
+        Returns:
+            Fernet cipher
+        """
+        params = params or KdfParams.current()
+        if scope is not None:
+            cipher = key_cache.get(scope, (params, salt))
+            if cipher is not None:
+                return cipher
+
+        cipher = Fernet(await EncryptionService.derive_key_async(master_password, salt, priority, params))
+        if scope is not None:
+            key_cache.put(scope, (params, salt), cipher)
+        return cipher
+
+    @staticmethod
+    async def encrypt_password_async(
+        password: str, master_password: str, priority: int = CryptoPool.PRIORITY_INTERACTIVE
+    ) -> str:
+        """
+        Async counterpart of encrypt_password.
+
+        Args:
+            password: Password to encrypt
+            master_password: Master password for encryption
+            priority: Crypto pool priority, lower runs first
+
+        Returns:
+            Encrypted password with KDF metadata (format: $algorithm$cost$salt:encrypted)
+        """
+        params = KdfParams.current()
+        salt = os.urandom(EncryptionService.SALT_LENGTH)
+
+        cipher = Fernet(await EncryptionService.derive_key_async(master_password, salt, priority, params))
+        encrypted = cipher.encrypt(password.encode())
+
+        return EncryptionService.format_encrypted(params, salt, encrypted)
+
+    @staticmethod
+    async def decrypt_password_async(
+        encrypted_data: Ciphertext,
+        master_password: str,
+        scope: Optional[Hashable] = None,
+        data_key: Optional[bytes] = None,
+        priority: int = CryptoPool.PRIORITY_INTERACTIVE,
+    ) -> str:
+        """
+        Async counterpart of decrypt_password.
+
+        Args:
+            encrypted_data: Encrypted password data (binary, v3:sealed, v2:encrypted,
+                $algorithm$cost$salt:encrypted or legacy salt:encrypted)
+            master_password: Master password for derived-key data
+            scope: Authenticated session scope (user ID) for key reuse
+            data_key: User data key, required for data-key ciphertexts
+            priority: Crypto pool priority, lower runs first
+
+        Returns:
+            Decrypted password
+
+        Raises:
+            ValueError: If decryption fails or data format is invalid
+        """
+        try:
+            if not EncryptionService.is_legacy(encrypted_data):
+                if data_key is None:
+                    raise ValueError("Data key required")
+                return EncryptionService.decrypt_with_data_key(encrypted_data, data_key)
+
+            params, salt, token = EncryptionService.parse_encrypted(encrypted_data)
+            cipher = await EncryptionService.get_cipher_async(master_password, salt, scope, priority, params)
+            return cipher.decrypt(token).decode()
+
+        except Exception as e:
+            raise ValueError(f"Failed to decrypt password: {str(e)}")
+
+    @staticmethod
+    async def wrap_data_key_async(
+        data_key: bytes, master_password: str, priority: int = CryptoPool.PRIORITY_INTERACTIVE
+    ) -> str:
+        """
+        Async counterpart of wrap_data_key.
+
+        Args:
+            data_key: Data encryption key
+            master_password: Master password for key derivation
+            priority: Crypto pool priority, lower runs first
+
+        Returns:
+            Wrapped key (format: $algorithm$cost$salt:encrypted)
+        """
+        return await EncryptionService.encrypt_password_async(data_key.decode(), master_password, priority)
+
+    @staticmethod
+    async def unwrap_data_key_async(
+        wrapped_key: Ciphertext, master_password: str, priority: int = CryptoPool.PRIORITY_INTERACTIVE
+    ) -> bytes:
+        """
+        Async counterpart of unwrap_data_key.
+
+        Args:
+            wrapped_key: Wrapped key with KDF metadata
+            master_password: Master password for key derivation
+            priority: Crypto pool priority, lower runs first
+
+        Returns:
+            Data encryption key
+
+        Raises:
+            ValueError: If the master password is wrong or data is corrupted
+        """
+        decrypted = await EncryptionService.decrypt_password_async(wrapped_key, master_password, priority=priority)
+        return decrypted.encode()
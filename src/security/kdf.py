@@ -0,0 +1,175 @@
+"""Key derivation parameters and host calibration"""
+import os
+import struct
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+from src.config import KDF_ALGORITHM, KDF_ITERATIONS, KDF_SCRYPT_N, KDF_SCRYPT_R, KDF_SCRYPT_P
+
+PBKDF2_SHA256 = "pbkdf2-sha256"
+SCRYPT = "scrypt"
+
+KEY_LENGTH = 32
+KDF_IDS = {PBKDF2_SHA256: 1, SCRYPT: 2}
+MAX_SCRYPT_N = 2 ** 20
+
+
+@dataclass(frozen=True)
+class KdfParams:
+    """KDF algorithm and cost stored alongside every derived-key ciphertext"""
+    algorithm: str = PBKDF2_SHA256
+    iterations: int = 100000
+    n: int = 2 ** 14
+    r: int = 8
+    p: int = 1
+
+    @property
+    def cost(self) -> str:
+        """Cost part of the stored format"""
+        if self.algorithm == SCRYPT:
+            return f"{self.n},{self.r},{self.p}"
+        return str(self.iterations)
+
+    @staticmethod
+    def parse(algorithm: str, cost: str) -> "KdfParams":
+        """
+        Build parameters from the stored algorithm and cost.
+
+        Args:
+            algorithm: Algorithm name
+            cost: Cost string produced by KdfParams.cost
+
+        Returns:
+            KdfParams
+
+        Raises:
+            ValueError: If the algorithm is unknown or cost is malformed
+        """
+        if algorithm == PBKDF2_SHA256:
+            return KdfParams(algorithm=algorithm, iterations=int(cost))
+        if algorithm == SCRYPT:
+            n, r, p = (int(part) for part in cost.split(","))
+            return KdfParams(algorithm=algorithm, n=n, r=r, p=p)
+        raise ValueError(f"Unknown KDF algorithm: {algorithm}")
+
+    def to_bytes(self) -> bytes:
+        """Binary header: algorithm id followed by cost fields"""
+        if self.algorithm == SCRYPT:
+            return struct.pack(">BBBB", KDF_IDS[SCRYPT], self.n.bit_length() - 1, self.r, self.p)
+        return struct.pack(">BI", KDF_IDS[PBKDF2_SHA256], self.iterations)
+
+    @staticmethod
+    def from_bytes(data) -> Tuple["KdfParams", int]:
+        """
+        Parse binary header produced by to_bytes.
+
+        Args:
+            data: Bytes-like object starting with the header
+
+        Returns:
+            Tuple of (params, header length)
+
+        Raises:
+            ValueError: If the algorithm id is unknown
+        """
+        if data[0] == KDF_IDS[SCRYPT]:
+            _, log_n, r, p = struct.unpack_from(">BBBB", data)
+            return KdfParams(algorithm=SCRYPT, n=1 << log_n, r=r, p=p), 4
+        if data[0] == KDF_IDS[PBKDF2_SHA256]:
+            _, iterations = struct.unpack_from(">BI", data)
+            return KdfParams(algorithm=PBKDF2_SHA256, iterations=iterations), 5
+        raise ValueError(f"Unknown KDF id: {data[0]}")
+
+    @staticmethod
+    def current() -> "KdfParams":
+        """Parameters configured for new ciphertexts"""
+        return KdfParams.parse(
+            KDF_ALGORITHM,
+            f"{KDF_SCRYPT_N},{KDF_SCRYPT_R},{KDF_SCRYPT_P}" if KDF_ALGORITHM == SCRYPT else str(KDF_ITERATIONS),
+        )
+
+    def derive(self, secret: bytes, salt: bytes) -> bytes:
+        """
+        Derive raw key bytes.
+
+        Args:
+            secret: Master password bytes
+            salt: Salt bytes
+
+        Returns:
+            32 raw key bytes
+        """
+        if self.algorithm == SCRYPT:
+            kdf = Scrypt(salt=salt, length=KEY_LENGTH, n=self.n, r=self.r, p=self.p)
+        else:
+            kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=KEY_LENGTH, salt=salt, iterations=self.iterations)
+        return kdf.derive(secret)
+
+
+LEGACY_KDF = KdfParams(algorithm=PBKDF2_SHA256, iterations=100000)
+
+
+def measure(params: KdfParams, rounds: int = 3) -> float:
+    """
+    Measure derivation time on this host.
+
+    Args:
+        params: Parameters to benchmark
+        rounds: Number of runs, the fastest one is reported
+
+    Returns:
+        Seconds per derivation
+    """
+    salt = os.urandom(16)
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        params.derive(b"calibration", salt)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def calibrate(algorithm: str = PBKDF2_SHA256, target_seconds: float = 0.1, rounds: int = 3) -> KdfParams:
+    """
+    Pick the cost that makes one derivation take about the target time.
+
+    Args:
+        algorithm: KDF algorithm to calibrate
+        target_seconds: Desired time per derivation
+        rounds: Runs per measurement
+
+    Returns:
+        Calibrated KdfParams
+    """
+    if algorithm == SCRYPT:
+        params = KdfParams(algorithm=SCRYPT, n=2 ** 10)
+        while params.n < MAX_SCRYPT_N:
+            candidate = KdfParams(algorithm=SCRYPT, n=params.n * 2, r=params.r, p=params.p)
+            if measure(candidate, rounds) > target_seconds:
+                break
+            params = candidate
+        return params
+
+    if algorithm != PBKDF2_SHA256:
+        raise ValueError(f"Unknown KDF algorithm: {algorithm}")
+
+    probe = KdfParams(algorithm=PBKDF2_SHA256, iterations=20000)
+    per_iteration = measure(probe, rounds) / probe.iterations
+    iterations = max(10000, int(target_seconds / per_iteration) // 1000 * 1000)
+    return KdfParams(algorithm=PBKDF2_SHA256, iterations=iterations)
+
+
+def describe(params: Optional[KdfParams] = None) -> str:
+    """Render parameters as environment settings"""
+    params = params or KdfParams.current()
+    if params.algorithm == SCRYPT:
+        return (
+            f"KDF_ALGORITHM={SCRYPT}\n"
+            f"KDF_SCRYPT_N={params.n}\nKDF_SCRYPT_R={params.r}\nKDF_SCRYPT_P={params.p}"
+        )
+    return f"KDF_ALGORITHM={PBKDF2_SHA256}\nKDF_ITERATIONS={params.iterations}"
@@ -0,0 +1,115 @@
+"""Session-scoped cache for derived encryption keys"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class KeyCache:
+    """
+    Bounded LRU cache of derived keys with idle TTL.
+
+    Entries are grouped by scope (the authenticated user ID of a login
+    session), so a whole session can be evicted on logout. Only keys derived
+    from the correct master password must be stored under a scope.
+    """
+
+    def __init__(self, max_entries: int = 4096, idle_ttl: float = 900.0):
+        self.max_entries = max_entries
+        self.idle_ttl = idle_ttl
+        self._entries: "OrderedDict[Tuple[Hashable, Hashable], Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, scope: Hashable, name: Hashable) -> Optional[Any]:
+        """
+        Get cached value and refresh its idle timer.
+
+        Args:
+            scope: Session scope (user ID)
+            name: Entry name within the scope (e.g. salt bytes)
+
+        Returns:
+            Cached value if present and not expired, None otherwise
+        """
+        cache_key = (scope, name)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                return None
+            value, last_used = entry
+            if now - last_used > self.idle_ttl:
+                del self._entries[cache_key]
+                return None
+            self._entries[cache_key] = (value, now)
+            self._entries.move_to_end(cache_key)
+            return value
+
+    def put(self, scope: Hashable, name: Hashable, value: Any) -> None:
+        """
+        Store value, evicting least recently used entries over the bound.
+
+        Args:
+            scope: Session scope (user ID)
+            name: Entry name within the scope
+            value: Value to cache
+        """
+        cache_key = (scope, name)
+        with self._lock:
+            self._entries[cache_key] = (value, time.monotonic())
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def evict(self, scope: Hashable) -> int:
+        """
+        Drop every entry of a session.
+
+        Args:
+            scope: Session scope (user ID)
+
+        Returns:
+            Number of evicted entries
+        """
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == scope]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def purge_expired(self) -> int:
+        """
+        Drop entries idle for longer than the TTL.
+
+        Returns:
+            Number of evicted entries
+        """
+        now = time.monotonic()
+        with self._lock:
+            keys = [key for key, (_, last_used) in self._entries.items() if now - last_used > self.idle_ttl]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    async def sweep(self, interval: float) -> None:
+        """
+        Purge expired entries every ``interval`` seconds until cancelled.
+
+        Entries otherwise expire only when read, so without a sweep keys of
+        sessions that went quiet stay in memory until LRU eviction.
+
+        Args:
+            interval: Seconds between purges
+        """
+        while True:
+            await asyncio.sleep(interval)
+            self.purge_expired()
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,5 +1,7 @@
 """Services package initialization"""
 from src.services.auth import AuthenticationService
+from src.services.keys import DataKeyService
+from src.services.migrations import StorageMigrationService
 from src.services.password import PasswordService
 
-__all__ = ["AuthenticationService", "PasswordService"]
+__all__ = ["AuthenticationService", "DataKeyService", "PasswordService", "StorageMigrationService"]
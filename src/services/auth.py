@@ -1,8 +1,11 @@
 """User authentication service"""
 from src.database.db import Database
+from src.database.async_db import AsyncDatabase, AsyncUserRepository
 from src.database.models import User
 from src.database.crud import UserRepository
-from src.security import EncryptionService
+from src.security import CryptoPool, EncryptionService
+from src.services.keys import DataKeyService
+from src.services.password import reveal_cache
 
 class AuthenticationService:
     """Service for user authentication with encrypted passwords"""
@@ -27,7 +30,7 @@ class AuthenticationService:
         
        
         try:
-            password_hash = EncryptionService.encrypt_password(password, username)
+            password_hash = EncryptionService.to_blob(EncryptionService.encrypt_password(password, username))
         except Exception as e:
             return False, f"Ошибка при шифровании пароля: {str(e)}"
         
@@ -40,6 +43,38 @@ class AuthenticationService:
         else:
             return False, "Ошибка при создании пользователя"
 
+    @staticmethod
+    async def register_user_async(db: AsyncDatabase, username: str, password: str) -> tuple[bool, str]:
+        """
+        Async counterpart of register_user, encryption runs on the crypto pool.
+        
+        Args:
+            db: Async database
+            username: Username
+            password: Plain text password
+            
+        Returns:
+            Tuple of (success: bool, message: str)
+        """
+        existing_user = await AsyncUserRepository.get_by_username(db, username)
+        if existing_user:
+            return False, "Пользователь с таким именем уже существует"
+
+        try:
+            password_hash = EncryptionService.to_blob(
+                await EncryptionService.encrypt_password_async(password, username)
+            )
+        except Exception as e:
+            return False, f"Ошибка при шифровании пароля: {str(e)}"
+
+        user = User(username=username, password_hash=password_hash)
+        user_id = await AsyncUserRepository.create(db, user)
+
+        if user_id:
+            return True, f"Пользователь {username} успешно зарегистрирован"
+        else:
+            return False, "Ошибка при создании пользователя"
+
     @staticmethod
     def authenticate_user(db: Database, username: str, password: str) -> tuple[bool, str, int]:
         """
@@ -69,3 +104,109 @@ class AuthenticationService:
                 return False, "Неверный пароль", 0
         except Exception as e:
             return False, f"Ошибка при проверке пароля: {str(e)}", 0
+
+    @staticmethod
+    async def authenticate_user_async(db: AsyncDatabase, username: str, password: str) -> tuple[bool, str, int]:
+        """
+        Async counterpart of authenticate_user, decryption runs on the crypto pool.
+        
+        Args:
+            db: Async database
+            username: Username
+            password: Plain text password
+            
+        Returns:
+            Tuple of (success: bool, message: str, user_id: int)
+        """
+        user = await AsyncUserRepository.get_by_username(db, username)
+        if not user:
+            return False, "Пользователь не найден", 0
+
+        try:
+            decrypted_password = await EncryptionService.decrypt_password_async(
+                user.password_hash, username
+            )
+            if decrypted_password == password:
+                return True, "Успешная аутентификация", user.id
+            else:
+                return False, "Неверный пароль", 0
+        except Exception as e:
+            return False, f"Ошибка при проверке пароля: {str(e)}", 0
+
+    @staticmethod
+    async def upgrade_credentials_async(
+        db: AsyncDatabase, user_id: int, username: str, password: str, master_password: str
+    ) -> int:
+        """
+        Re-encrypt user credentials produced with outdated KDF parameters.
+        
+        Runs at bulk priority on the crypto pool, meant for a background
+        task after a successful login.
+        
+        Args:
+            db: Async database
+            user_id: Authenticated user ID
+            username: Username
+            password: Plain text password that was just verified
+            master_password: User's master password for key wrapping
+            
+        Returns:
+            Number of re-encrypted values
+        """
+        user = await AsyncUserRepository.get_by_id(db, user_id)
+        if not user:
+            return 0
+
+        upgraded = 0
+        if EncryptionService.is_outdated(user.password_hash):
+            password_hash = await EncryptionService.encrypt_password_async(
+                password, username, priority=CryptoPool.PRIORITY_BULK
+            )
+            if await AsyncUserRepository.update_password_hash(db, user_id, EncryptionService.to_blob(password_hash)):
+                upgraded += 1
+
+        if user.data_key and EncryptionService.is_outdated(user.data_key):
+            data_key = await DataKeyService.get_data_key_async(db, user_id, master_password)
+            wrapped_key = await EncryptionService.wrap_data_key_async(
+                data_key, master_password, priority=CryptoPool.PRIORITY_BULK
+            )
+            wrapped_key = EncryptionService.to_blob(wrapped_key)
+            if await AsyncUserRepository.replace_data_key(db, user_id, user.data_key, wrapped_key):
+                upgraded += 1
+
+        return upgraded
+
+    @staticmethod
+    def start_session(db: Database, user_id: int, master_password: str) -> None:
+        """
+        Unwrap the user's data key once for a freshly authenticated user.
+        
+        Args:
+            db: Database instance
+            user_id: Authenticated user ID
+            master_password: User's master password for key unwrapping
+        """
+        DataKeyService.open_session(db, user_id, master_password)
+
+    @staticmethod
+    async def start_session_async(db: AsyncDatabase, user_id: int, master_password: str) -> None:
+        """
+        Async counterpart of start_session.
+        
+        Args:
+            db: Async database
+            user_id: Authenticated user ID
+            master_password: User's master password for key unwrapping
+        """
+        await DataKeyService.open_session_async(db, user_id, master_password)
+
+    @staticmethod
+    def end_session(user_id: int) -> None:
+        """
+        Evict cached encryption keys and revealed values on logout.
+        
+        Args:
+            user_id: User ID
+        """
+        DataKeyService.close_session(user_id)
+        reveal_cache.evict(user_id)
@@ -0,0 +1,129 @@
+"""Per-user data key management for envelope encryption"""
+from src.database.db import Database
+from src.database.async_db import AsyncDatabase, AsyncUserRepository
+from src.database.crud import UserRepository
+from src.security import EncryptionService
+from src.security.encryption import key_cache
+
+DATA_KEY = "data_key"
+
+
+class DataKeyService:
+    """Service for loading and caching per-user data encryption keys"""
+
+    @staticmethod
+    def get_data_key(db: Database, user_id: int, master_password: str) -> bytes:
+        """
+        Get user data key, unwrapping it at most once per session.
+
+        A user without a data key gets a new one, wrapped with the master
+        password and stored on the users row.
+
+        Args:
+            db: Database instance
+            user_id: Authenticated user ID
+            master_password: User's master password for key unwrapping
+
+        Returns:
+            Data encryption key
+
+        Raises:
+            ValueError: If the user is missing, the master password is wrong or a re-key is running
+        """
+        data_key = key_cache.get(user_id, DATA_KEY)
+        if data_key is not None:
+            return data_key
+
+        user = UserRepository.get_by_id(db, user_id)
+        if not user:
+            raise ValueError("User not found")
+        if user.rekey_checkpoint is not None:
+            raise ValueError("Vault re-key in progress")
+
+        if user.data_key:
+            data_key = EncryptionService.unwrap_data_key(user.data_key, master_password)
+        else:
+            data_key = EncryptionService.generate_data_key()
+            wrapped_key = EncryptionService.wrap_data_key(data_key, master_password)
+            if not UserRepository.set_data_key(db, user_id, EncryptionService.to_blob(wrapped_key)):
+                user = UserRepository.get_by_id(db, user_id)
+                if not user or not user.data_key:
+                    raise ValueError("Failed to store data key")
+                data_key = EncryptionService.unwrap_data_key(user.data_key, master_password)
+
+        key_cache.put(user_id, DATA_KEY, data_key)
+        return data_key
+
+    @staticmethod
+    async def get_data_key_async(db: AsyncDatabase, user_id: int, master_password: str) -> bytes:
+        """
+        Async counterpart of get_data_key, key derivation runs on the crypto pool.
+
+        Args:
+            db: Async database
+            user_id: Authenticated user ID
+            master_password: User's master password for key unwrapping
+
+        Returns:
+            Data encryption key
+
+        Raises:
+            ValueError: If the user is missing, the master password is wrong or a re-key is running
+        """
+        data_key = key_cache.get(user_id, DATA_KEY)
+        if data_key is not None:
+            return data_key
+
+        user = await AsyncUserRepository.get_by_id(db, user_id)
+        if not user:
+            raise ValueError("User not found")
+        if user.rekey_checkpoint is not None:
+            raise ValueError("Vault re-key in progress")
+
+        if user.data_key:
+            data_key = await EncryptionService.unwrap_data_key_async(user.data_key, master_password)
+        else:
+            data_key = EncryptionService.generate_data_key()
+            wrapped_key = await EncryptionService.wrap_data_key_async(data_key, master_password)
+            if not await AsyncUserRepository.set_data_key(db, user_id, EncryptionService.to_blob(wrapped_key)):
+                user = await AsyncUserRepository.get_by_id(db, user_id)
+                if not user or not user.data_key:
+                    raise ValueError("Failed to store data key")
+                data_key = await EncryptionService.unwrap_data_key_async(user.data_key, master_password)
+
+        key_cache.put(user_id, DATA_KEY, data_key)
+        return data_key
+
+    @staticmethod
+    def open_session(db: Database, user_id: int, master_password: str) -> None:
+        """
+        Unwrap user data key once at login.
+
+        Args:
+            db: Database instance
+            user_id: Authenticated user ID
+            master_password: User's master password for key unwrapping
+        """
+        DataKeyService.get_data_key(db, user_id, master_password)
+
+    @staticmethod
+    async def open_session_async(db: Database, user_id: int, master_password: str) -> None:
+        """
+        Async counterpart of open_session.
+
+        Args:
+            db: Database instance
+            user_id: Authenticated user ID
+            master_password: User's master password for key unwrapping
+        """
+        await DataKeyService.get_data_key_async(db, user_id, master_password)
+
+    @staticmethod
+    def close_session(user_id: int) -> None:
+        """
+        Evict cached keys on logout.
+
+        Args:
+            user_id: User ID
+        """
+        EncryptionService.close_session(user_id)
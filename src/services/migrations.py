@@ -0,0 +1,50 @@
+"""Online storage migrations"""
+from typing import Optional
+
+from src.database.db import Database
+from src.database.crud import BlobMigrationRepository
+from src.database.writer import DatabaseWriter
+from src.security import EncryptionService
+
+
+class StorageMigrationService:
+    """Service for converting stored ciphertexts between storage formats"""
+
+    BATCH_SIZE = 500
+
+    @staticmethod
+    def migrate_to_blob(db: Database, batch_size: int = BATCH_SIZE, writer: Optional[DatabaseWriter] = None) -> int:
+        """
+        Convert text ciphertexts to the binary format in small batches.
+
+        Values are repackaged without decryption, so no keys are needed. Every
+        batch is its own short transaction and rows changed concurrently are
+        skipped, which makes it safe to run while the bot is serving users.
+
+        Args:
+            db: Database instance
+            batch_size: Rows per transaction
+            writer: Writer to commit batches through instead of ``db``
+
+        Returns:
+            Number of converted values
+        """
+        converted = 0
+        for table, column in BlobMigrationRepository.COLUMNS:
+            after_id = 0
+            while True:
+                rows = BlobMigrationRepository.get_text_values(db, table, column, after_id, batch_size)
+                if not rows:
+                    break
+                values = []
+                for row_id, value in rows:
+                    try:
+                        values.append((row_id, value, EncryptionService.to_blob(value)))
+                    except ValueError as e:
+                        print(f"Skipping {table}.{column} row {row_id}: {e}")
+                if values and writer is not None:
+                    converted += writer.submit(BlobMigrationRepository.replace_values, table, column, values).result()
+                elif values:
+                    converted += BlobMigrationRepository.replace_values(db, table, column, values)
+                after_id = rows[-1][0]
+        return converted
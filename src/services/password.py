@@ -1,14 +1,27 @@
 """Password management service"""
-from typing import List
+import asyncio
+from collections import deque
+from typing import Hashable, List, Optional, Tuple, Union
 
+from src.config import VAULT_PAGE_SIZE, REVEAL_CACHE_MAX_ENTRIES, REVEAL_CACHE_TTL
 from src.database.db import Database
 from src.database.models import Password
+from src.database.async_db import AsyncDatabase, AsyncPasswordRepository, AsyncUserRepository
 from src.database.crud import PasswordRepository
-from src.security import EncryptionService
+from src.security import CryptoPool, DecryptResult, EncryptionService, KeyCache
+from src.security.encryption import crypto_pool
+from src.services.keys import DataKeyService
+
+REVEALED = "revealed"
+
+# Decrypted values shown in a view, kept apart from derived keys and briefly
+reveal_cache = KeyCache(max_entries=REVEAL_CACHE_MAX_ENTRIES, idle_ttl=REVEAL_CACHE_TTL)
 
 class PasswordService:
     """Service for managing encrypted passwords"""
 
+    REKEY_BATCH_SIZE = 500
+
     @staticmethod
     def create_password(
         db: Database,
@@ -33,33 +46,73 @@ class PasswordService:
             Tuple of (success: bool, message: str)
         """
         try:
-
-            encrypted_password = EncryptionService.encrypt_password(
-                password, master_password
+            encrypted_password = PasswordService.encrypt_secret(
+                db, user_id, password, master_password
             )
-            
+            return PasswordService._store_password(db, user_id, service, login, encrypted_password)
+        except Exception as e:
+            return False, f"Ошибка при создании пароля: {str(e)}"
 
-            pwd = Password(
-                user_id=user_id,
-                service=service,
-                login=login,
-                password=encrypted_password,
-            )
+    @staticmethod
+    async def create_password_async(
+        db: AsyncDatabase,
+        user_id: int,
+        service: str,
+        login: str,
+        password: str,
+        master_password: str,
+    ) -> tuple[bool, str]:
+        """
+        Async counterpart of create_password, key unwrapping runs on the crypto pool.
+        
+        Args:
+            db: Async database
+            user_id: User ID
+            service: Service name
+            login: Login for service
+            password: Plain text password
+            master_password: User's master password for encryption
             
-            pwd_id = PasswordRepository.create(db, pwd)
-            if pwd_id:
-                return True, f"Пароль для {service} успешно сохранён"
-            else:
-                return False, "Ошибка при сохранении пароля"
+        Returns:
+            Tuple of (success: bool, message: str)
+        """
+        try:
+            encrypted_password = await PasswordService.encrypt_secret_async(
+                db, user_id, password, master_password
+            )
+            return await PasswordService._store_password_async(db, user_id, service, login, encrypted_password)
         except Exception as e:
             return False, f"Ошибка при создании пароля: {str(e)}"
 
+    @staticmethod
+    def _store_password(
+        db: Database, user_id: int, service: str, login: str, encrypted_password: bytes
+    ) -> tuple[bool, str]:
+        pwd_id = PasswordRepository.upsert(db, user_id, service, login, encrypted_password)
+        return PasswordService._stored_result(service, pwd_id)
+
+    @staticmethod
+    async def _store_password_async(
+        db: AsyncDatabase, user_id: int, service: str, login: str, encrypted_password: bytes
+    ) -> tuple[bool, str]:
+        pwd_id = await AsyncPasswordRepository.upsert(db, user_id, service, login, encrypted_password)
+        return PasswordService._stored_result(service, pwd_id)
+
+    @staticmethod
+    def _stored_result(service: str, pwd_id: Optional[int]) -> tuple[bool, str]:
+        if pwd_id:
+            return True, f"Пароль для {service} успешно сохранён"
+        else:
+            return False, "Ошибка при сохранении пароля"
+
     @staticmethod
     def get_user_passwords(
         db: Database, user_id: int, master_password: str
     ) -> tuple[bool, List[dict], str]:
         """
         Get all passwords for user with decryption.
+
+        Records that fail to decrypt are returned with password None and an error message.
         
         Args:
             db: Database instance
@@ -70,31 +123,476 @@ class PasswordService:
             Tuple of (success: bool, passwords_list: List[dict], message: str)
         """
         try:
+            data_key = DataKeyService.get_data_key(db, user_id, master_password)
             passwords = PasswordRepository.get_by_user(db, user_id)
+            results = EncryptionService.decrypt_many(
+                [(pwd.id, pwd.password) for pwd in passwords],
+                master_password,
+                scope=user_id,
+                data_key=data_key,
+            )
+
+            decrypted_passwords, migrated = PasswordService._collect_decrypted(passwords, results, data_key)
+            if migrated:
+                PasswordRepository.update_secrets(db, migrated)
+            return True, decrypted_passwords, ""
+        except Exception as e:
+            return False, [], f"Ошибка при получении паролей: {str(e)}"
+
+    @staticmethod
+    async def get_user_passwords_async(
+        db: Database, user_id: int, master_password: str
+    ) -> tuple[bool, List[dict], str]:
+        """
+        Async counterpart of get_user_passwords, key derivations run on the crypto pool.
+        
+        Args:
+            db: Async database
+            user_id: User ID
+            master_password: User's master password for decryption
             
-            decrypted_passwords = []
-            for pwd in passwords:
-                try:
-                    decrypted_text = EncryptionService.decrypt_password(
-                        pwd.password, master_password
-                    )
-                    decrypted_passwords.append(
-                        {
-                            "id": pwd.id,
-                            "service": pwd.service,
-                            "login": pwd.login,
-                            "password": decrypted_text,
-                            "created_at": pwd.created_at,
-                        }
-                    )
-                except Exception:
-
-                    continue
-            
+        Returns:
+            Tuple of (success: bool, passwords_list: List[dict], message: str)
+        """
+        try:
+            data_key = await DataKeyService.get_data_key_async(db, user_id, master_password)
+            passwords = await AsyncPasswordRepository.get_by_user(db, user_id)
+
+            results = await EncryptionService.decrypt_many_async(
+                [(pwd.id, pwd.password) for pwd in passwords],
+                master_password,
+                scope=user_id,
+                data_key=data_key,
+            )
+
+            decrypted_passwords, migrated = PasswordService._collect_decrypted(passwords, results, data_key)
+            if migrated:
+                await AsyncPasswordRepository.update_secrets(db, migrated)
             return True, decrypted_passwords, ""
         except Exception as e:
             return False, [], f"Ошибка при получении паролей: {str(e)}"
 
+    @staticmethod
+    def list_entries(db: Database, user_id: int) -> tuple[bool, List[dict], str]:
+        """
+        Get service and login of every record without decrypting anything.
+        
+        Args:
+            db: Database instance
+            user_id: User ID
+            
+        Returns:
+            Tuple of (success: bool, entries: List[dict], message: str)
+        """
+        try:
+            entries = [
+                {
+                    "id": pwd.id,
+                    "service": pwd.service,
+                    "login": pwd.login,
+                    "created_at": pwd.created_at,
+                }
+                for pwd in PasswordRepository.list_by_user(db, user_id)
+            ]
+            return True, entries, ""
+        except Exception as e:
+            return False, [], f"Ошибка при получении паролей: {str(e)}"
+
+    @staticmethod
+    def search_entries(
+        db: Database, user_id: int, query: str, limit: int = VAULT_PAGE_SIZE
+    ) -> tuple[bool, List[dict], str]:
+        """
+        Find entries by service or login without decrypting anything.
+        
+        Args:
+            db: Database instance
+            user_id: User ID
+            query: Search text
+            limit: Maximum number of entries
+            
+        Returns:
+            Tuple of (success: bool, entries: List[dict], message: str)
+        """
+        try:
+            entries = [
+                {
+                    "id": pwd.id,
+                    "service": pwd.service,
+                    "login": pwd.login,
+                    "created_at": pwd.created_at,
+                }
+                for pwd in PasswordRepository.search(db, user_id, query, limit)
+            ]
+            return True, entries, ""
+        except Exception as e:
+            return False, [], f"Ошибка при поиске паролей: {str(e)}"
+
+    @staticmethod
+    def list_page(
+        db: Database,
+        user_id: int,
+        after_id: Optional[int] = None,
+        before_id: Optional[int] = None,
+        limit: int = VAULT_PAGE_SIZE,
+    ) -> tuple[bool, dict, str]:
+        """
+        Get one page of service and login entries without decrypting anything.
+        
+        Pages are anchored on a record ID so they fit in callback data; an
+        anchor that no longer belongs to the user falls back to the first page.
+        
+        Args:
+            db: Database instance
+            user_id: User ID
+            after_id: Last record ID of the previous page, to page forward
+            before_id: First record ID of the next page, to page backward
+            limit: Page size
+            
+        Returns:
+            Tuple of (success: bool, page: dict, message: str); page holds
+            ``entries``, ``has_prev``, ``has_next`` and ``total``
+        """
+        try:
+            anchor = None
+            anchor_id = before_id if before_id is not None else after_id
+            if anchor_id is not None:
+                record = PasswordRepository.get_by_id(db, anchor_id)
+                if record and record.user_id == user_id:
+                    anchor = (record.service, record.id)
+
+            if anchor and before_id is not None:
+                rows = PasswordRepository.get_page(db, user_id, limit=limit + 1, before=anchor)
+                has_prev, has_next = len(rows) > limit, True
+                rows = rows[-limit:]
+            else:
+                rows = PasswordRepository.get_page(db, user_id, after=anchor, limit=limit + 1)
+                has_prev, has_next = anchor is not None, len(rows) > limit
+                rows = rows[:limit]
+
+            page = {
+                "entries": [
+                    {
+                        "id": pwd.id,
+                        "service": pwd.service,
+                        "login": pwd.login,
+                        "created_at": pwd.created_at,
+                    }
+                    for pwd in rows
+                ],
+                "has_prev": has_prev,
+                "has_next": has_next,
+                "total": PasswordRepository.count_by_user(db, user_id),
+            }
+            return True, page, ""
+        except Exception as e:
+            return False, {}, f"Ошибка при получении паролей: {str(e)}"
+
+    @staticmethod
+    async def reveal_password_async(
+        db: AsyncDatabase,
+        user_id: int,
+        password_id: int,
+        master_password: str,
+        view_id: Optional[Hashable] = None,
+    ) -> tuple[bool, Optional[dict], str]:
+        """
+        Decrypt a single record on demand.
+        
+        With view_id the decrypted value is kept in the reveal cache for a
+        short while, so repeated taps on the same view do not decrypt again.
+        Entries are keyed by the stored ciphertext and never outlive a change
+        of the record; logout drops them.
+        
+        Args:
+            db: Async database
+            user_id: Authenticated user ID, must own the record
+            password_id: Password record ID
+            master_password: User's master password for decryption
+            view_id: Identifier of the view the value is shown in (e.g. message ID)
+            
+        Returns:
+            Tuple of (success: bool, password: Optional[dict], message: str)
+        """
+        try:
+            pwd = await AsyncPasswordRepository.get_by_id(db, password_id)
+            if not pwd or pwd.user_id != user_id:
+                return False, None, "Пароль не найден"
+
+            stored = pwd.password if isinstance(pwd.password, str) else bytes(pwd.password)
+            cache_name = (REVEALED, view_id, password_id, stored)
+            if view_id is not None:
+                entry = reveal_cache.get(user_id, cache_name)
+                if entry is not None:
+                    return True, entry, ""
+
+            data_key = await DataKeyService.get_data_key_async(db, user_id, master_password)
+            results = await EncryptionService.decrypt_many_async(
+                [(pwd.id, pwd.password)], master_password, scope=user_id, data_key=data_key
+            )
+            entries, migrated = PasswordService._collect_decrypted([pwd], results, data_key)
+            if migrated:
+                await AsyncPasswordRepository.update_secrets(db, migrated)
+            entry = entries[0]
+            if entry["error"]:
+                return False, entry, entry["error"]
+
+            if view_id is not None:
+                reveal_cache.put(user_id, cache_name, entry)
+            return True, entry, ""
+        except Exception as e:
+            return False, None, f"Ошибка при получении пароля: {str(e)}"
+
+    @staticmethod
+    def _outdated_secrets(db: Database, user_id: int) -> List[Tuple[int, Union[str, bytes]]]:
+        """Stream the vault and keep only values with outdated KDF parameters"""
+        return [
+            (record.id, bytes(record.password) if isinstance(record.password, memoryview) else record.password)
+            for record in PasswordRepository.iter_by_user(db, user_id)
+            if EncryptionService.is_outdated(record.password)
+        ]
+
+    @staticmethod
+    async def upgrade_outdated_async(db: AsyncDatabase, user_id: int, master_password: str) -> int:
+        """
+        Re-encrypt rows whose key was derived with outdated KDF parameters.
+        
+        Rows move to the user's data key; derivations run at bulk priority.
+        Rows changed while they were being decrypted keep their new value.
+        
+        Args:
+            db: Async database
+            user_id: Authenticated user ID
+            master_password: User's master password
+            
+        Returns:
+            Number of re-encrypted rows
+        """
+        outdated = await db.run(PasswordService._outdated_secrets, user_id)
+        if not outdated:
+            return 0
+
+        data_key = await DataKeyService.get_data_key_async(db, user_id, master_password)
+        results = await EncryptionService.decrypt_many_async(
+            outdated,
+            master_password,
+            data_key=data_key,
+            priority=CryptoPool.PRIORITY_BULK,
+        )
+        stored = dict(outdated)
+        secrets = [
+            (result.record_id, stored[result.record_id], EncryptionService.seal_with_data_key(result.value, data_key))
+            for result in results
+            if result.ok
+        ]
+        if not secrets:
+            return 0
+        return await AsyncPasswordRepository.update_secrets(db, secrets)
+
+    @staticmethod
+    async def rekey_user(
+        db: AsyncDatabase,
+        user_id: int,
+        old_master_password: str,
+        new_master_password: str,
+        batch_size: int = REKEY_BATCH_SIZE,
+        max_in_flight: Optional[int] = None,
+    ) -> int:
+        """
+        Rotate the user's data key to one wrapped with a new master password.
+        
+        Rows are streamed in ID order, re-encrypted on the crypto pool at bulk
+        priority and written back in one short transaction per batch together
+        with a checkpoint. Only max_in_flight batches are held in memory. An
+        interrupted run is resumed by calling again with the same passwords;
+        rows up to the checkpoint are under the new key, the rest under the old one.
+        
+        The old master password is always checked against the stored data key,
+        and every remaining row is decrypted before the first one is written,
+        so a wrong password or an unreadable row aborts the re-key with
+        nothing changed. Password values of the user cannot be written while a
+        re-key is running, and edits of values read before it compare against
+        the stored ciphertext, so nothing is written under the discarded key.
+        
+        Args:
+            db: Async database
+            user_id: User ID
+            old_master_password: Current master password
+            new_master_password: New master password
+            batch_size: Rows per batch and transaction
+            max_in_flight: Batches queued on the crypto pool, defaults to workers + 1
+            
+        Returns:
+            Number of re-encrypted rows in this run
+            
+        Raises:
+            ValueError: If the user is missing, a password is wrong, a row cannot
+                be decrypted or a batch cannot be stored
+        """
+        user = await AsyncUserRepository.get_by_id(db, user_id)
+        if not user:
+            raise ValueError("User not found")
+
+        state = await AsyncUserRepository.get_rekey_state(db, user_id)
+        if state is None:
+            if user.data_key:
+                old_data_key = await EncryptionService.unwrap_data_key_async(
+                    user.data_key, old_master_password, priority=CryptoPool.PRIORITY_BULK
+                )
+            else:
+                old_data_key = await DataKeyService.get_data_key_async(db, user_id, old_master_password)
+            await PasswordService._verify_rows(db, user_id, 0, old_master_password, old_data_key, batch_size)
+            new_data_key = EncryptionService.generate_data_key()
+            wrapped_key = await EncryptionService.wrap_data_key_async(
+                new_data_key, new_master_password, priority=CryptoPool.PRIORITY_BULK
+            )
+            if not await AsyncUserRepository.begin_rekey(db, user_id, EncryptionService.to_blob(wrapped_key)):
+                raise ValueError("Failed to start re-key")
+            checkpoint = 0
+        else:
+            pending_key, checkpoint = state
+            old_data_key = await EncryptionService.unwrap_data_key_async(
+                user.data_key, old_master_password, priority=CryptoPool.PRIORITY_BULK
+            )
+            new_data_key = await EncryptionService.unwrap_data_key_async(
+                pending_key, new_master_password, priority=CryptoPool.PRIORITY_BULK
+            )
+            await PasswordService._verify_rows(
+                db, user_id, checkpoint, old_master_password, old_data_key, batch_size
+            )
+        DataKeyService.close_session(user_id)
+
+        max_in_flight = max_in_flight or crypto_pool.max_workers + 1
+        rekeyed = 0
+        after_id = checkpoint
+        while True:
+            count, last_id = await PasswordService._rekey_rows(
+                db, user_id, after_id, old_master_password, old_data_key, new_data_key, batch_size, max_in_flight
+            )
+            rekeyed += count
+            if await AsyncUserRepository.finish_rekey(db, user_id):
+                break
+            if last_id == after_id:
+                raise ValueError("Failed to finish re-key")
+            after_id = last_id
+
+        DataKeyService.close_session(user_id)
+        return rekeyed
+
+    @staticmethod
+    def _page_records(rows: List[Tuple[int, Union[str, memoryview]]]) -> List[Tuple[int, Union[str, bytes]]]:
+        """Copy stored values out of the rows so they can be sent to the crypto pool"""
+        return [
+            (password_id, encrypted if isinstance(encrypted, str) else bytes(encrypted))
+            for password_id, encrypted in rows
+        ]
+
+    @staticmethod
+    async def _verify_rows(
+        db: AsyncDatabase,
+        user_id: int,
+        after_id: int,
+        master_password: str,
+        data_key: bytes,
+        batch_size: int,
+    ) -> None:
+        """Decrypt every row after the given ID, raising ValueError on the first batch that has a failure"""
+        while True:
+            rows = await AsyncPasswordRepository.get_secrets_page(db, user_id, after_id, batch_size)
+            if not rows:
+                return
+            after_id = rows[-1][0]
+            results = await EncryptionService.decrypt_many_async(
+                PasswordService._page_records(rows),
+                master_password,
+                data_key=data_key,
+                priority=CryptoPool.PRIORITY_BULK,
+            )
+            failed = [result.record_id for result in results if not result.ok]
+            if failed:
+                raise ValueError(f"Records cannot be decrypted: {failed}")
+
+    @staticmethod
+    async def _rekey_rows(
+        db: AsyncDatabase,
+        user_id: int,
+        after_id: int,
+        master_password: str,
+        old_data_key: bytes,
+        new_data_key: bytes,
+        batch_size: int,
+        max_in_flight: int,
+    ) -> Tuple[int, int]:
+        """Re-encrypt rows after the given ID, returns (re-encrypted rows, last processed ID)"""
+        in_flight = deque()
+        exhausted = False
+        rekeyed = 0
+        try:
+            while True:
+                while not exhausted and len(in_flight) < max_in_flight:
+                    rows = await AsyncPasswordRepository.get_secrets_page(db, user_id, after_id, batch_size)
+                    if not rows:
+                        exhausted = True
+                        break
+                    after_id = rows[-1][0]
+                    task = asyncio.ensure_future(crypto_pool.run(
+                        EncryptionService.reencrypt_batch,
+                        PasswordService._page_records(rows),
+                        master_password,
+                        old_data_key,
+                        new_data_key,
+                        priority=CryptoPool.PRIORITY_BULK,
+                    ))
+                    in_flight.append((after_id, task))
+
+                if not in_flight:
+                    return rekeyed, after_id
+
+                last_id, task = in_flight.popleft()
+                secrets = await task
+                failed = [password_id for password_id, sealed in secrets if sealed is None]
+                if failed:
+                    raise ValueError(f"Records cannot be decrypted: {failed}")
+                if not await AsyncPasswordRepository.save_rekey_batch(db, user_id, secrets, last_id):
+                    raise ValueError("Failed to store re-keyed batch")
+                rekeyed += len(secrets)
+        finally:
+            for _, task in in_flight:
+                task.cancel()
+
+    @staticmethod
+    def _collect_decrypted(
+        passwords: List[Password], results: List[DecryptResult], data_key: bytes
+    ) -> Tuple[List[dict], List[Tuple[int, Union[str, bytes], bytes]]]:
+        """
+        Build result dicts and re-encrypt legacy, outdated and text rows for lazy migration.
+
+        Migrated values carry the ciphertext they were decrypted from, so
+        update_secrets leaves records edited in the meantime alone.
+        """
+        decrypted_passwords = []
+        migrated = []
+        for pwd, result in zip(passwords, results):
+            stored = pwd.password if isinstance(pwd.password, str) else bytes(pwd.password)
+            if result.ok and (EncryptionService.is_legacy(pwd.password) or EncryptionService.is_outdated(pwd.password)):
+                migrated.append(
+                    (pwd.id, stored, EncryptionService.seal_with_data_key(result.value, data_key))
+                )
+            elif result.ok and isinstance(pwd.password, str):
+                migrated.append((pwd.id, stored, EncryptionService.to_blob(pwd.password)))
+            decrypted_passwords.append(
+                {
+                    "id": pwd.id,
+                    "service": pwd.service,
+                    "login": pwd.login,
+                    "password": result.value,
+                    "error": result.error,
+                    "created_at": pwd.created_at,
+                }
+            )
+
+        return decrypted_passwords, migrated
+
     @staticmethod
     def update_password(
         db: Database,
@@ -103,6 +601,7 @@ class PasswordService:
         login: str,
         new_password: str,
         master_password: str,
+        user_id: Optional[int] = None,
     ) -> tuple[bool, str]:
         """
         Update password record with encryption.
@@ -114,14 +613,20 @@ class PasswordService:
             login: Login for service
             new_password: New plain text password
             master_password: User's master password for encryption
+            user_id: Owner ID, looked up from the record when omitted
             
         Returns:
             Tuple of (success: bool, message: str)
         """
         try:
-           
-            encrypted_password = EncryptionService.encrypt_password(
-                new_password, master_password
+            if user_id is None:
+                existing = PasswordRepository.get_by_id(db, password_id)
+                if not existing:
+                    return False, "Пароль не найден"
+                user_id = existing.user_id
+
+            encrypted_password = PasswordService.encrypt_secret(
+                db, user_id, new_password, master_password
             )
             
            
@@ -160,3 +665,37 @@ class PasswordService:
                 return False, "Ошибка при удалении пароля"
         except Exception as e:
             return False, f"Ошибка при удалении пароля: {str(e)}"
+
+    @staticmethod
+    def encrypt_secret(db: Database, user_id: int, secret: str, master_password: str) -> bytes:
+        """
+        Encrypt secret under the user's data key.
+        
+        Args:
+            db: Database instance
+            user_id: Owner ID
+            secret: Plain text secret
+            master_password: User's master password for key unwrapping
+            
+        Returns:
+            Binary ciphertext under the configured cipher suite
+        """
+        data_key = DataKeyService.get_data_key(db, user_id, master_password)
+        return EncryptionService.seal_with_data_key(secret, data_key)
+
+    @staticmethod
+    async def encrypt_secret_async(db: AsyncDatabase, user_id: int, secret: str, master_password: str) -> bytes:
+        """
+        Async counterpart of encrypt_secret.
+        
+        Args:
+            db: Async database
+            user_id: Owner ID
+            secret: Plain text secret
+            master_password: User's master password for key unwrapping
+            
+        Returns:
+            Binary ciphertext under the configured cipher suite
+        """
+        data_key = await DataKeyService.get_data_key_async(db, user_id, master_password)
+        return EncryptionService.seal_with_data_key(secret, data_key)
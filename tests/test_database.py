@@ -20,6 +20,13 @@ def temp_db():
             db_path.unlink()
 
 
+@pytest.fixture
+def async_database(temp_db):
+    """Create async database over the temporary database file"""
+    from src.database.async_db import AsyncDatabase
+    return AsyncDatabase(temp_db)
+
+
 @pytest.fixture
 def db_connection(temp_db):
     """Create database connection"""
@@ -86,6 +93,27 @@ class TestUserRepository:
         assert deleted_user is None
 
 
+    def test_lookups_read_through_cache(self, db_connection):
+        """Test repeated lookups hit the user cache and writes invalidate it"""
+        from src.database.cache import user_cache
+
+        user_cache.clear()
+        user_id = UserRepository.create(db_connection, User(username="cached", password_hash="h"))
+
+        first = UserRepository.get_by_id(db_connection, user_id)
+        assert UserRepository.get_by_id(db_connection, user_id) is first
+        assert UserRepository.get_by_username(db_connection, "cached") is first
+        assert user_cache.stats()["hits"] == 2
+
+        UserRepository.set_data_key(db_connection, user_id, b"wrapped")
+        assert UserRepository.get_by_id(db_connection, user_id).data_key == b"wrapped"
+
+        UserRepository.delete(db_connection, user_id)
+        assert UserRepository.get_by_username(db_connection, "cached") is None
+        assert UserRepository.get_by_id(db_connection, user_id) is None
+        assert user_cache.stats()["misses"] == 4
+
+
 class TestPasswordRepository:
     """Test Password CRUD operations"""
 
@@ -207,3 +235,1119 @@ class TestPasswordRepository:
 
         passwords = PasswordRepository.get_by_user(db_connection, user_id)
         assert len(passwords) == 0
+
+    def test_search_follows_writes(self, db_connection, user_id):
+        """Test full-text search matches word prefixes and tracks updates and deletes"""
+        other_id = UserRepository.create(db_connection, User(username="other", password_hash="h"))
+        gmail_id = PasswordRepository.create(
+            db_connection, Password(user_id=user_id, service="Gmail", login="john.doe", password="s")
+        )
+        PasswordRepository.create(
+            db_connection, Password(user_id=user_id, service="Почта Яндекс", login="ivan", password="s")
+        )
+        PasswordRepository.create(
+            db_connection, Password(user_id=other_id, service="Gmail", login="other", password="s")
+        )
+
+        def found(query):
+            return [pwd.service for pwd in PasswordRepository.search(db_connection, user_id, query)]
+
+        assert found("gma") == ["Gmail"]
+        assert found("john") == ["Gmail"]
+        assert found("почта") == ["Почта Яндекс"]
+        assert found('"') == [] and found("  ") == []
+
+        gmail = PasswordRepository.get_by_id(db_connection, gmail_id)
+        gmail.service = "Google"
+        PasswordRepository.update(db_connection, gmail)
+        assert found("gma") == []
+        assert found("goo") == ["Google"]
+
+        PasswordRepository.delete(db_connection, gmail_id)
+        assert found("goo") == []
+
+    def test_fuzzy_find_tolerates_typos(self, db_connection, user_id):
+        """Test trigram lookup ranks similar service names and follows updates and deletes"""
+        other_id = UserRepository.create(db_connection, User(username="other", password_hash="h"))
+        ids = {
+            service: PasswordRepository.create(
+                db_connection, Password(user_id=user_id, service=service, login="user", password="s")
+            )
+            for service in ["Gmail", "GitHub", "Amazon"]
+        }
+        PasswordRepository.create(db_connection, Password(user_id=other_id, service="Gmail", login="x", password="s"))
+
+        def found(text):
+            return [pwd.service for pwd in PasswordRepository.fuzzy_find(db_connection, user_id, text, k=3)]
+
+        assert found("gmail.com")[0] == "Gmail"
+        assert found("G-mail")[0] == "Gmail"
+        assert found("githbu")[0] == "GitHub"
+        assert found("Amazn") == ["Amazon"]
+        assert found("zzz") == [] and found("") == []
+
+        github = PasswordRepository.get_by_id(db_connection, ids["GitHub"])
+        github.service = "GitLab"
+        PasswordRepository.update(db_connection, github)
+        assert found("gitlab") == ["GitLab"]
+
+        PasswordRepository.delete(db_connection, ids["Gmail"])
+        assert "Gmail" not in found("gmail")
+
+    def test_bulk_operations_and_upsert(self, db_connection, user_id):
+        """Test bulk create skips existing entries, upsert replaces secrets, bulk delete is per user"""
+        other_id = UserRepository.create(db_connection, User(username="other", password_hash="h"))
+        foreign_id = PasswordRepository.create(
+            db_connection, Password(user_id=other_id, service="Gmail", login="user", password="s")
+        )
+
+        created = PasswordRepository.create_many(
+            db_connection,
+            [Password(user_id=user_id, service=f"svc{i}", login="user", password="s") for i in range(3)]
+            + [Password(user_id=user_id, service="svc0", login="user", password="dup")],
+        )
+        assert created == 3
+        assert PasswordRepository.fuzzy_find(db_connection, user_id, "svc2")[0].service == "svc2"
+
+        first_id = PasswordRepository.upsert(db_connection, user_id, "Gmail", "user", "old")
+        second_id = PasswordRepository.upsert(db_connection, user_id, "Gmail", "user", "new")
+        assert first_id == second_id
+        assert PasswordRepository.get_by_id(db_connection, first_id).password == "new"
+        assert PasswordRepository.create(
+            db_connection, Password(user_id=user_id, service="Gmail", login="user", password="s")
+        ) is None
+
+        ids = [pwd.id for pwd in PasswordRepository.list_by_user(db_connection, user_id)]
+        assert PasswordRepository.delete_many(db_connection, user_id, ids + [foreign_id]) == 4
+        assert PasswordRepository.count_by_user(db_connection, user_id) == 0
+        assert PasswordRepository.get_by_id(db_connection, foreign_id) is not None
+
+    def test_iterators_stream_in_batches(self, db_connection, user_id):
+        """Test streaming iterators yield every row as slotted records"""
+
+        other_id = UserRepository.create(db_connection, User(username="other", password_hash="h"))
+        for i in range(5):
+            PasswordRepository.create(
+                db_connection, Password(user_id=user_id, service=f"svc{i}", login="user", password=b"\x03data")
+            )
+        PasswordRepository.create(db_connection, Password(user_id=other_id, service="svc", login="x", password="s"))
+
+        records = list(PasswordRepository.iter_by_user(db_connection, user_id, batch=2))
+        assert all(isinstance(record, Password) for record in records)
+        assert [record.service for record in records] == [f"svc{i}" for i in range(5)]
+        assert bytes(records[0].password) == b"\x03data"
+        assert len(list(PasswordRepository.iter_all(db_connection, batch=4))) == 6
+
+    def test_vault_cache_writes_through(self, db_connection, user_id, monkeypatch):
+        """Test listings are served from memory once loaded and follow every mutation"""
+        from src.database.cache import VaultCache
+        import src.database.crud as crud
+
+        cache = VaultCache(max_entries=10)
+        monkeypatch.setattr(crud, "vault_cache", cache)
+        gmail_id = PasswordRepository.create(
+            db_connection, Password(user_id=user_id, service="Gmail", login="user", password="s")
+        )
+        assert cache.stats()["users"] == 0
+
+        assert [pwd.service for pwd in PasswordRepository.list_by_user(db_connection, user_id)] == ["Gmail"]
+        PasswordRepository.create(db_connection, Password(user_id=user_id, service="Amazon", login="a", password="s"))
+        gmail = PasswordRepository.get_by_id(db_connection, gmail_id)
+        gmail.login = "renamed"
+        PasswordRepository.update(db_connection, gmail)
+        PasswordRepository.upsert(db_connection, user_id, "Zoom", "z", "s")
+
+        hits = cache.stats()["hits"]
+        listed = PasswordRepository.list_by_user(db_connection, user_id)
+        assert cache.stats()["hits"] == hits + 1
+        assert [(pwd.service, pwd.login) for pwd in listed] == [("Amazon", "a"), ("Gmail", "renamed"), ("Zoom", "z")]
+        assert [pwd.service for pwd in PasswordRepository.get_page(db_connection, user_id, after=("Amazon", 0), limit=1)] == ["Amazon"]
+        assert PasswordRepository.count_by_user(db_connection, user_id) == 3
+
+        PasswordRepository.delete(db_connection, listed[0].id)
+        PasswordRepository.delete_many(db_connection, user_id, [listed[1].id])
+        assert [pwd.service for pwd in PasswordRepository.list_by_user(db_connection, user_id)] == ["Zoom"]
+
+        stale = cache.version()
+        PasswordRepository.delete_all_for_user(db_connection, user_id)
+        assert not cache.load(db_connection.db_path, user_id, [], stale)
+        assert cache.stats()["users"] == 0
+
+    def test_vault_cache_expires_after_outside_writes(self, db_connection, user_id, monkeypatch):
+        """Test rows written by another process show up once the cached vault expires"""
+        import time
+        from src.database.cache import VaultCache
+        import src.database.crud as crud
+
+        cache = VaultCache(max_entries=10, ttl=0.05)
+        monkeypatch.setattr(crud, "vault_cache", cache)
+        PasswordRepository.create(db_connection, Password(user_id=user_id, service="Gmail", login="u", password="s"))
+        assert PasswordRepository.count_by_user(db_connection, user_id) == 1
+        assert len(PasswordRepository.list_by_user(db_connection, user_id)) == 1
+
+        other = sqlite3.connect(db_connection.db_path)
+        other.execute(
+            "INSERT INTO passwords (user_id, service, login, password) VALUES (?, 'Zoom', 'z', 's')", (user_id,)
+        )
+        other.commit()
+        other.close()
+
+        assert PasswordRepository.count_by_user(db_connection, user_id) == 1
+        time.sleep(0.06)
+        assert [pwd.service for pwd in PasswordRepository.list_by_user(db_connection, user_id)] == ["Gmail", "Zoom"]
+        assert PasswordRepository.count_by_user(db_connection, user_id) == 2
+
+    def test_vault_cache_evicts_least_recent_users(self):
+        """Test vault cache stays within its total entry bound"""
+        from src.database.cache import VaultCache
+
+        cache = VaultCache(max_entries=4)
+        cache.load("db", 1, [(1, 1, "a", "l", None, None), (2, 1, "b", "l", None, None)], cache.version())
+        cache.load("db", 2, [(3, 2, "a", "l", None, None), (4, 2, "b", "l", None, None)], cache.version())
+        assert cache.count("db", 1) == 2
+        cache.load("db", 3, [(5, 3, "a", "l", None, None)], cache.version())
+
+        assert cache.count("db", 2) is None
+        assert cache.count("db", 1) == 2 and cache.count("db", 3) == 1
+        assert not cache.load("db", 4, [(i, 4, "s", "l", None, None) for i in range(5)], cache.version())
+
+    def test_get_page_walks_vault_in_order(self, db_connection, user_id):
+        """Test keyset pages cover the vault once in listing order"""
+        for i, service in enumerate(["Gmail", "Amazon", "Gmail", "Zoom", "Bank"]):
+            PasswordRepository.create(
+                db_connection, Password(user_id=user_id, service=service, login=f"user{i}", password="secret")
+            )
+
+        pages, after = [], None
+        while True:
+            page = PasswordRepository.get_page(db_connection, user_id, after=after, limit=2)
+            if not page:
+                break
+            pages.append(page)
+            after = (page[-1].service, page[-1].id)
+
+        listed = [(pwd.service, pwd.id) for page in pages for pwd in page]
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert listed == sorted(listed)
+        assert [service for service, _ in listed] == ["Amazon", "Bank", "Gmail", "Gmail", "Zoom"]
+        assert PasswordRepository.count_by_user(db_connection, user_id) == 5
+        assert PasswordRepository.count_by_user(db_connection, user_id + 1) == 0
+
+
+class TestPasswordServiceEncryption:
+    """Test envelope encryption through PasswordService"""
+
+    @pytest.fixture(autouse=True)
+    def clean_key_cache(self):
+        """Reset the process-wide key and reveal caches between tests"""
+        from src.security.encryption import key_cache
+        from src.services.password import reveal_cache
+        key_cache.clear()
+        reveal_cache.clear()
+        yield
+        key_cache.clear()
+        reveal_cache.clear()
+
+    @pytest.fixture
+    def user_id(self, db_connection):
+        """Create user for service tests"""
+        user = User(username="testuser", password_hash="hashed_password123")
+        return UserRepository.create(db_connection, user)
+
+    def test_data_key_created_once(self, db_connection, user_id):
+        """Test data key is generated, wrapped and stored on the user row"""
+        from src.services import DataKeyService
+
+        data_key = DataKeyService.get_data_key(db_connection, user_id, "master")
+        stored = UserRepository.get_by_id(db_connection, user_id).data_key
+
+        assert stored
+        assert DataKeyService.get_data_key(db_connection, user_id, "master") == data_key
+
+    def test_rows_use_data_key_format(self, db_connection, user_id):
+        """Test new rows are encrypted under the data key"""
+        from src.services import PasswordService
+
+        success, _ = PasswordService.create_password(
+            db_connection, user_id, "Gmail", "user@gmail.com", "secret123", "master"
+        )
+        assert success is True
+
+        stored = PasswordRepository.get_by_user(db_connection, user_id)[0]
+        assert isinstance(stored.password, memoryview)
+        assert stored.password[0] == 0x03
+
+        success, passwords, _ = PasswordService.get_user_passwords(db_connection, user_id, "master")
+        assert success is True
+        assert passwords[0]["password"] == "secret123"
+
+    def test_legacy_rows_migrated_on_read(self, db_connection, user_id):
+        """Test legacy salt:encrypted rows decrypt and are re-encrypted lazily"""
+        from src.security import EncryptionService
+        from src.services import PasswordService
+
+        legacy = EncryptionService.encrypt_password("secret123", "master")
+        PasswordRepository.create(
+            db_connection,
+            Password(user_id=user_id, service="Gmail", login="user@gmail.com", password=legacy),
+        )
+
+        success, passwords, _ = PasswordService.get_user_passwords(db_connection, user_id, "master")
+        assert success is True
+        assert passwords[0]["password"] == "secret123"
+
+        stored = PasswordRepository.get_by_user(db_connection, user_id)[0]
+        assert stored.password[0] == 0x03
+
+
+    def test_lazy_migration_keeps_concurrent_edit(self, db_connection, user_id, monkeypatch):
+        """Test a record edited while being read is not overwritten by its migrated old value"""
+        from src.security import EncryptionService
+        from src.services import PasswordService
+
+        legacy = EncryptionService.encrypt_password("old", "master")
+        PasswordRepository.create(
+            db_connection, Password(user_id=user_id, service="Gmail", login="user", password=legacy)
+        )
+        edited = Password(
+            id=PasswordRepository.get_by_user(db_connection, user_id)[0].id,
+            user_id=user_id,
+            service="Gmail",
+            login="user",
+            password=PasswordService.encrypt_secret(db_connection, user_id, "new", "master"),
+        )
+        original = EncryptionService.decrypt_many
+
+        def edit_while_decrypting(*args, **kwargs):
+            results = original(*args, **kwargs)
+            PasswordRepository.update(db_connection, edited)
+            return results
+
+        monkeypatch.setattr(EncryptionService, "decrypt_many", staticmethod(edit_while_decrypting))
+        success, passwords, _ = PasswordService.get_user_passwords(db_connection, user_id, "master")
+        monkeypatch.setattr(EncryptionService, "decrypt_many", staticmethod(original))
+
+        assert success is True and passwords[0]["password"] == "old"
+        _, passwords, _ = PasswordService.get_user_passwords(db_connection, user_id, "master")
+        assert passwords[0]["password"] == "new"
+
+    def test_list_entries_skips_crypto(self, db_connection, user_id, monkeypatch):
+        """Test vault listing reads plaintext columns only"""
+        from src.security import EncryptionService
+        from src.services import PasswordService
+
+        PasswordService.create_password(db_connection, user_id, "Gmail", "user@gmail.com", "secret123", "master")
+
+        def fail(*args, **kwargs):
+            raise AssertionError("decryption during listing")
+
+        monkeypatch.setattr(EncryptionService, "decrypt_many", fail)
+        monkeypatch.setattr(EncryptionService, "decrypt_password", fail)
+        success, entries, _ = PasswordService.list_entries(db_connection, user_id)
+
+        assert success is True
+        assert [(entry["service"], entry["login"]) for entry in entries] == [("Gmail", "user@gmail.com")]
+        assert "password" not in entries[0]
+
+    def test_list_page_navigates_both_ways(self, db_connection, user_id):
+        """Test vault pages move forward and back from their anchor records"""
+        from src.services import PasswordService
+
+        for i in range(5):
+            PasswordRepository.create(
+                db_connection, Password(user_id=user_id, service=f"svc{i}", login="user", password=b"\x03data")
+            )
+
+        _, first, _ = PasswordService.list_page(db_connection, user_id, limit=2)
+        _, second, _ = PasswordService.list_page(db_connection, user_id, after_id=first["entries"][-1]["id"], limit=2)
+        _, third, _ = PasswordService.list_page(db_connection, user_id, after_id=second["entries"][-1]["id"], limit=2)
+        _, back, _ = PasswordService.list_page(db_connection, user_id, before_id=second["entries"][0]["id"], limit=2)
+
+        def services(page):
+            return [entry["service"] for entry in page["entries"]]
+
+        assert services(first) == ["svc0", "svc1"] and not first["has_prev"] and first["has_next"]
+        assert services(second) == ["svc2", "svc3"] and second["has_prev"] and second["has_next"]
+        assert services(third) == ["svc4"] and third["has_prev"] and not third["has_next"]
+        assert back == first and back["total"] == 5
+
+        _, foreign, _ = PasswordService.list_page(db_connection, user_id + 1, after_id=first["entries"][-1]["id"])
+        assert foreign["entries"] == [] and not foreign["has_prev"]
+
+    def test_reveal_password_cached_per_view(self, db_connection, async_database, user_id, monkeypatch):
+        """Test single secret is decrypted on demand and reused within one view"""
+        import asyncio
+        from src.security import EncryptionService
+        from src.security.encryption import crypto_pool
+        from src.services import PasswordService
+
+        PasswordService.create_password(db_connection, user_id, "Gmail", "user@gmail.com", "secret123", "master")
+        password_id = PasswordService.list_entries(db_connection, user_id)[1][0]["id"]
+        other_id = UserRepository.create(db_connection, User(username="other", password_hash="hash"))
+
+        calls = []
+        original = EncryptionService.decrypt_many_async
+
+        async def counting(records, *args, **kwargs):
+            records = list(records)
+            calls.append(len(records))
+            return await original(records, *args, **kwargs)
+
+        monkeypatch.setattr(EncryptionService, "decrypt_many_async", staticmethod(counting))
+
+        async def scenario():
+            try:
+                first = await PasswordService.reveal_password_async(async_database, user_id, password_id, "master", 1)
+                second = await PasswordService.reveal_password_async(async_database, user_id, password_id, "master", 1)
+                foreign = await PasswordService.reveal_password_async(async_database, other_id, password_id, "other", 1)
+                return first, second, foreign
+            finally:
+                await async_database.close()
+                await crypto_pool.shutdown()
+
+        first, second, foreign = asyncio.run(scenario())
+
+        assert first[0] is True and first[1]["password"] == "secret123"
+        assert second[1]["password"] == "secret123"
+        assert calls == [1]
+        assert foreign[0] is False
+
+        from src.services import AuthenticationService
+        from src.services.password import reveal_cache
+        assert len(reveal_cache) == 1
+        AuthenticationService.end_session(user_id)
+        assert len(reveal_cache) == 0
+
+
+def test_records_parse_timestamps_lazily(db_connection):
+    """Test loaded records are slotted and parse stored timestamps on access"""
+    from datetime import datetime
+
+    user_id = UserRepository.create(db_connection, User(username="slots", password_hash="h"))
+    user = UserRepository.get_by_id(db_connection, user_id)
+
+    assert not hasattr(user, "__dict__")
+    assert isinstance(user._created_at, str)
+    assert isinstance(user.created_at, datetime)
+    assert user._created_at is user.created_at
+    assert User(username="new").created_at is None
+    assert user == UserRepository.get_by_username(db_connection, "slots")
+
+
+def test_init_db_adds_data_key_column():
+    """Test schema migration for databases created before envelope encryption"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = Path(tmpdir) / "old.db"
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL, "
+            "password_hash TEXT NOT NULL, created_at TIMESTAMP, updated_at TIMESTAMP)"
+        )
+        conn.commit()
+        conn.close()
+
+        DatabaseInitializer.init_db(db_path)
+
+        conn = sqlite3.connect(db_path)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(users)")}
+        conn.close()
+        assert "data_key" in columns
+
+
+def test_init_db_indexes_existing_passwords(temp_db):
+    """Test search indexes are filled for rows written before they existed"""
+    conn = sqlite3.connect(temp_db)
+    conn.executescript(
+        """
+        DROP TABLE passwords_fts;
+        DROP TRIGGER passwords_fts_insert;
+        INSERT INTO users (username, password_hash) VALUES ('old', 'h');
+        INSERT INTO passwords (user_id, service, login, password) VALUES (1, 'GitHub', 'octo', 's');
+        """
+    )
+    conn.close()
+
+    DatabaseInitializer.init_db(temp_db)
+
+    db = Database(temp_db)
+    db.connect()
+    try:
+        assert [pwd.service for pwd in PasswordRepository.search(db, 1, "git")] == ["GitHub"]
+        assert [pwd.service for pwd in PasswordRepository.fuzzy_find(db, 1, "githbu")] == ["GitHub"]
+    finally:
+        db.close()
+
+
+def test_init_db_renames_duplicate_entries(temp_db):
+    """Test databases with duplicate entries keep every record and get upserts working"""
+    conn = sqlite3.connect(temp_db)
+    conn.executescript(
+        """
+        DROP INDEX idx_passwords_entry;
+        INSERT INTO users (username, password_hash) VALUES ('old', 'h');
+        INSERT INTO passwords (user_id, service, login, password) VALUES (1, 'GitHub', 'octo', 'first');
+        INSERT INTO passwords (user_id, service, login, password) VALUES (1, 'GitHub', 'octo', 'second');
+        INSERT INTO passwords (user_id, service, login, password) VALUES (1, 'GitHub', 'octo (2)', 'taken');
+        INSERT INTO passwords (user_id, service, login, password) VALUES (1, 'GitHub', 'octo', 'third');
+        INSERT INTO passwords (user_id, service, login, password) VALUES (1, 'Gmail', 'octo', 'other');
+        """
+    )
+    conn.close()
+
+    DatabaseInitializer.init_db(temp_db)
+
+    db = Database(temp_db)
+    db.connect()
+    try:
+        passwords = PasswordRepository.get_by_user(db, 1)
+        assert sorted((pwd.service, pwd.login, pwd.password) for pwd in passwords) == [
+            ("GitHub", "octo", "third"),
+            ("GitHub", "octo (2)", "taken"),
+            ("GitHub", "octo (3)", "second"),
+            ("GitHub", "octo (4)", "first"),
+            ("Gmail", "octo", "other"),
+        ]
+        newest = next(pwd for pwd in passwords if pwd.password == "third")
+        assert PasswordRepository.upsert(db, 1, "GitHub", "octo", "fourth") == newest.id
+        assert PasswordRepository.create_many(
+            db, [Password(user_id=1, service="Bank", login="octo", password="new")]
+        ) == 1
+        assert [pwd.service for pwd in PasswordRepository.search(db, 1, "git")] == ["GitHub"] * 4
+    finally:
+        db.close()
+
+
+def test_migrate_to_blob(db_connection):
+    """Test online conversion of text ciphertexts to BLOBs"""
+    from src.security import EncryptionService
+    from src.security.encryption import key_cache
+    from src.services import DataKeyService, PasswordService, StorageMigrationService
+
+    key_cache.clear()
+    password_hash = EncryptionService.encrypt_password("secret", "bloguser")
+    user_id = UserRepository.create(db_connection, User(username="bloguser", password_hash=password_hash))
+    data_key = DataKeyService.get_data_key(db_connection, user_id, "bloguser")
+    values = [
+        EncryptionService.encrypt_password("legacy", "bloguser"),
+        EncryptionService.encrypt_with_data_key("fernet", data_key, "fernet"),
+        EncryptionService.encrypt_with_data_key("sealed", data_key),
+    ]
+    for index, value in enumerate(values):
+        PasswordRepository.create(
+            db_connection, Password(user_id=user_id, service=f"s{index}", login="user", password=value)
+        )
+
+    assert StorageMigrationService.migrate_to_blob(db_connection, batch_size=2) == 4
+    assert StorageMigrationService.migrate_to_blob(db_connection) == 0
+
+    types = {row[0] for row in db_connection.execute("SELECT typeof(password) FROM passwords")}
+    assert types == {"blob"}
+    stored = UserRepository.get_by_id(db_connection, user_id)
+    assert isinstance(stored.password_hash, bytes)
+    assert len(stored.password_hash) < len(password_hash)
+    assert EncryptionService.decrypt_password(stored.password_hash, "bloguser") == "secret"
+
+    success, passwords, _ = PasswordService.get_user_passwords(db_connection, user_id, "bloguser")
+    key_cache.clear()
+    assert success is True
+    assert [pwd["password"] for pwd in passwords] == ["legacy", "fernet", "sealed"]
+
+
+def test_get_user_passwords_async(db_connection, async_database):
+    """Test async vault read offloads legacy derivations and migrates rows"""
+    import asyncio
+    from src.security import EncryptionService
+    from src.security.encryption import crypto_pool, key_cache
+    from src.services import PasswordService
+
+    key_cache.clear()
+    user_id = UserRepository.create(db_connection, User(username="asyncuser", password_hash="hash"))
+    legacy = EncryptionService.encrypt_password("secret123", "master")
+    PasswordRepository.create(
+        db_connection, Password(user_id=user_id, service="Gmail", login="user", password=legacy)
+    )
+
+    async def scenario():
+        try:
+            return await PasswordService.get_user_passwords_async(async_database, user_id, "master")
+        finally:
+            await async_database.close()
+            await crypto_pool.shutdown()
+
+    success, passwords, _ = asyncio.run(scenario())
+    key_cache.clear()
+
+    assert success is True
+    assert passwords[0]["password"] == "secret123"
+    assert PasswordRepository.get_by_id(db_connection, passwords[0]["id"]).password[0] == 0x03
+
+
+def test_upgrade_outdated_kdf(db_connection, async_database, monkeypatch):
+    """Test login-time re-encryption of values with outdated KDF parameters"""
+    import asyncio
+    from src.security import EncryptionService
+    from src.security.encryption import crypto_pool, key_cache
+    from src.security.kdf import KdfParams
+    from src.services import AuthenticationService, PasswordService
+
+    key_cache.clear()
+    monkeypatch.setattr(KdfParams, "current", staticmethod(lambda: KdfParams(iterations=1000)))
+    AuthenticationService.register_user(db_connection, "kdfuser", "secret")
+    user = UserRepository.get_by_username(db_connection, "kdfuser")
+    AuthenticationService.start_session(db_connection, user.id, "kdfuser")
+    PasswordRepository.create(
+        db_connection,
+        Password(user_id=user.id, service="Gmail", login="user",
+                 password=EncryptionService.encrypt_password("secret123", "kdfuser")),
+    )
+
+    monkeypatch.setattr(KdfParams, "current", staticmethod(lambda: KdfParams(iterations=2000)))
+
+    async def scenario():
+        try:
+            upgraded = await AuthenticationService.upgrade_credentials_async(
+                async_database, user.id, "kdfuser", "secret", "kdfuser"
+            )
+            return upgraded + await PasswordService.upgrade_outdated_async(async_database, user.id, "kdfuser")
+        finally:
+            await async_database.close()
+            await crypto_pool.shutdown()
+
+    assert asyncio.run(scenario()) == 3
+    key_cache.clear()
+
+    user = UserRepository.get_by_id(db_connection, user.id)
+    assert EncryptionService.parse_encrypted(user.password_hash)[0].iterations == 2000
+    assert EncryptionService.parse_encrypted(user.data_key)[0].iterations == 2000
+    assert PasswordRepository.get_by_user(db_connection, user.id)[0].password[0] == 0x03
+    success, _, _ = AuthenticationService.authenticate_user(db_connection, "kdfuser", "secret")
+    assert success is True
+
+
+def test_upgrade_outdated_keeps_concurrent_edit(db_connection, async_database, monkeypatch):
+    """Test a record edited during the background upgrade keeps the edit"""
+    import asyncio
+    from src.security import EncryptionService
+    from src.security.encryption import crypto_pool, key_cache
+    from src.security.kdf import KdfParams
+    from src.services import PasswordService
+
+    key_cache.clear()
+    user_id = UserRepository.create(db_connection, User(username="raceuser", password_hash="hash"))
+    monkeypatch.setattr(KdfParams, "current", staticmethod(lambda: KdfParams(iterations=1000)))
+    password_id = PasswordRepository.create(
+        db_connection,
+        Password(user_id=user_id, service="Gmail", login="user",
+                 password=EncryptionService.encrypt_password("OLD", "raceuser")),
+    )
+    monkeypatch.setattr(KdfParams, "current", staticmethod(lambda: KdfParams(iterations=2000)))
+    edited = Password(
+        id=password_id, user_id=user_id, service="Gmail", login="user",
+        password=PasswordService.encrypt_secret(db_connection, user_id, "NEW", "raceuser"),
+    )
+    original = EncryptionService.decrypt_many_async
+
+    async def edit_while_decrypting(*args, **kwargs):
+        results = await original(*args, **kwargs)
+        PasswordRepository.update(db_connection, edited)
+        return results
+
+    monkeypatch.setattr(EncryptionService, "decrypt_many_async", staticmethod(edit_while_decrypting))
+
+    async def scenario():
+        try:
+            return await PasswordService.upgrade_outdated_async(async_database, user_id, "raceuser")
+        finally:
+            await async_database.close()
+            await crypto_pool.shutdown()
+
+    assert asyncio.run(scenario()) == 0
+    success, passwords, _ = PasswordService.get_user_passwords(db_connection, user_id, "raceuser")
+    key_cache.clear()
+    assert success is True
+    assert passwords[0]["password"] == "NEW"
+
+
+def test_rekey_user_resumes_after_interruption(db_connection, async_database, monkeypatch):
+    """Test streaming re-key survives a failed batch and resumes from its checkpoint"""
+    import asyncio
+    from src.security import EncryptionService
+    from src.security.encryption import crypto_pool, key_cache
+    from src.services import DataKeyService, PasswordService
+
+    key_cache.clear()
+    user_id = UserRepository.create(db_connection, User(username="rekeyuser", password_hash="hash"))
+    data_key = DataKeyService.get_data_key(db_connection, user_id, "old")
+    for index in range(20):
+        if index % 5 == 0:
+            encrypted = EncryptionService.encrypt_password(f"secret{index}", "old")
+        else:
+            encrypted = EncryptionService.seal_with_data_key(f"secret{index}", data_key)
+        PasswordRepository.create(
+            db_connection, Password(user_id=user_id, service=f"s{index:02d}", login="user", password=encrypted)
+        )
+
+    original = PasswordRepository.save_rekey_batch
+    saved = []
+
+    def flaky(db, user_id, secrets, checkpoint):
+        if len(saved) == 2:
+            return False
+        saved.append(checkpoint)
+        return original(db, user_id, secrets, checkpoint)
+
+    monkeypatch.setattr(PasswordRepository, "save_rekey_batch", staticmethod(flaky))
+
+    async def scenario():
+        try:
+            with pytest.raises(ValueError):
+                await PasswordService.rekey_user(async_database, user_id, "old", "new", batch_size=3)
+            with pytest.raises(ValueError):
+                await DataKeyService.get_data_key_async(async_database, user_id, "old")
+            monkeypatch.setattr(PasswordRepository, "save_rekey_batch", staticmethod(original))
+            return await PasswordService.rekey_user(async_database, user_id, "old", "new", batch_size=3)
+        finally:
+            await async_database.close()
+            await crypto_pool.shutdown()
+
+    assert asyncio.run(scenario()) == 14
+    assert UserRepository.get_rekey_state(db_connection, user_id) is None
+
+    success, passwords, _ = PasswordService.get_user_passwords(db_connection, user_id, "new")
+    key_cache.clear()
+    assert success is True
+    assert [pwd["password"] for pwd in passwords] == [f"secret{index}" for index in range(20)]
+    with pytest.raises(ValueError):
+        DataKeyService.get_data_key(db_connection, user_id, "old")
+
+
+def test_rekey_user_aborts_without_changes(db_connection, async_database):
+    """Test a wrong old password or an unreadable row leaves the vault untouched"""
+    import asyncio
+    from src.security import EncryptionService
+    from src.security.encryption import crypto_pool, key_cache
+    from src.services import DataKeyService, PasswordService
+
+    key_cache.clear()
+    user_id = UserRepository.create(db_connection, User(username="abortuser", password_hash="hash"))
+    data_key = DataKeyService.get_data_key(db_connection, user_id, "old")
+    for index in range(4):
+        PasswordRepository.create(
+            db_connection,
+            Password(user_id=user_id, service=f"s{index}", login="user",
+                     password=EncryptionService.seal_with_data_key(f"secret{index}", data_key)),
+        )
+    stored_key = UserRepository.get_by_id(db_connection, user_id).data_key
+
+    async def scenario():
+        try:
+            with pytest.raises(ValueError):
+                await PasswordService.rekey_user(async_database, user_id, "wrong", "new", batch_size=2)
+            PasswordRepository.create(
+                db_connection,
+                Password(user_id=user_id, service="broken", login="user",
+                         password=EncryptionService.seal_with_data_key("lost", EncryptionService.generate_data_key())),
+            )
+            with pytest.raises(ValueError):
+                await PasswordService.rekey_user(async_database, user_id, "old", "new", batch_size=2)
+        finally:
+            await async_database.close()
+            await crypto_pool.shutdown()
+
+    asyncio.run(scenario())
+
+    user = UserRepository.get_by_id(db_connection, user_id)
+    assert UserRepository.get_rekey_state(db_connection, user_id) is None
+    assert bytes(user.data_key) == bytes(stored_key)
+    key_cache.clear()
+    success, passwords, _ = PasswordService.get_user_passwords(db_connection, user_id, "old")
+    key_cache.clear()
+    assert success is True
+    assert {pwd["service"]: pwd["password"] for pwd in passwords if pwd["service"] != "broken"} == {
+        f"s{index}": f"secret{index}" for index in range(4)
+    }
+
+
+def test_rekey_user_keeps_values_of_stale_edits(db_connection, async_database):
+    """Test edits of records read before a re-key cannot leave values under the old key"""
+    import asyncio
+    from src.security import EncryptionService
+    from src.security.encryption import crypto_pool, key_cache
+    from src.services import DataKeyService, PasswordService
+
+    key_cache.clear()
+    user_id = UserRepository.create(db_connection, User(username="staleuser", password_hash="hash"))
+    data_key = DataKeyService.get_data_key(db_connection, user_id, "old")
+    password_id = PasswordRepository.create(
+        db_connection,
+        Password(user_id=user_id, service="Gmail", login="user",
+                 password=EncryptionService.seal_with_data_key("secret", data_key)),
+    )
+    stale = PasswordRepository.get_by_id(db_connection, password_id)
+    stored = bytes(stale.password)
+
+    async def scenario():
+        try:
+            await PasswordService.rekey_user(async_database, user_id, "old", "new")
+        finally:
+            await async_database.close()
+            await crypto_pool.shutdown()
+
+    asyncio.run(scenario())
+
+    assert PasswordRepository.update_details(db_connection, password_id, stale.service, "renamed") is True
+    stale.password = EncryptionService.seal_with_data_key("edited", data_key)
+    assert PasswordRepository.update(db_connection, stale, stored) is False
+
+    assert UserRepository.begin_rekey(db_connection, user_id, b"pending") is True
+    assert PasswordRepository.update(db_connection, stale) is False
+    assert PasswordRepository.update_secrets(db_connection, [(password_id, stored, bytes(stale.password))]) == 0
+    assert PasswordRepository.create(
+        db_connection, Password(user_id=user_id, service="New", login="user", password=b"value"),
+    ) is None
+    assert PasswordRepository.upsert(db_connection, user_id, "Gmail", "renamed", b"value") is None
+    db_connection.execute("UPDATE users SET pending_data_key = NULL, rekey_checkpoint = NULL WHERE id = ?", (user_id,))
+    db_connection.commit()
+
+    key_cache.clear()
+    success, passwords, _ = PasswordService.get_user_passwords(db_connection, user_id, "new")
+    key_cache.clear()
+    assert success is True
+    assert [(pwd["login"], pwd["password"]) for pwd in passwords] == [("renamed", "secret")]
+
+
+def test_connection_pool_reuses_tuned_connections(temp_db):
+    """Test pooled connections are opened once, tuned and cleaned on checkin"""
+    from src.database.pool import ConnectionPool
+
+    pool = ConnectionPool(temp_db, size=1)
+    try:
+        with pool.checkout() as db:
+            assert db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert db.execute("PRAGMA synchronous").fetchone()[0] == 1
+            UserRepository.create(db, User(username="pooluser", password_hash="hash"))
+            db.execute("INSERT INTO users (username, password_hash) VALUES ('uncommitted', 'hash')")
+
+        with pool.checkout() as db:
+            assert UserRepository.get_by_username(db, "pooluser") is not None
+            assert UserRepository.get_by_username(db, "uncommitted") is None
+            with pool.checkout() as nested:
+                assert nested.connection is not db.connection
+
+        assert pool.opened == 2
+        assert len(pool._idle) == 1
+    finally:
+        pool.close()
+
+
+def test_async_repositories_run_on_database_thread(async_database):
+    """Test async repositories keep blocking calls off the event loop thread"""
+    import asyncio
+    import threading
+    from src.database.async_db import AsyncPasswordRepository, AsyncUserRepository
+
+    async def scenario():
+        try:
+            user_id = await AsyncUserRepository.create(async_database, User(username="asyncrepo", password_hash="h"))
+            await AsyncPasswordRepository.create(
+                async_database, Password(user_id=user_id, service="Gmail", login="user", password=b"\x03data")
+            )
+            thread = await async_database.run(lambda db: threading.current_thread())
+            user = await AsyncUserRepository.get_by_username(async_database, "asyncrepo")
+            passwords = await AsyncPasswordRepository.get_by_user(async_database, user_id)
+            return thread, user, passwords
+        finally:
+            await async_database.close()
+
+    thread, user, passwords = asyncio.run(scenario())
+
+    assert thread is not threading.current_thread()
+    assert user.username == "asyncrepo"
+    assert [pwd.service for pwd in passwords] == ["Gmail"]
+
+
+def test_database_writer_commits_concurrent_writes_together(temp_db):
+    """Test queued writes share one commit and keep their own results"""
+    import asyncio
+    from src.database.async_db import AsyncDatabase, AsyncPasswordRepository, AsyncUserRepository
+    from src.database.writer import DatabaseWriter
+
+    writer = DatabaseWriter(temp_db, window=0.05)
+    database = AsyncDatabase(temp_db, writer=writer)
+
+    def failing(db):
+        db.execute("INSERT INTO users (username, password_hash) VALUES ('rolledback', 'h')")
+        raise RuntimeError("boom")
+
+    async def scenario():
+        try:
+            user_id = await AsyncUserRepository.create(database, User(username="writer", password_hash="h"))
+            commits = writer.commits
+            results = await asyncio.gather(
+                *(
+                    AsyncPasswordRepository.create(
+                        database, Password(user_id=user_id, service=f"svc{i}", login="user", password=b"\x03data")
+                    )
+                    for i in range(20)
+                ),
+                AsyncUserRepository.create(database, User(username="writer", password_hash="h")),
+                database.write(failing),
+                return_exceptions=True,
+            )
+            passwords = await AsyncPasswordRepository.list_by_user(database, user_id)
+            missing = await AsyncUserRepository.get_by_username(database, "rolledback")
+            return results, writer.commits - commits, passwords, missing
+        finally:
+            await database.close()
+            writer.close()
+
+    results, commits, passwords, missing = asyncio.run(scenario())
+
+    ids, duplicate, failure = results[:20], results[20], results[21]
+    assert len(set(ids)) == 20 and all(isinstance(pwd_id, int) for pwd_id in ids)
+    assert duplicate is None
+    assert isinstance(failure, RuntimeError)
+    assert missing is None
+    assert len(passwords) == 20
+    assert commits < 22
+
+
+def test_vault_writes_only_commit_through_writer(temp_db, monkeypatch):
+    """Test login, vault, re-key and session writes all use the writer connection"""
+    import asyncio
+    from src.database.async_db import AsyncDatabase, AsyncPasswordRepository, AsyncUserRepository
+    from src.database.sessions import SqliteSessionStore
+    from src.database.writer import DatabaseWriter
+    from src.security.encryption import crypto_pool, key_cache
+    from src.services import AuthenticationService, PasswordService
+
+    writer = DatabaseWriter(temp_db)
+    database = AsyncDatabase(temp_db, writer=writer)
+    sessions = SqliteSessionStore(temp_db, touch_interval=0, writer=writer)
+    direct_commits = []
+    commit = Database.commit
+
+    def record_commit(db):
+        direct_commits.append(db)
+        commit(db)
+
+    monkeypatch.setattr(Database, "commit", record_commit)
+    key_cache.clear()
+
+    async def scenario():
+        try:
+            success, _ = await AuthenticationService.register_user_async(database, "writeronly", "master")
+            assert success
+            success, _, user_id = await AuthenticationService.authenticate_user_async(database, "writeronly", "master")
+            assert success
+            await AuthenticationService.start_session_async(database, user_id, "master")
+            await sessions.set(1, user_id)
+            assert await sessions.get(1) == user_id
+            await PasswordService.create_password_async(database, user_id, "Gmail", "user", "secret", "master")
+            passwords = await AsyncPasswordRepository.list_by_user(database, user_id)
+            await AsyncPasswordRepository.update_details(database, passwords[0].id, "Gmail", "renamed")
+            await PasswordService.rekey_user(database, user_id, "master", "rotated")
+            await AsyncPasswordRepository.delete_all_for_user(database, user_id)
+            await AsyncUserRepository.delete(database, user_id)
+            assert await sessions.delete(1) == user_id
+        finally:
+            await sessions.close()
+            await database.close()
+            writer.close()
+            await crypto_pool.shutdown()
+
+    asyncio.run(scenario())
+    key_cache.clear()
+
+    assert writer.commits > 0
+    assert direct_commits == []
+
+
+def test_memory_session_store_expires_sessions():
+    """Test idle and absolute expiry of in-memory sessions"""
+    import asyncio
+    import time
+    from src.database.sessions import MemorySessionStore
+
+    async def scenario():
+        store = MemorySessionStore(idle_ttl=0.05, absolute_ttl=60)
+        await store.set(1, 10)
+        await store.set(2, 20)
+        assert await store.get(1) == 10
+        time.sleep(0.03)
+        assert await store.get(1) == 10
+        time.sleep(0.03)
+        assert await store.get(1) == 10
+        assert await store.get(2) is None
+        assert await store.delete(1) == 10
+        assert await store.get(1) is None
+
+        store = MemorySessionStore(idle_ttl=60, absolute_ttl=0.05)
+        await store.set(1, 10)
+        await store.set(2, 20)
+        await store.set(3, 30)
+        time.sleep(0.06)
+        assert await store.delete(3) == 30
+        assert await store.purge_expired() == 2
+        assert len(store) == 0
+
+    asyncio.run(scenario())
+
+
+def test_session_store_requires_every_operation():
+    """Test a store missing an operation cannot be created"""
+    import pytest
+    from src.database.sessions import SessionStore
+
+    class Incomplete(SessionStore):
+        async def get(self, telegram_id):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_sqlite_session_store_shared_between_stores(temp_db):
+    """Test sessions survive reopening and are visible to every store on the file"""
+    import asyncio
+    import threading
+    import time
+    from src.database.sessions import SqliteSessionStore
+
+    async def scenario():
+        first = SqliteSessionStore(temp_db, idle_ttl=60, absolute_ttl=60, touch_interval=0)
+        second = SqliteSessionStore(temp_db, idle_ttl=60, absolute_ttl=60, touch_interval=0)
+        try:
+            await first.set(1, 10)
+            assert await second.get(1) == 10
+            await first.set(1, 11)
+            assert await second.get(1) == 11
+            assert await second.delete(1) == 11
+            assert await first.get(1) is None
+            assert await first.delete(1) is None
+
+            await first.set(2, 20)
+            await first.close()
+            assert await first.get(2) == 20
+
+            short = SqliteSessionStore(temp_db, idle_ttl=0.05, absolute_ttl=60)
+            try:
+                await first.set(3, 30)
+                await first.set(4, 40)
+                time.sleep(0.06)
+                assert await short.get(2) is None
+                assert await short.delete(4) == 40
+                assert await short.purge_expired() == 1
+                assert await second.get(3) is None
+            finally:
+                await short.close()
+
+            threads = []
+            original = first.db._call
+
+            def record(func, args):
+                threads.append(threading.current_thread())
+                return original(func, args)
+
+            first.db._call = record
+            await first.get(2)
+            assert threads and threading.main_thread() not in threads
+        finally:
+            await first.close()
+            await second.close()
+
+    asyncio.run(scenario())
+
+
+def test_sqlite_fsm_storage_shared_between_processes(temp_db):
+    """Test FSM state is batched, shared through the file and expires"""
+    import asyncio
+    from aiogram.fsm.storage.base import StorageKey
+    from src.bot.states import MainMenuStates
+    from src.bot.storage import SqliteStorage
+
+    key = StorageKey(bot_id=1, chat_id=2, user_id=3)
+    other_key = StorageKey(bot_id=1, chat_id=4, user_id=4)
+
+    async def scenario():
+        first = SqliteStorage(temp_db, window=0.01)
+        second = SqliteStorage(temp_db, check_interval=0)
+        try:
+            assert await first.get_state(key) is None
+            await first.set_state(key, MainMenuStates.ADD_PASSWORD_LOGIN)
+            await first.update_data(key, {"service": "github"})
+            await first.update_data(key, {"login": "john"})
+            await first.set_data(other_key, {"password_id": 7})
+            assert await first.get_state(key) == MainMenuStates.ADD_PASSWORD_LOGIN.state
+            assert await second.get_state(key) is None
+
+            await asyncio.sleep(0.05)
+            assert first.flushes == 1
+            assert await second.get_state(key) == MainMenuStates.ADD_PASSWORD_LOGIN.state
+            assert await second.get_data(key) == {"service": "github", "login": "john"}
+
+            await second.set_state(key, None)
+            await second.set_data(key, {})
+            await second.flush()
+            first.check_interval = 0
+            assert await first.get_state(key) is None
+            assert await first.get_data(other_key) == {"password_id": 7}
+
+            expiring = SqliteStorage(temp_db, ttl=0.01, check_interval=0)
+            try:
+                await asyncio.sleep(0.02)
+                assert await expiring.get_data(other_key) == {}
+                await expiring.set_state(key, MainMenuStates.MENU)
+                await expiring.flush()
+            finally:
+                await expiring.close()
+            assert await second.get_data(other_key) == {}
+            assert await second.get_state(key) == MainMenuStates.MENU.state
+        finally:
+            await first.close()
+            await second.close()
+
+    asyncio.run(scenario())
+
+
+def test_sqlite_fsm_storage_retries_failed_flush(temp_db, monkeypatch):
+    """Test FSM changes from a failed flush are written by the next one"""
+    import asyncio
+    import sqlite3
+    from aiogram.fsm.storage.base import StorageKey
+    from src.bot import storage as storage_module
+    from src.bot.states import MainMenuStates
+    from src.bot.storage import SqliteStorage
+
+    key = StorageKey(bot_id=1, chat_id=2, user_id=3)
+    other_key = StorageKey(bot_id=1, chat_id=4, user_id=4)
+    save_rows = storage_module._save_rows
+    failures = []
+
+    def failing_save_rows(db, rows, expired_before):
+        if not failures:
+            failures.append(rows)
+            raise sqlite3.OperationalError("database is locked")
+        return save_rows(db, rows, expired_before)
+
+    monkeypatch.setattr(storage_module, "_save_rows", failing_save_rows)
+
+    async def scenario():
+        first = SqliteStorage(temp_db, window=0.01)
+        second = SqliteStorage(temp_db, check_interval=0)
+        try:
+            await first.set_state(key, MainMenuStates.ADD_PASSWORD_LOGIN)
+            await first.set_data(other_key, {"password_id": 7})
+            await first.flush()
+            assert failures and first.flushes == 0
+            await first.set_state(key, MainMenuStates.MENU)
+
+            await asyncio.sleep(0.05)
+            assert first.flushes == 1
+            assert await second.get_state(key) == MainMenuStates.MENU.state
+            assert await second.get_data(other_key) == {"password_id": 7}
+        finally:
+            await first.close()
+            await second.close()
+
+    asyncio.run(scenario())
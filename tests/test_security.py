@@ -0,0 +1,383 @@
+"""Tests for encryption service and key cache"""
+import asyncio
+import base64
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from src.security import CryptoPool, EncryptionService, KeyCache
+from src.security.ciphers import CipherSuite, FernetSuite, get_suite, register_suite
+from src.security.encryption import crypto_pool, key_cache
+from src.security.kdf import LEGACY_KDF, PBKDF2_SHA256, SCRYPT, KdfParams, calibrate
+
+
+@pytest.fixture(autouse=True)
+def clean_key_cache():
+    """Reset the process-wide key cache between tests"""
+    key_cache.clear()
+    yield
+    key_cache.clear()
+
+
+class TestKeyCache:
+    """Test bounded LRU key cache"""
+
+    def test_put_get(self):
+        """Test cached value round trip"""
+        cache = KeyCache()
+        cache.put(1, b"salt", "key")
+        assert cache.get(1, b"salt") == "key"
+        assert cache.get(2, b"salt") is None
+
+    def test_lru_bound(self):
+        """Test least recently used entry is evicted"""
+        cache = KeyCache(max_entries=2)
+        cache.put(1, "a", 1)
+        cache.put(1, "b", 2)
+        cache.get(1, "a")
+        cache.put(1, "c", 3)
+
+        assert cache.get(1, "a") == 1
+        assert cache.get(1, "b") is None
+        assert len(cache) == 2
+
+    def test_idle_ttl(self):
+        """Test idle entries expire"""
+        cache = KeyCache(idle_ttl=0.01)
+        cache.put(1, "a", 1)
+        time.sleep(0.02)
+        assert cache.get(1, "a") is None
+
+    def test_sweep_drops_expired_without_reads(self):
+        """Test the periodic sweep purges idle entries nobody reads"""
+        cache = KeyCache(idle_ttl=0.01)
+        cache.put(1, "a", 1)
+
+        async def scenario():
+            sweeper = asyncio.create_task(cache.sweep(0.02))
+            await asyncio.sleep(0.05)
+            sweeper.cancel()
+            await asyncio.gather(sweeper, return_exceptions=True)
+
+        asyncio.run(scenario())
+        assert len(cache) == 0
+
+    def test_evict_scope(self):
+        """Test logout eviction drops only the session entries"""
+        cache = KeyCache()
+        cache.put(1, "a", 1)
+        cache.put(1, "b", 2)
+        cache.put(2, "a", 3)
+
+        assert cache.evict(1) == 2
+        assert cache.get(2, "a") == 3
+
+
+class TestSessionEncryption:
+    """Test encryption with session-scoped keys"""
+
+    def test_legacy_decrypt_reuses_derived_key(self, monkeypatch):
+        """Test one derivation per salt within a session"""
+        encrypted = EncryptionService.encrypt_password("secret", "master")
+        calls = []
+        original = EncryptionService.derive_key
+
+        def counting_derive(master_password, salt, params=None):
+            calls.append(salt)
+            return original(master_password, salt, params)
+
+        monkeypatch.setattr(EncryptionService, "derive_key", staticmethod(counting_derive))
+
+        for _ in range(5):
+            assert EncryptionService.decrypt_password(encrypted, "master", scope=7) == "secret"
+        assert len(calls) == 1
+
+    def test_close_session(self):
+        """Test logout evicts session keys"""
+        encrypted = EncryptionService.encrypt_password("secret", "master")
+        EncryptionService.decrypt_password(encrypted, "master", scope=7)
+        assert len(key_cache) > 0
+
+        EncryptionService.close_session(7)
+        assert len(key_cache) == 0
+
+
+class TestEnvelopeEncryption:
+    """Test per-user data key encryption"""
+
+    def test_data_key_round_trip(self):
+        """Test data is encrypted under the data key with the configured suite"""
+        data_key = EncryptionService.generate_data_key()
+        encrypted = EncryptionService.encrypt_with_data_key("secret", data_key)
+
+        assert encrypted.startswith("v3:")
+        assert not EncryptionService.is_legacy(encrypted)
+        assert EncryptionService.decrypt_password(encrypted, "ignored", data_key=data_key) == "secret"
+
+    def test_wrap_unwrap(self):
+        """Test data key wrapping with master password"""
+        data_key = EncryptionService.generate_data_key()
+        wrapped = EncryptionService.wrap_data_key(data_key, "master")
+
+        assert EncryptionService.unwrap_data_key(wrapped, "master") == data_key
+        with pytest.raises(ValueError):
+            EncryptionService.unwrap_data_key(wrapped, "wrong")
+
+    def test_requires_data_key(self):
+        """Test data-key data cannot be decrypted with master password alone"""
+        encrypted = EncryptionService.encrypt_with_data_key("secret", EncryptionService.generate_data_key())
+        with pytest.raises(ValueError):
+            EncryptionService.decrypt_password(encrypted, "master")
+
+
+class TestCryptoPool:
+    """Test prioritized crypto process pool"""
+
+    def test_interactive_jobs_overtake_bulk(self):
+        """Test lower priority value runs first once a worker frees up"""
+        async def scenario():
+            pool = CryptoPool(max_workers=1)
+            order = []
+            try:
+                blocker = asyncio.create_task(pool.run(time.sleep, 0.3))
+                await asyncio.sleep(0.1)
+                bulk = asyncio.create_task(pool.run(abs, -1, priority=CryptoPool.PRIORITY_BULK))
+                interactive = asyncio.create_task(pool.run(abs, -2, priority=CryptoPool.PRIORITY_INTERACTIVE))
+                bulk.add_done_callback(lambda _: order.append("bulk"))
+                interactive.add_done_callback(lambda _: order.append("interactive"))
+                await asyncio.sleep(0)
+                depth = pool.metrics()["queue_depth"]
+                await asyncio.gather(blocker, bulk, interactive)
+                return order, depth, pool.metrics()
+            finally:
+                await pool.shutdown()
+
+        order, depth, metrics = asyncio.run(scenario())
+
+        assert order == ["interactive", "bulk"]
+        assert depth == 2
+        assert metrics["completed"] == 3
+        assert metrics["max_wait"] > 0
+
+    def test_worker_crash_replaces_pool(self):
+        """Test a crashed worker fails its job and later jobs run on a new pool"""
+        async def scenario():
+            pool = CryptoPool(max_workers=1)
+            try:
+                with pytest.raises(BrokenProcessPool):
+                    await pool.run(os._exit, 1)
+                return await pool.run(abs, -3), pool.metrics()
+            finally:
+                await pool.shutdown()
+
+        result, metrics = asyncio.run(scenario())
+
+        assert result == 3
+        assert metrics["restarts"] == 1
+        assert metrics["failed"] == 1
+
+    def test_async_round_trip(self):
+        """Test async counterparts match the sync format"""
+        async def scenario():
+            encrypted = await EncryptionService.encrypt_password_async("secret", "master")
+            decrypted = await EncryptionService.decrypt_password_async(encrypted, "master")
+            await crypto_pool.shutdown()
+            return encrypted, decrypted
+
+        encrypted, decrypted = asyncio.run(scenario())
+
+        assert decrypted == "secret"
+        assert EncryptionService.decrypt_password(encrypted, "master") == "secret"
+
+
+class TestBatchDecryption:
+    """Test batch decryption API"""
+
+    def test_derives_each_salt_once(self, monkeypatch):
+        """Test records sharing a salt need a single derivation"""
+        salt = b"0" * EncryptionService.SALT_LENGTH
+        cipher = EncryptionService.get_cipher("master", salt)
+        salt_b64 = base64.b64encode(salt).decode()
+        records = [(i, f"{salt_b64}:{cipher.encrypt(f'secret{i}'.encode()).decode()}") for i in range(10)]
+        calls = []
+        original = EncryptionService.derive_key
+
+        def counting_derive(master_password, salt, params=None):
+            calls.append(salt)
+            return original(master_password, salt, params)
+
+        monkeypatch.setattr(EncryptionService, "derive_key", staticmethod(counting_derive))
+
+        results = EncryptionService.decrypt_many(records, "master")
+
+        assert [result.value for result in results] == [f"secret{i}" for i in range(10)]
+        assert len(calls) == 1
+
+    def test_mixed_formats_and_failures(self):
+        """Test per-record failures are reported instead of dropped"""
+        data_key = EncryptionService.generate_data_key()
+        records = [
+            ("v2", EncryptionService.encrypt_with_data_key("a", data_key)),
+            ("legacy", EncryptionService.encrypt_password("b", "master")),
+            ("wrong", EncryptionService.encrypt_password("c", "other")),
+            ("garbage", "not encrypted"),
+        ]
+
+        results = EncryptionService.decrypt_many(records, "master", data_key=data_key)
+
+        assert [result.record_id for result in results] == ["v2", "legacy", "wrong", "garbage"]
+        assert results[0].value == "a"
+        assert results[1].value == "b"
+        assert not results[2].ok
+        assert not results[3].ok
+
+    def test_parallel_derivation(self):
+        """Test thread fan-out for many distinct salts"""
+        records = [(i, EncryptionService.encrypt_password(f"s{i}", "master")) for i in range(6)]
+
+        results = EncryptionService.decrypt_many(records, "master", scope=3, max_workers=3)
+
+        assert all(result.ok for result in results)
+        assert [result.value for result in results] == [f"s{i}" for i in range(6)]
+
+
+class TestKdfMetadata:
+    """Test KDF parameters stored with ciphertexts"""
+
+    def test_metadata_in_ciphertext(self):
+        """Test new ciphertexts record algorithm and cost"""
+        encrypted = EncryptionService.encrypt_password("secret", "master")
+        params, salt, _ = EncryptionService.parse_encrypted(encrypted)
+
+        assert encrypted.startswith(f"${params.algorithm}${params.cost}$")
+        assert params == KdfParams.current()
+        assert len(salt) == EncryptionService.SALT_LENGTH
+
+    def test_legacy_format_uses_original_params(self):
+        """Test values without metadata keep decrypting"""
+        salt = b"1" * EncryptionService.SALT_LENGTH
+        token = EncryptionService.get_cipher("master", salt, params=LEGACY_KDF).encrypt(b"secret")
+        legacy = f"{base64.b64encode(salt).decode()}:{token.decode()}"
+
+        params, _, _ = EncryptionService.parse_encrypted(legacy)
+        assert params == LEGACY_KDF
+        assert EncryptionService.decrypt_password(legacy, "master") == "secret"
+
+    def test_scrypt_round_trip(self, monkeypatch):
+        """Test scrypt parameters survive a round trip"""
+        scrypt = KdfParams(algorithm=SCRYPT, n=2 ** 10, r=8, p=1)
+        monkeypatch.setattr(KdfParams, "current", staticmethod(lambda: scrypt))
+
+        encrypted = EncryptionService.encrypt_password("secret", "master")
+
+        assert encrypted.startswith("$scrypt$1024,8,1$")
+        assert EncryptionService.decrypt_password(encrypted, "master") == "secret"
+        assert not EncryptionService.is_outdated(encrypted)
+
+    def test_outdated_detection(self, monkeypatch):
+        """Test data with other than configured parameters is outdated"""
+        encrypted = EncryptionService.encrypt_password("secret", "master")
+        monkeypatch.setattr(KdfParams, "current", staticmethod(lambda: KdfParams(iterations=1000)))
+
+        assert EncryptionService.is_outdated(encrypted)
+        assert not EncryptionService.is_outdated(
+            EncryptionService.encrypt_with_data_key("secret", EncryptionService.generate_data_key())
+        )
+
+    def test_calibrate_pbkdf2(self):
+        """Test calibration returns usable parameters"""
+        params = calibrate(PBKDF2_SHA256, target_seconds=0.01, rounds=1)
+
+        assert params.algorithm == PBKDF2_SHA256
+        assert params.iterations >= 10000
+
+
+class TestCipherSuites:
+    """Test cipher suite registry"""
+
+    @pytest.mark.parametrize("name", ["fernet", "aes-256-gcm", "chacha20-poly1305"])
+    def test_round_trip(self, name):
+        """Test every registered suite decrypts through the version byte"""
+        data_key = EncryptionService.generate_data_key()
+        encrypted = EncryptionService.encrypt_with_data_key("secret", data_key, suite_name=name)
+        version, _ = EncryptionService.split_sealed(encrypted)
+
+        assert get_suite(version).name == name
+        assert EncryptionService.decrypt_with_data_key(encrypted, data_key) == "secret"
+
+    def test_aead_is_smaller_than_fernet(self):
+        """Test AEAD rows are more compact than Fernet tokens"""
+        data_key = EncryptionService.generate_data_key()
+        fernet = EncryptionService.encrypt_with_data_key("secret", data_key, suite_name="fernet")
+        aead = EncryptionService.encrypt_with_data_key("secret", data_key, suite_name="aes-256-gcm")
+
+        assert len(aead) < len(fernet)
+
+    def test_old_suite_is_outdated(self):
+        """Test rows under a non-configured suite are flagged for re-encryption"""
+        data_key = EncryptionService.generate_data_key()
+
+        assert EncryptionService.is_outdated(EncryptionService.encrypt_with_data_key("a", data_key, "fernet"))
+        assert not EncryptionService.is_outdated(EncryptionService.encrypt_with_data_key("a", data_key))
+
+    def test_tampered_data_rejected(self):
+        """Test AEAD tag check"""
+        data_key = EncryptionService.generate_data_key()
+        version, body = EncryptionService.split_sealed(EncryptionService.encrypt_with_data_key("secret", data_key))
+        tampered = bytes((version,)) + body[:-1] + bytes((body[-1] ^ 1,))
+
+        results = EncryptionService.decrypt_many(
+            [(1, f"v3:{base64.b64encode(tampered).decode()}")], "master", data_key=data_key
+        )
+        assert not results[0].ok
+
+    def test_duplicate_version_rejected(self):
+        """Test registry refuses a clashing version byte"""
+        class Clash(FernetSuite):
+            name = "clash"
+
+        with pytest.raises(ValueError):
+            register_suite(Clash())
+
+
+    def test_incomplete_suite_rejected(self):
+        """Test a suite without bind cannot be instantiated"""
+        class Incomplete(CipherSuite):
+            version = 0x7f
+            name = "incomplete"
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+class TestBinaryFormat:
+    """Test compact BLOB ciphertexts"""
+
+    def test_derived_blob_round_trip(self):
+        """Test derived-key text value repackages to binary and still decrypts"""
+        encrypted = EncryptionService.encrypt_password("secret", "master")
+        blob = EncryptionService.to_blob(encrypted)
+
+        assert blob[0] == 0x01
+        assert len(blob) < len(encrypted)
+        assert EncryptionService.is_legacy(blob)
+        assert EncryptionService.parse_encrypted(memoryview(blob))[:2] == EncryptionService.parse_encrypted(encrypted)[:2]
+        assert EncryptionService.decrypt_password(memoryview(blob), "master") == "secret"
+
+    @pytest.mark.parametrize("name", ["fernet", "aes-256-gcm", "chacha20-poly1305"])
+    def test_sealed_blob_round_trip(self, name):
+        """Test data-key binary values for every suite"""
+        data_key = EncryptionService.generate_data_key()
+        blob = EncryptionService.seal_with_data_key("secret", data_key, name)
+
+        assert get_suite(blob[0]).name == name
+        assert not EncryptionService.is_legacy(blob)
+        assert EncryptionService.to_blob(EncryptionService.encrypt_with_data_key("x", data_key, name))[0] == blob[0]
+        assert EncryptionService.decrypt_with_data_key(memoryview(blob), data_key) == "secret"
+
+    def test_scrypt_header(self):
+        """Test scrypt parameters survive the binary header"""
+        params = KdfParams(algorithm=SCRYPT, n=2 ** 10, r=8, p=1)
+
+        assert KdfParams.from_bytes(params.to_bytes()) == (params, 4)
@@ -0,0 +1,120 @@
+"""Tests for webhook mode against a local fake Telegram server"""
+import asyncio
+import socket
+
+from aiohttp import ClientSession, web
+from aiogram import Bot, Dispatcher, Router
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.types import Message
+
+from src.bot.webhook import run_webhook
+
+SECRET = "s3cret"
+
+
+def free_port() -> int:
+    """Port nothing is listening on"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def update(update_id: int, text: str) -> dict:
+    """Private chat message update"""
+    user = {"id": 7, "is_bot": False, "first_name": "John"}
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": 7, "type": "private"},
+            "from": user,
+            "text": text,
+        },
+    }
+
+
+async def fake_telegram(calls: list) -> web.AppRunner:
+    """Bot API server recording calls and answering them successfully"""
+
+    async def method(request: web.Request) -> web.Response:
+        data = dict(await request.post())
+        calls.append((request.match_info["method"], data))
+        if request.match_info["method"] == "sendMessage":
+            result = {"message_id": 1, "date": 0, "chat": {"id": 7, "type": "private"}, "text": data["text"]}
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    app = web.Application()
+    app.router.add_post("/bot{token}/{method}", method)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    return runner
+
+
+def test_webhook_acknowledges_and_deduplicates_updates():
+    """Test updates are acknowledged before processing and retries are dropped"""
+    calls = []
+    handled = []
+
+    async def scenario():
+        telegram = await fake_telegram(calls)
+        host, port = telegram.addresses[0][:2]
+        bot = Bot("42:TEST", session=AiohttpSession(api=TelegramAPIServer.from_base(f"http://{host}:{port}")))
+
+        release = asyncio.Event()
+        router = Router()
+
+        @router.message()
+        async def echo(message: Message):
+            handled.append(message.text)
+            await release.wait()
+            await message.answer(f"echo {message.text}")
+
+        dispatcher = Dispatcher()
+        dispatcher.include_router(router)
+        webhook_port = free_port()
+        server = asyncio.create_task(
+            run_webhook(dispatcher, bot, "https://bot.example.com/", "127.0.0.1", webhook_port, "/hook", SECRET)
+        )
+        url = f"http://127.0.0.1:{webhook_port}/hook"
+        try:
+            async with ClientSession() as client:
+                for _ in range(100):
+                    if any(name == "setWebhook" for name, _ in calls):
+                        break
+                    await asyncio.sleep(0.01)
+
+                headers = {"X-Telegram-Bot-Api-Secret-Token": SECRET}
+                async with client.post(url, json=update(1, "hi")) as response:
+                    unauthorized = response.status
+                statuses = []
+                for body in (update(1, "hi"), update(1, "hi"), update(2, "there")):
+                    async with client.post(url, json=body, headers=headers) as response:
+                        statuses.append(response.status)
+                answered_before_release = [name for name, _ in calls if name == "sendMessage"]
+
+                release.set()
+                for _ in range(100):
+                    if len([name for name, _ in calls if name == "sendMessage"]) == 2:
+                        break
+                    await asyncio.sleep(0.01)
+        finally:
+            server.cancel()
+            await asyncio.gather(server, return_exceptions=True)
+            await telegram.cleanup()
+        return unauthorized, statuses, answered_before_release
+
+    unauthorized, statuses, answered_before_release = asyncio.run(scenario())
+
+    assert unauthorized == 401
+    assert statuses == [200, 200, 200]
+    assert answered_before_release == []
+    assert sorted(handled) == ["hi", "there"]
+    webhook = [data for name, data in calls if name == "setWebhook"]
+    assert webhook[0]["url"] == "https://bot.example.com/hook"
+    assert webhook[0]["secret_token"] == SECRET
+    assert sorted(data["text"] for name, data in calls if name == "sendMessage") == ["echo hi", "echo there"]